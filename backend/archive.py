@@ -0,0 +1,253 @@
+"""Hot/cold tiering of slots and bookings.
+
+Past slots move from the main database into an archive database that every
+pooled connection ATTACHes as "archive": unbooked slots once they are older
+than slot_days, booked slots together with their bookings once they are older
+than booking_days. Batches are short write transactions, so bookings and
+owner writes only ever wait for one batch.
+
+SQLite does not commit a transaction across attached WAL databases
+atomically, so each batch uses two: the first copies the rows into the
+archive (INSERT OR REPLACE), the second deletes them from main. A crash
+between the two leaves the rows in both tiers until the next run copies
+them again and deletes them; it never loses a row. Readers of both tiers
+skip archive rows whose id is still in main, so such rows are never
+counted or listed twice.
+
+The owner rollups are not archived, so analytics keep covering the full
+history; GET /bookings/my reads both tiers.
+
+    ARCHIVE_DB_PATH=/data/archive.db python archive.py --run
+    ARCHIVE_DB_PATH=/data/archive.db python archive.py          # row counts per tier
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import code_allocator
+
+logger = logging.getLogger(__name__)
+
+SLOT_COLUMNS = ("id", "ground_id", "slot_date", "start_time", "end_time", "price", "is_booked")
+BOOKING_COLUMNS = ("id", "user_id", "slot_id", "verification_code", "status", "booked_at", "verified_at")
+
+
+def attach(conn, path: str):
+    """Attach the archive database to a connection, creating its tables on first use"""
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    conn.execute("PRAGMA archive.journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS archive.slots (
+            id TEXT PRIMARY KEY, ground_id TEXT, slot_date TEXT, start_time TEXT, end_time TEXT,
+            price INTEGER, is_booked INTEGER, archived_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS archive.bookings (
+            id TEXT PRIMARY KEY, user_id TEXT, slot_id TEXT, verification_code TEXT, status TEXT,
+            booked_at TEXT, verified_at TEXT, archived_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_slots_ground ON slots(ground_id, slot_date, start_time, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_bookings_user ON bookings(user_id, booked_at, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_bookings_slot ON bookings(slot_id)")
+
+
+def is_attached(conn) -> bool:
+    return any(row[1] == "archive" for row in conn.execute("PRAGMA database_list"))
+
+
+def union(conn, table: str) -> str:
+    """FROM-clause source covering both tiers of slots or bookings (just the table when no archive)"""
+    if not is_attached(conn):
+        return table
+    columns = ", ".join(SLOT_COLUMNS if table == "slots" else BOOKING_COLUMNS)
+    return (
+        f"(SELECT {columns} FROM main.{table} UNION ALL "
+        f"SELECT {columns} FROM archive.{table} a WHERE {not_in_main(table, 'a')})"
+    )
+
+
+def not_in_main(table: str, alias: str) -> str:
+    """Condition on an archive row: false while a half-finished batch still has it in main too"""
+    return f"NOT EXISTS (SELECT 1 FROM main.{table} m WHERE m.id = {alias}.id)"
+
+
+class Archiver:
+    def __init__(self, pool, slot_days: int = 1, booking_days: int = 30, batch_size: int = 500, pause: float = 0.05,
+                 on_batch=None):
+        self.pool = pool
+        self.slot_days = slot_days
+        self.booking_days = max(booking_days, slot_days)
+        self.batch_size = batch_size
+        self.pause = pause
+        self.on_batch = on_batch  # called inside each batch's transaction with the ground ids it touched
+        self.runs = 0
+        self.slots_archived = 0
+        self.bookings_archived = 0
+        self.last_run_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def hot_since(self, today=None):
+        """Earliest slot date still kept in the main database"""
+        today = today or datetime.now(timezone.utc).date()
+        return today - timedelta(days=self.slot_days)
+
+    def _move_batch(self, is_booked: int, cutoff: str) -> tuple:
+        with self.pool.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, ground_id FROM main.slots WHERE is_booked = ? AND slot_date < ? ORDER BY slot_date LIMIT ?",
+                (is_booked, cutoff, self.batch_size)
+            ).fetchall()
+            # Pending bookings still hold a live code; their slots stay until the booking settles
+            placeholders = ",".join("?" * len(rows))
+            pending = {row[0] for row in conn.execute(
+                f"SELECT slot_id FROM main.bookings WHERE slot_id IN ({placeholders}) AND status = 'pending'",
+                [row[0] for row in rows]
+            )} if rows else set()
+            rows = [row for row in rows if row[0] not in pending]
+            if not rows:
+                return 0, 0
+            ids = [row[0] for row in rows]
+            placeholders = ",".join("?" * len(ids))
+            archived_at = datetime.now(timezone.utc).isoformat()
+            slot_columns = ", ".join(SLOT_COLUMNS)
+            booking_columns = ", ".join(BOOKING_COLUMNS)
+            conn.execute(
+                f"INSERT OR REPLACE INTO archive.slots ({slot_columns}, archived_at) "
+                f"SELECT {slot_columns}, ? FROM main.slots WHERE id IN ({placeholders})",
+                (archived_at, *ids)
+            )
+            conn.execute(
+                f"INSERT OR REPLACE INTO archive.bookings ({booking_columns}, archived_at) "
+                f"SELECT {booking_columns}, ? FROM main.bookings WHERE slot_id IN ({placeholders})",
+                (archived_at, *ids)
+            )
+
+        with self.pool.transaction() as conn:
+            # A slot booked since the copy stays in main; drop its copy, the next run takes it again
+            kept = [row[0] for row in conn.execute(
+                f"SELECT id FROM main.slots WHERE id IN ({placeholders}) AND is_booked = ?", (*ids, is_booked)
+            )]
+            changed = sorted(set(ids) - set(kept))
+            if changed:
+                marks = ",".join("?" * len(changed))
+                conn.execute(f"DELETE FROM archive.bookings WHERE slot_id IN ({marks})", changed)
+                conn.execute(f"DELETE FROM archive.slots WHERE id IN ({marks})", changed)
+            if not kept:
+                return 0, 0
+            placeholders = ",".join("?" * len(kept))
+            bookings = conn.execute(f"DELETE FROM main.bookings WHERE slot_id IN ({placeholders})", kept).rowcount
+            conn.execute(f"DELETE FROM main.slots WHERE id IN ({placeholders})", kept)
+            if self.on_batch is not None:
+                kept_ids = set(kept)
+                self.on_batch(conn, sorted({row[1] for row in rows if row[0] in kept_ids}))
+            return len(kept), bookings
+
+    def run_once(self, today=None) -> dict:
+        """Archive everything past the horizons, one batch per transaction"""
+        today = today or datetime.now(timezone.utc).date()
+        # Settle pending bookings of ended slots first so their slots can move
+        while not self._stop.is_set():
+            with self.pool.transaction() as conn:
+                expired = code_allocator.expire_stale_bookings(conn, limit=self.batch_size)
+            if expired < self.batch_size:
+                break
+            time.sleep(self.pause)
+        moved = {"slots": 0, "bookings": 0}
+        for is_booked, days in ((0, self.slot_days), (1, self.booking_days)):
+            cutoff = (today - timedelta(days=days)).isoformat()
+            while not self._stop.is_set():
+                slots, bookings = self._move_batch(is_booked, cutoff)
+                if not slots:
+                    break
+                moved["slots"] += slots
+                moved["bookings"] += bookings
+                # Let queued writers in between batches
+                time.sleep(self.pause)
+        with self._lock:
+            self.runs += 1
+            self.slots_archived += moved["slots"]
+            self.bookings_archived += moved["bookings"]
+            self.last_run_at = datetime.now(timezone.utc).isoformat()
+        return moved
+
+    def start(self, interval: float = 3600.0):
+        """Run the archiver every interval seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def _run():
+            while not self._stop.wait(interval):
+                try:
+                    moved = self.run_once()
+                    if moved["slots"]:
+                        logger.info("Archived %d slots and %d bookings", moved["slots"], moved["bookings"])
+                except Exception:
+                    logger.exception("Archiving failed")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_run, name="archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slot_days": self.slot_days,
+                "booking_days": self.booking_days,
+                "runs": self.runs,
+                "slots_archived": self.slots_archived,
+                "bookings_archived": self.bookings_archived,
+                "last_run_at": self.last_run_at,
+            }
+
+
+def main():
+    from db_pool import ConnectionPool
+    from migrations import DB_PATH, migrate
+
+    parser = argparse.ArgumentParser(description="Move past slots and settled bookings into the archive database")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--archive", default=os.environ.get("ARCHIVE_DB_PATH"), help="archive database (ARCHIVE_DB_PATH)")
+    parser.add_argument("--slot-days", type=int, default=int(os.environ.get("ARCHIVE_SLOT_DAYS", 1)))
+    parser.add_argument("--booking-days", type=int, default=int(os.environ.get("ARCHIVE_BOOKING_DAYS", 30)))
+    parser.add_argument("--batch-size", type=int, default=int(os.environ.get("ARCHIVE_BATCH_SIZE", 500)))
+    parser.add_argument("--run", action="store_true", help="archive everything past the horizons now")
+    args = parser.parse_args()
+    if not args.archive:
+        parser.error("set ARCHIVE_DB_PATH or pass --archive")
+
+    pool = ConnectionPool(args.db, size=1)
+    pool.on_connect.append(lambda conn: attach(conn, args.archive))
+    try:
+        with pool.connection() as conn:
+            migrate(conn)
+        if args.run:
+            archiver = Archiver(pool, args.slot_days, args.booking_days, args.batch_size, pause=0)
+            started = time.perf_counter()
+            moved = archiver.run_once()
+            print(f"Archived {moved['slots']} slots and {moved['bookings']} bookings in {time.perf_counter() - started:.1f}s")
+        with pool.connection() as conn:
+            for tier in ("main", "archive"):
+                slots = conn.execute(f"SELECT COUNT(*) FROM {tier}.slots").fetchone()[0]
+                bookings = conn.execute(f"SELECT COUNT(*) FROM {tier}.bookings").fetchone()[0]
+                print(f"{tier}: {slots} slots, {bookings} bookings")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Caches and revocation state behind get_current_user.
+
+UserCache keeps recently used user rows (LRU with a TTL) so authenticated
+requests skip the users lookup. TokenRevocationList tracks logged-out tokens
+and per-user cut-offs (e.g. after a password reset) in memory, mirrored from
+an ephemeral store.
+
+The user cache stays per process: it never decides whether a token is
+valid, and its entries age out after the TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from ephemeral_store import MemoryStore
+
+
+class UserCache:
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # email -> (expires_at, user)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, email: str):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, email: str, user: dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl, dict(user))
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, email: str):
+        with self._lock:
+            if self._entries.pop(email, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class TokenRevocationList:
+    """Revoked token ids and per-user cut-offs, checked in memory.
+
+    Revocations are written to an ephemeral store and mirrored here. One made
+    by this process applies at once; with a shared (SQLite) store, one made by
+    another worker applies once refresh() has read it, at most
+    refresh_interval seconds later.
+    """
+
+    TOKENS = "revoked_token"  # jti -> 1, until the token would have expired anyway
+    USERS = "revoked_user"  # email -> tokens issued before this are invalid
+
+    def __init__(self, store=None, max_token_age: float = 7 * 24 * 3600, refresh_interval: float = 1.0):
+        self.store = store if store is not None else MemoryStore()
+        self.max_token_age = max_token_age
+        self.refresh_interval = refresh_interval
+        self._revoked = {}  # jti -> expires_at
+        self._not_before = {}  # email -> cut-off
+        self._seq = 0  # store write order read up to
+        self._refreshed_at = float("-inf")
+        self._lock = threading.Lock()
+        self.refreshes = 0
+
+    def revoke(self, jti: str, expires_at: float):
+        ttl = expires_at - time.time()
+        if ttl > 0:
+            self.store.set(self.TOKENS, jti, 1, ttl)
+            with self._lock:
+                self._revoked[jti] = expires_at
+
+    def revoke_user(self, email: str, issued_before: float = None):
+        """Invalidate every token of a user issued before the given time (default now)"""
+        cutoff = issued_before if issued_before is not None else time.time()
+        # Kept until the newest token it covers has expired
+        self.store.set(self.USERS, email, cutoff, cutoff + self.max_token_age - time.time())
+        with self._lock:
+            self._not_before[email] = max(cutoff, self._not_before.get(email, cutoff))
+
+    def stale(self) -> bool:
+        return self.store.shared and time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def refresh(self):
+        """Mirror revocations written to the store (by any worker) since the last refresh"""
+        with self._lock:
+            seq = self._seq
+        changed, high = self.store.changed_since((self.TOKENS, self.USERS), seq)
+        now = time.time()
+        with self._lock:
+            for (namespace, key), (value, expires_at) in changed.items():
+                if namespace == self.TOKENS:
+                    self._revoked[key] = expires_at
+                else:
+                    self._not_before[key] = max(value, self._not_before.get(key, value))
+            for jti in [j for j, expires_at in self._revoked.items() if expires_at <= now]:
+                del self._revoked[jti]
+            for email in [e for e, cutoff in self._not_before.items() if cutoff + self.max_token_age <= now]:
+                del self._not_before[email]
+            self._seq = max(self._seq, high)
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+
+    def is_revoked(self, claims: dict) -> bool:
+        with self._lock:
+            if claims.get("jti") in self._revoked:
+                return True
+            cutoff = self._not_before.get(claims.get("sub"))
+        return cutoff is not None and claims.get("iat", 0) < cutoff
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.store.backend,
+                "revoked_tokens": len(self._revoked),
+                "revoked_users": len(self._not_before),
+                "refresh_interval": self.refresh_interval,
+                "refreshes": self.refreshes,
+            }
@@ -0,0 +1,4 @@
+"""Performance benchmarks for the Box Games backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.booking_race``.
+"""
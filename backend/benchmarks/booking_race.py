@@ -0,0 +1,93 @@
+"""Concurrent booking stress test for POST /bookings.
+
+Hundreds of simulated players race for a small set of slots. The run fails if
+any slot ends up with more than one booking, and reports bookings/second.
+
+    python -m benchmarks.booking_race --clients 500 --slots 25
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi import HTTPException
+
+from benchmarks.common import load_server, summarize
+
+
+def seed(server, slot_count: int):
+    with server.db_pool.transaction() as conn:
+        conn.execute(
+            "INSERT INTO venues (id, name, location, image_url, owner_id) VALUES (?, ?, ?, ?, ?)",
+            ("venue-bench", "Bench Arena", "Mumbai", "", "owner@bench.local")
+        )
+        conn.execute("INSERT INTO grounds (id, name, venue_id) VALUES (?, ?, ?)", ("ground-bench", "Ground 1", "venue-bench"))
+        conn.executemany(
+            "INSERT INTO slots (id, ground_id, slot_date, start_time, end_time, price, is_booked) VALUES (?, ?, ?, ?, ?, ?, 0)",
+            [(f"slot-{i}", "ground-bench", "2099-01-01", f"{18 + i % 4:02d}:00", f"{19 + i % 4:02d}:00", 1500) for i in range(slot_count)]
+        )
+        server.rollups.rebuild(conn)
+    return [f"slot-{i}" for i in range(slot_count)]
+
+
+async def race(server, slot_ids, clients: int, attempts: int):
+    latencies = []
+    outcomes = {"booked": 0, "rejected": 0}
+
+    async def player(n: int):
+        user = {"email": f"player{n}@bench.local", "role": "player"}
+        for _ in range(attempts):
+            started = time.perf_counter()
+            try:
+                await server.create_booking(server.BookingCreate(slot_id=random.choice(slot_ids)), current_user=user)
+                outcomes["booked"] += 1
+            except HTTPException as exc:
+                if exc.status_code != 400:
+                    raise
+                outcomes["rejected"] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(player(n) for n in range(clients)))
+    return outcomes, latencies, time.perf_counter() - started
+
+
+def check_invariants(server, slot_count: int, booked: int):
+    with server.db_pool.connection() as conn:
+        doubles = conn.execute(
+            "SELECT slot_id, COUNT(*) FROM bookings GROUP BY slot_id HAVING COUNT(*) > 1"
+        ).fetchall()
+        total_bookings = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        booked_slots = conn.execute("SELECT COUNT(*) FROM slots WHERE is_booked = 1").fetchone()[0]
+        rollup_booked = conn.execute("SELECT booked_slots FROM ground_stats WHERE ground_id = 'ground-bench'").fetchone()[0]
+    assert not doubles, f"Double bookings detected: {doubles}"
+    assert total_bookings == booked == booked_slots == rollup_booked <= slot_count, (
+        f"Inconsistent state: {booked} successes, {total_bookings} bookings, {booked_slots} booked slots, "
+        f"{rollup_booked} in rollup"
+    )
+    return total_bookings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--slots", type=int, default=25)
+    parser.add_argument("--attempts", type=int, default=2, help="booking attempts per client")
+    parser.add_argument("--db", help="database file (defaults to a scratch file)")
+    args = parser.parse_args()
+
+    server = load_server(args.db)
+    slot_ids = seed(server, args.slots)
+    outcomes, latencies, elapsed = asyncio.run(race(server, slot_ids, args.clients, args.attempts))
+    total = check_invariants(server, args.slots, outcomes["booked"])
+
+    requests = outcomes["booked"] + outcomes["rejected"]
+    print(f"clients={args.clients} slots={args.slots} attempts={requests}")
+    print(f"booked={outcomes['booked']} rejected={outcomes['rejected']} double_bookings=0 bookings_in_db={total}")
+    print(f"elapsed={elapsed:.3f}s attempts/s={requests / elapsed:.1f} bookings/s={outcomes['booked'] / elapsed:.1f}")
+    print(f"latency {summarize(latencies)}")
+    print(f"pool {server.db_pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Slot creation throughput: one POST /owner/slots per slot vs POST /owner/slots/bulk.
+
+Generates the same schedule (grounds x days x daily window) both ways on
+separate scratch databases and reports slots/second for each path.
+
+    python -m benchmarks.bulk_slots --grounds 10 --days 30
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import load_server
+
+OWNER = {"email": "owner@bench.local", "role": "owner"}
+
+
+def seed_grounds(server, count: int):
+    with server.db_pool.transaction() as conn:
+        conn.execute(
+            "INSERT INTO venues (id, name, location, image_url, owner_id) VALUES (?, ?, ?, ?, ?)",
+            ("venue-bench", "Bench Arena", "Mumbai", "", OWNER["email"])
+        )
+        conn.executemany(
+            "INSERT INTO grounds (id, name, venue_id) VALUES (?, ?, ?)",
+            [(f"ground-{i}", f"Ground {i}", "venue-bench") for i in range(count)]
+        )
+    return [f"ground-{i}" for i in range(count)]
+
+
+def template(server, ground_ids, days: int):
+    return server.SlotTemplate(
+        ground_ids=ground_ids,
+        start_date=date(2099, 1, 1),
+        end_date=date(2099, 1, 1) + timedelta(days=days - 1),
+        open_time="06:00",
+        close_time="22:00",
+        duration_minutes=60,
+        price=1200,
+    )
+
+
+async def per_slot(server, rows):
+    for ground_id, slot_date, start_time, end_time, price in rows:
+        slot = server.SlotCreate(ground_id=ground_id, slot_date=slot_date, start_time=start_time, end_time=end_time, price=price)
+        await server.create_slot(slot, current_user=OWNER)
+
+
+async def bulk(server, tpl):
+    return await server.create_slots_bulk(server.BulkSlotCreate(template=tpl), current_user=OWNER)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grounds", type=int, default=10)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--skip-per-slot", action="store_true", help="only time the bulk path")
+    args = parser.parse_args()
+
+    server = load_server()
+    tpl = template(server, seed_grounds(server, args.grounds), args.days)
+    started = time.perf_counter()
+    result = asyncio.run(bulk(server, tpl))
+    bulk_elapsed = time.perf_counter() - started
+    print(f"bulk:     {result['created']} slots in {bulk_elapsed:.3f}s ({result['created'] / bulk_elapsed:.0f} slots/s)")
+
+    if args.skip_per_slot:
+        return
+    server = load_server()
+    rows = server.expand_slot_template(template(server, seed_grounds(server, args.grounds), args.days))
+    started = time.perf_counter()
+    asyncio.run(per_slot(server, rows))
+    single_elapsed = time.perf_counter() - started
+    print(f"per-slot: {len(rows)} slots in {single_elapsed:.3f}s ({len(rows) / single_elapsed:.0f} slots/s)")
+    print(f"speedup:  {single_elapsed / bulk_elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Write throughput: the group-commit writer thread vs commit per call.
+
+Concurrent clients each issue db_insert calls (one INSERT, one commit on the
+commit-per-call path). Every combination of write path and synchronous
+setting runs against its own scratch database and reports writes/second,
+call latency and, for the writer thread, the average group size.
+
+    python -m benchmarks.group_commit --clients 200 --writes 20
+    python -m benchmarks.group_commit --synchronous FULL NORMAL
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+from benchmarks.common import load_server, summarize
+
+
+async def run_clients(server, clients: int, writes: int):
+    latencies = []
+
+    async def client(n: int):
+        for i in range(writes):
+            started = time.perf_counter()
+            await server.db_insert("venues", {
+                "id": str(uuid.uuid4()),
+                "name": f"Venue {n}-{i}",
+                "location": "Mumbai",
+                "image_url": "",
+                "owner_id": f"owner{n}@bench.local",
+            })
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    return time.perf_counter() - started, latencies
+
+
+def run(path: str, synchronous: str, clients: int, writes: int) -> dict:
+    os.environ["DB_SYNCHRONOUS"] = synchronous
+    os.environ["DB_WRITE_QUEUE"] = "1" if path == "group" else "0"
+    server = load_server()
+    try:
+        elapsed, latencies = asyncio.run(run_clients(server, clients, writes))
+        with server.db_pool.connection() as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM venues").fetchone()[0]
+        assert stored == clients * writes, f"expected {clients * writes} rows, found {stored}"
+        writer = server.write_queue.stats() if server.write_queue is not None else None
+    finally:
+        if server.write_queue is not None:
+            server.write_queue.close()
+        server.db_pool.close()
+    return {
+        "path": path,
+        "synchronous": synchronous,
+        "writes_per_s": round(len(latencies) / elapsed, 1),
+        "latency": summarize(latencies),
+        "avg_batch": writer["avg_batch"] if writer else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--writes", type=int, default=20, help="inserts per client")
+    parser.add_argument("--synchronous", nargs="+", default=["OFF", "NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    print(f"{'synchronous':<12} {'path':<9} {'writes/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'avg batch':>10}")
+    for synchronous in args.synchronous:
+        for path in ("per-call", "group"):
+            result = run(path, synchronous, args.clients, args.writes)
+            print(f"{synchronous:<12} {path:<9} {result['writes_per_s']:>10.1f} {result['latency']['p50_ms']:>9.2f} "
+                  f"{result['latency']['p99_ms']:>9.2f} {result['avg_batch']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
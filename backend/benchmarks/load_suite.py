@@ -0,0 +1,312 @@
+"""Scripted player/owner load against the API, with per-route latency.
+
+Seeds a scratch database with owners, venues, grounds, two weeks of hourly
+slots, players and existing bookings, then runs concurrent sessions for a
+fixed time:
+
+* players browse venues, grounds and a day's slots, book, list their
+  bookings and sometimes cancel
+* owners check their dashboard and analytics, then verify and confirm the
+  codes of bookings made at their venues
+
+Requests go through the ASGI app in-process by default, or to a running
+server with --url (start it with DB_PATH pointing at --db and the same
+JWT_SECRET_KEY). Results are printed per route template and written as JSON
+so runs can be compared with --compare.
+
+    python -m benchmarks.load_suite --players 50 --owners 5 --duration 30
+    python -m benchmarks.load_suite --compare benchmarks/results/load-20260101T120000Z.json
+    python -m benchmarks.load_suite --db /tmp/bench.db --seed-only
+    DB_PATH=/tmp/bench.db uvicorn server:app --workers 4 &
+    python -m benchmarks.load_suite --db /tmp/bench.db --no-seed --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from benchmarks.common import BACKEND_DIR, asgi_request, load_server, summarize
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def seed(server, venues: int, grounds_per_venue: int, days: int, players: int, booked_fraction: float) -> dict:
+    """Bulk-insert a realistic catalog straight into the database"""
+    from password_hashing import make_context
+
+    rng = random.Random(42)
+    owner_count = max(1, venues // 5)
+    password_hash = make_context(4).hash("Passw0rd!")
+    now = datetime.now(timezone.utc).isoformat()
+    first_day = date.today() + timedelta(days=1)
+
+    with server.db_pool.transaction() as conn:
+        users = []
+        for role, count in (("owner", owner_count), ("player", players)):
+            for n in range(count):
+                users.append((
+                    f"{role}-{n}", f"Bench {role.title()} {n}", f"bench_{role}{n}", f"{role}{n}@boxgames-bench.com",
+                    f"+91{(8 if role == 'owner' else 9) * 10 ** 9 + n}", password_hash, role,
+                    server.allocate_code(conn), now,
+                ))
+        conn.executemany(
+            "INSERT INTO users (id, fullName, username, email, mobileNumber, password_hash, role, verification_code, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            users
+        )
+
+        venue_rows, ground_rows, slot_rows = [], [], []
+        for v in range(venues):
+            venue_id = f"venue-{v:04d}"
+            venue_rows.append((venue_id, f"Bench Arena {v}", f"Sector {v % 40}", "", f"owner{v % owner_count}@boxgames-bench.com"))
+            for g in range(grounds_per_venue):
+                ground_id = f"{venue_id}-ground-{g}"
+                ground_rows.append((ground_id, f"Ground {g + 1}", venue_id))
+                for d in range(days):
+                    slot_date = (first_day + timedelta(days=d)).isoformat()
+                    for hour in range(6, 22):
+                        slot_rows.append((
+                            f"{ground_id}-{slot_date}-{hour:02d}", ground_id, slot_date,
+                            f"{hour:02d}:00", f"{hour + 1:02d}:00", 800 + 100 * (hour >= 18)
+                        ))
+        conn.executemany("INSERT INTO venues (id, name, location, image_url, owner_id) VALUES (?, ?, ?, ?, ?)", venue_rows)
+        conn.executemany("INSERT INTO grounds (id, name, venue_id) VALUES (?, ?, ?)", ground_rows)
+        conn.executemany(
+            "INSERT INTO slots (id, ground_id, slot_date, start_time, end_time, price, is_booked) VALUES (?, ?, ?, ?, ?, ?, 0)",
+            slot_rows
+        )
+
+        booked = rng.sample(slot_rows, int(len(slot_rows) * booked_fraction))
+        conn.executemany("UPDATE slots SET is_booked = 1 WHERE id = ?", [(row[0],) for row in booked])
+        conn.executemany(
+            "INSERT INTO bookings (id, user_id, slot_id, verification_code, status, booked_at) VALUES (?, ?, ?, ?, 'pending', ?)",
+            [
+                (f"booking-{n}", f"player{rng.randrange(players)}@boxgames-bench.com", row[0], server.allocate_code(conn), now)
+                for n, row in enumerate(booked)
+            ]
+        )
+        server.rollups.rebuild(conn)
+
+    return {"owners": owner_count, "venues": venues, "grounds": len(ground_rows), "slots": len(slot_rows),
+            "players": players, "bookings": len(booked)}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, route: str, status: int, seconds: float):
+        self.samples[route].append(seconds)
+        self.statuses[route][status] += 1
+
+    def report(self, duration: float) -> dict:
+        routes = {}
+        for route in sorted(self.samples):
+            statuses = self.statuses[route]
+            routes[route] = {
+                **summarize(self.samples[route]),
+                "rps": round(len(self.samples[route]) / duration, 1),
+                "errors": sum(n for status, n in statuses.items() if status >= 500),
+                "statuses": {str(status): n for status, n in sorted(statuses.items())},
+            }
+        return routes
+
+
+class Client:
+    """Sends requests in-process (ASGI) or over HTTP and records them under their route template"""
+
+    def __init__(self, server, recorder: Recorder, url: str = None):
+        self.app = server.app
+        self.recorder = recorder
+        self.http = None
+        if url:
+            import httpx
+            self.http = httpx.AsyncClient(base_url=url, timeout=60, limits=httpx.Limits(max_connections=None))
+
+    async def call(self, route: str, method: str, path: str, json_body=None, headers=None, params=None):
+        started = time.perf_counter()
+        if self.http is not None:
+            response = await self.http.request(method, path, json=json_body, headers=headers, params=params)
+            status = response.status_code
+            body = response.json() if response.content else None
+        else:
+            status, _, body = await asgi_request(self.app, method, path, json_body=json_body, headers=headers, params=params)
+        self.recorder.add(route, status, time.perf_counter() - started)
+        return status, body
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+
+
+async def player_session(client: Client, token: str, days: int, codes: dict, deadline: float, rng: random.Random,
+                         cancel_rate: float):
+    auth = {"Authorization": f"Bearer {token}"}
+    first_day = date.today() + timedelta(days=1)
+    while time.perf_counter() < deadline:
+        status, venues = await client.call("GET /venues", "GET", "/api/venues")
+        if status != 200 or not venues:
+            continue
+        venue = rng.choice(venues)
+        await client.call("GET /venues/{venue_id}", "GET", f"/api/venues/{venue['id']}")
+        status, grounds = await client.call("GET /venues/{venue_id}/grounds", "GET", f"/api/venues/{venue['id']}/grounds")
+        if status != 200 or not grounds:
+            continue
+        ground = rng.choice(grounds)
+        slot_date = (first_day + timedelta(days=rng.randrange(days))).isoformat()
+        status, slots = await client.call(
+            "GET /grounds/{ground_id}/slots", "GET", f"/api/grounds/{ground['id']}/slots", params={"slot_date": slot_date}
+        )
+        free = [slot for slot in slots or [] if not slot["is_booked"]] if status == 200 else []
+        if free:
+            status, booking = await client.call(
+                "POST /bookings", "POST", "/api/bookings", json_body={"slot_id": rng.choice(free)["id"]}, headers=auth
+            )
+            if status == 200:
+                codes[venue["owner_id"]].append(booking["verification_code"])
+        status, mine = await client.call("GET /bookings/my", "GET", "/api/bookings/my", headers=auth)
+        pending = [b for b in mine or [] if b["status"] == "pending"] if status == 200 else []
+        if pending and rng.random() < cancel_rate:
+            await client.call("DELETE /bookings/{booking_id}", "DELETE", f"/api/bookings/{rng.choice(pending)['id']}",
+                              headers=auth)
+
+
+async def owner_session(client: Client, email: str, token: str, codes: dict, deadline: float):
+    auth = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        await client.call("GET /owner/dashboard", "GET", "/api/owner/dashboard", headers=auth)
+        await client.call("GET /owner/analytics", "GET", "/api/owner/analytics", headers=auth)
+        await client.call("GET /owner/venues", "GET", "/api/owner/venues", headers=auth)
+        for _ in range(min(5, len(codes[email]))):
+            code = codes[email].pop()
+            status, _ = await client.call("POST /bookings/verify-code", "POST", "/api/bookings/verify-code",
+                                          json_body={"verification_code": code})
+            if status == 200:
+                await client.call("POST /bookings/confirm-verification", "POST", "/api/bookings/confirm-verification",
+                                  json_body={"verification_code": code}, headers=auth)
+        # Dashboard refreshes are paced; a busy desk still polls a few times a second
+        await asyncio.sleep(0.2)
+
+
+async def run(server, args) -> tuple:
+    recorder = Recorder()
+    client = Client(server, recorder, args.url)
+    rng = random.Random(args.seed)
+    codes = defaultdict(list)  # owner email -> codes of bookings made during the run
+
+    def token(email, role, n):
+        return server.create_user_token({"email": email, "id": f"{role}-{n}", "role": role})
+
+    owners = [(f"owner{n}@boxgames-bench.com", token(f"owner{n}@boxgames-bench.com", "owner", n))
+              for n in range(args.owners)]
+    players = [token(f"player{n}@boxgames-bench.com", "player", n) for n in range(args.players)]
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    try:
+        await asyncio.gather(
+            *(player_session(client, t, args.days, codes, deadline, random.Random(rng.random()), args.cancel_rate)
+              for t in players),
+            *(owner_session(client, email, t, codes, deadline) for email, t in owners),
+        )
+    finally:
+        await client.close()
+    elapsed = time.perf_counter() - started
+    return recorder.report(elapsed), elapsed
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(routes: dict, elapsed: float):
+    total = sum(r["count"] for r in routes.values())
+    print(f"{'route':<40} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'5xx':>5}")
+    for route, r in routes.items():
+        print(f"{route:<40} {r['count']:>7} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>5}")
+    print(f"total {total} requests in {elapsed:.1f}s = {total / elapsed:.1f} req/s")
+
+
+def print_comparison(routes: dict, baseline_path: str):
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    print(f"\ncompared with {baseline_path} ({baseline.get('revision')}, {baseline.get('started_at')})")
+    print(f"{'route':<40} {'rps':>16} {'p95 ms':>18} {'p99 ms':>18}")
+    for route, r in routes.items():
+        old = baseline["routes"].get(route)
+        if old is None:
+            continue
+
+        def delta(key):
+            before, after = old[key], r[key]
+            change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+            return f"{after} ({change})"
+
+        print(f"{route:<40} {delta('rps'):>16} {delta('p95_ms'):>18} {delta('p99_ms'):>18}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="database file (defaults to a scratch file)")
+    parser.add_argument("--url", help="drive a running server over HTTP instead of the in-process app")
+    parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded --db")
+    parser.add_argument("--seed-only", action="store_true", help="seed --db and exit")
+    parser.add_argument("--venues", type=int, default=50)
+    parser.add_argument("--grounds-per-venue", type=int, default=4)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--booked-fraction", type=float, default=0.3)
+    parser.add_argument("--players", type=int, default=50, help="concurrent player sessions (and seeded players)")
+    parser.add_argument("--owners", type=int, default=5, help="concurrent owner sessions")
+    parser.add_argument("--cancel-rate", type=float, default=0.1)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="JSON results file (default benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    server = load_server(args.db)
+    dataset = None
+    if not args.no_seed:
+        started = time.perf_counter()
+        dataset = seed(server, args.venues, args.grounds_per_venue, args.days, max(args.players, 1), args.booked_fraction)
+        print(f"seeded {dataset} in {time.perf_counter() - started:.1f}s")
+        if args.seed_only:
+            return
+    args.owners = min(args.owners, dataset["owners"] if dataset else args.owners)
+
+    started_at = datetime.now(timezone.utc)
+    routes, elapsed = asyncio.run(run(server, args))
+    print_report(routes, elapsed)
+
+    result = {
+        "started_at": started_at.isoformat(),
+        "revision": git_revision(),
+        "target": args.url or "in-process",
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "dataset": dataset,
+        "elapsed_seconds": round(elapsed, 3),
+        "routes": routes,
+        "pool": server.db_pool.stats() if not args.url else None,
+    }
+    out = args.out or RESULTS_DIR / f"load-{started_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"results written to {out}")
+    if args.compare:
+        print_comparison(routes, args.compare)
+
+
+if __name__ == "__main__":
+    main()
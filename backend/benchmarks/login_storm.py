@@ -0,0 +1,113 @@
+"""GET /venues latency while logins are being hammered.
+
+A probe task requests GET /api/venues at a steady rate while many clients
+log in concurrently. With --inline, bcrypt runs on the event loop as it did
+before the process pool, for comparison.
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+    python -m benchmarks.login_storm --logins 200 --concurrency 50 --inline
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import asgi_request, load_server, summarize
+
+
+class InlineHasher:
+    """Blocking bcrypt on the event loop (the pre-pool behaviour)"""
+
+    def __init__(self, rounds: int):
+        from password_hashing import make_context
+        self.context = make_context(rounds)
+        self.rounds = rounds
+
+    async def hash(self, password):
+        return self.context.hash(password)
+
+    async def verify_and_update(self, password, password_hash):
+        return self.context.verify_and_update(password, password_hash)
+
+    def stats(self):
+        return {"rounds": self.rounds, "mode": "inline"}
+
+    def shutdown(self):
+        pass
+
+
+def seed_users(server, count: int):
+    password_hash = server.password_hasher.hash
+    digest = asyncio.run(password_hash("Passw0rd!"))
+    with server.db_pool.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (id, fullName, username, email, mobileNumber, password_hash, role, verification_code, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, 'player', ?, '2024-01-01')",
+            [(f"u{i}", f"User {i}", f"user{i}", f"user{i}@bench.local", f"+9190000{i:05d}", digest, f"{i:06d}") for i in range(count)]
+        )
+        conn.execute(
+            "INSERT INTO venues (id, name, location, image_url, owner_id) VALUES ('v1', 'Bench Arena', 'Mumbai', '', 'o')"
+        )
+
+
+async def run(server, logins: int, concurrency: int, probe_interval: float):
+    probe_latencies = []
+    login_latencies = []
+    statuses = {}
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            status, _, _ = await asgi_request(server.app, "GET", "/api/venues")
+            assert status == 200, status
+            probe_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(probe_interval)
+
+    queue = asyncio.Queue()
+    for i in range(logins):
+        queue.put_nowait(i)
+
+    async def client():
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            status, _, _ = await asgi_request(
+                server.app, "POST", "/api/auth/login",
+                json_body={"identifier": f"user{i % 1000}", "password": "Passw0rd!"}
+            )
+            login_latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return elapsed, probe_latencies, login_latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="seconds between GET /venues probes")
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop instead of the process pool")
+    args = parser.parse_args()
+
+    server = load_server()
+    seed_users(server, min(args.logins, 1000))
+    if args.inline:
+        server.password_hasher.shutdown()
+        server.password_hasher = InlineHasher(server.password_hasher.rounds)
+
+    elapsed, probes, logins, statuses = asyncio.run(run(server, args.logins, args.concurrency, args.probe_interval))
+    print(f"mode={'inline' if args.inline else 'process-pool'} hasher={server.password_hasher.stats()}")
+    print(f"logins={args.logins} concurrency={args.concurrency} elapsed={elapsed:.2f}s statuses={statuses}")
+    print(f"login latency       {summarize(logins)}")
+    print(f"GET /venues latency {summarize(probes)}")
+    server.password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
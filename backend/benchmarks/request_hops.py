@@ -0,0 +1,187 @@
+"""Thread hops per request for the routes that run as one unit of work.
+
+Drives each multi-query route through the ASGI app with concurrent clients
+and reports, per route template, the thread dispatches one request makes
+(from the http_request_thread_hops histogram), the time those dispatches
+add on top of the work they run (thread_hop_overhead_seconds) and latency.
+
+It then times the verify-code lookup under the same concurrency four ways:
+five db_find_one calls awaited one by one (a hop each), one run_unit with
+the same five queries, one run_unit with the joined VERIFY_LOOKUP query, and
+lookup_code, which answers active codes from the in-memory code index.
+
+    python -m benchmarks.request_hops --clients 20 --requests 200
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from benchmarks.common import asgi_request, load_server, summarize
+
+OWNER = "owner@bench.local"
+PLAYER = "player@bench.local"
+
+# The booking lookup of the five-query chain the joined query replaced
+ACTIVE_CODE_LOOKUP = "verification_code = ? ORDER BY status = 'pending' DESC, booked_at DESC"
+
+
+def seed(server, bookings: int) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    slot_date = (date.today() + timedelta(days=7)).isoformat()
+    with server.db_pool.transaction() as conn:
+        for n, (email, role) in enumerate(((OWNER, "owner"), (PLAYER, "player"))):
+            conn.execute(
+                "INSERT INTO users (id, fullName, username, email, mobileNumber, password_hash, role, verification_code, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (f"{role}-1", f"Bench {role}", f"bench_{role}", email, f"+9190000000{n}", "x", role, server.allocate_code(conn), now)
+            )
+        conn.execute(
+            "INSERT INTO venues (id, name, location, image_url, owner_id) VALUES ('venue-1', 'Bench Arena', 'Mumbai', '', ?)",
+            (OWNER,)
+        )
+        conn.execute("INSERT INTO grounds (id, name, venue_id) VALUES ('ground-1', 'Ground 1', 'venue-1')")
+        codes = []
+        for n in range(bookings):
+            start = f"{n // 60:02d}:{n % 60:02d}"
+            conn.execute(
+                "INSERT INTO slots (id, ground_id, slot_date, start_time, end_time, price, is_booked) VALUES (?, 'ground-1', ?, ?, ?, 500, 1)",
+                (f"slot-{n}", slot_date, start, start)
+            )
+            code = server.allocate_code(conn)
+            conn.execute(
+                "INSERT INTO bookings (id, user_id, slot_id, verification_code, status, booked_at) VALUES (?, ?, ?, ?, 'pending', ?)",
+                (f"booking-{n}", PLAYER, f"slot-{n}", code, now)
+            )
+            codes.append(code)
+    return {"codes": codes, "slot_date": slot_date}
+
+
+async def drive(server, headers: dict, clients: int, requests: int, make_request):
+    """Run requests calls of make_request(n) across clients concurrent tasks; returns latencies"""
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        for n in counter:
+            method, path, body = make_request(n)
+            started = time.perf_counter()
+            status, _, payload = await asgi_request(server.app, method, path, body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                raise RuntimeError(f"{method} {path} -> {status}: {payload}")
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies
+
+
+def route_hops(server, method: str, route: str) -> tuple:
+    """(hops per request, hop overhead ms per request) from the metrics registry"""
+    metrics = server.metrics
+    state = metrics.HTTP_THREAD_HOPS._values.get((method, route))
+    if not state:
+        return 0.0, 0.0
+    requests = state[1]
+    overhead = sum(s[2] for (r, _), s in metrics.THREAD_HOP_OVERHEAD._values.items() if r == route)
+    return state[2] / requests, overhead * 1000 / requests
+
+
+async def lookup_chain(server, clients: int, requests: int, codes: list) -> dict:
+    def chain(find_one, code):
+        booking = find_one('bookings', ACTIVE_CODE_LOOKUP, (code,))
+        player = find_one('users', 'email = ?', (booking["user_id"],))
+        slot = find_one('slots', 'id = ?', (booking["slot_id"],))
+        ground = find_one('grounds', 'id = ?', (slot["ground_id"],))
+        return booking, player, slot, ground, find_one('venues', 'id = ?', (ground["venue_id"],))
+
+    async def separate(code):
+        booking = await server.db_find_one('bookings', ACTIVE_CODE_LOOKUP, (code,))
+        player = await server.db_find_one('users', 'email = ?', (booking["user_id"],))
+        slot = await server.db_find_one('slots', 'id = ?', (booking["slot_id"],))
+        ground = await server.db_find_one('grounds', 'id = ?', (slot["ground_id"],))
+        return booking, player, slot, ground, await server.db_find_one('venues', 'id = ?', (ground["venue_id"],))
+
+    async def unit(code):
+        return await server.run_unit(lambda uow: chain(uow.find_one, code))
+
+    async def joined(code):
+        return await server.run_unit(lambda uow: uow.fetch_one(server.VERIFY_LOOKUP, (code,)))
+
+    results = {}
+    for name, lookup in (("separate", separate), ("unit", unit), ("joined", joined), ("index", server.lookup_code)):
+        latencies = []
+        counter = iter(range(requests))
+
+        async def client():
+            for n in counter:
+                started = time.perf_counter()
+                await lookup(codes[n % len(codes)])
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        results[name] = {**summarize(latencies), "per_s": round(requests / (time.perf_counter() - started), 1)}
+    return results
+
+
+async def run(server, args) -> list:
+    data = seed(server, args.requests)
+    codes, slot_date = data["codes"], data["slot_date"]
+    auth = {"Authorization": f"Bearer {server.create_user_token({'email': OWNER, 'id': 'owner-1', 'role': 'owner'})}"}
+    base = datetime.now(timezone.utc).timestamp()
+
+    scenarios = [
+        ("POST", "/api/bookings/verify-code",
+         lambda n: ("POST", "/api/bookings/verify-code", {"verification_code": codes[n % len(codes)]})),
+        ("POST", "/api/bookings/confirm-verification",
+         lambda n: ("POST", "/api/bookings/confirm-verification", {"verification_code": codes[n]})),
+        ("POST", "/api/owner/slots",
+         lambda n: ("POST", "/api/owner/slots", {"ground_id": "ground-1", "slot_date": "2099-01-01",
+                                                 "start_time": f"{n // 60:02d}:{n % 60:02d}", "end_time": "23:59", "price": 500})),
+        ("PUT", "/api/owner/grounds/{ground_id}/exceptions",
+         lambda n: ("PUT", "/api/owner/grounds/ground-1/exceptions", {"slot_date": slot_date, "start_time": "06:00", "price": n})),
+        ("GET", "/api/owner/grounds/{ground_id}/schedules",
+         lambda n: ("GET", "/api/owner/grounds/ground-1/schedules", None)),
+        ("POST", "/api/owner/grounds",
+         lambda n: ("POST", "/api/owner/grounds", {"name": f"Ground {base}-{n}", "venue_id": "venue-1"})),
+    ]
+    rows = []
+    for method, route, make_request in scenarios:
+        latencies = await drive(server, auth, args.clients, args.requests, make_request)
+        hops, overhead_ms = route_hops(server, method, route)
+        rows.append((f"{method} {route}", hops, overhead_ms, summarize(latencies)))
+
+    # delete_ground needs grounds to delete: the ones created above
+    with server.db_pool.connection() as conn:
+        created = [row[0] for row in conn.execute("SELECT id FROM grounds WHERE id != 'ground-1'")]
+    latencies = await drive(server, auth, args.clients, len(created),
+                            lambda n: ("DELETE", f"/api/owner/grounds/{created[n]}", None))
+    hops, overhead_ms = route_hops(server, "DELETE", "/api/owner/grounds/{ground_id}")
+    rows.append(("DELETE /api/owner/grounds/{ground_id}", hops, overhead_ms, summarize(latencies)))
+
+    print(f"{'route':<48} {'hops':>5} {'hop ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for route, hops, overhead_ms, latency in rows:
+        print(f"{route:<48} {hops:>5.1f} {overhead_ms:>8.3f} {latency['p50_ms']:>8.2f} {latency['p99_ms']:>8.2f}")
+
+    # The confirm scenario above verified the seeded codes; book them again for the lookups
+    with server.db_pool.transaction() as conn:
+        conn.execute("UPDATE bookings SET status = 'pending', verified_at = NULL")
+    server.code_index.max_entries = len(codes)
+    chain = await lookup_chain(server, args.clients, args.requests * 5, codes)
+    print("\nverify-code lookup (5 queries, one hop each / one unit; 1 joined query; code index)")
+    for name, result in chain.items():
+        print(f"  {name:<9} p50 {result['p50_ms']:>7.2f}ms  p99 {result['p99_ms']:>7.2f}ms  {result['per_s']:>8.1f}/s")
+    print(f"  code index {server.code_index.stats()}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    args = parser.parse_args()
+    asyncio.run(run(load_server(), args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Idle subscriber capacity and fan-out latency of the slot event stream.
+
+Opens --subscribers Server-Sent Events streams through the ASGI app in one
+process, spread over --topics venue/date topics, and reports:
+
+* memory per idle subscriber (RSS growth) and the time to connect them all
+* CPU used by the process while every subscriber sits idle
+* fan-out: how long one delta takes to reach every subscriber of a topic,
+  published directly and through POST /api/owner/slots
+
+    python -m benchmarks.slot_events --subscribers 10000 --topics 1
+    python -m benchmarks.slot_events --subscribers 10000 --topics 100 --idle 30
+"""
+import argparse
+import asyncio
+import os
+import resource
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import asgi_request, load_server, summarize
+
+OWNER = "owner@bench.local"
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def seed(server, venues: int):
+    with server.db_pool.transaction() as conn:
+        conn.execute(
+            "INSERT INTO users (id, fullName, username, email, mobileNumber, password_hash, role, verification_code, created_at) "
+            "VALUES ('owner-1', 'Bench Owner', 'bench_owner', ?, '+919000000000', 'x', 'owner', ?, 'now')",
+            (OWNER, server.allocate_code(conn))
+        )
+        conn.executemany(
+            "INSERT INTO venues (id, name, location, image_url, owner_id) VALUES (?, ?, 'Mumbai', '', ?)",
+            [(f"venue-{n}", f"Venue {n}", OWNER) for n in range(venues)]
+        )
+        conn.executemany(
+            "INSERT INTO grounds (id, name, venue_id) VALUES (?, 'Ground', ?)",
+            [(f"ground-{n}", f"venue-{n}") for n in range(venues)]
+        )
+
+
+class Subscriber:
+    """One in-process SSE client that notes when each marker arrives"""
+
+    def __init__(self, server, venue_id: str, slot_date: str, arrivals: dict):
+        self.server = server
+        self.arrivals = arrivals
+        self.path = f"/api/venues/{venue_id}/slot-events"
+        self.query = f"date={slot_date}".encode()
+        self.connected = asyncio.Event()
+        self.closed = asyncio.Event()
+
+    async def run(self):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": self.path, "raw_path": self.path.encode(), "query_string": self.query,
+            "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self.closed.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            body = message.get("body", b"")
+            if message["type"] == "http.response.body" and body:
+                self.connected.set()
+                if b"marker-" in body:
+                    marker = body.split(b"marker-", 1)[1].split(b'"', 1)[0].decode()
+                    self.arrivals[marker].arrived()
+
+        await self.server.app(scope, receive, send)
+
+
+class Arrivals:
+    """Counts deliveries of one marker and wakes the benchmark once every subscriber has it"""
+
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.count = 0
+        self.first = self.last = None
+        self.done = asyncio.Event()
+
+    def arrived(self):
+        now = time.perf_counter()
+        self.first = self.first or now
+        self.last = now
+        self.count += 1
+        if self.count == self.expected:
+            self.done.set()
+
+
+async def run(server, args):
+    seed(server, args.topics)
+    slot_date = (date.today() + timedelta(days=3)).isoformat()
+    hub = server.slot_hub
+
+    baseline = rss_mb()
+    started = time.perf_counter()
+    arrivals = {}
+    subscribers = [Subscriber(server, f"venue-{n % args.topics}", slot_date, arrivals) for n in range(args.subscribers)]
+    tasks = [asyncio.create_task(s.run()) for s in subscribers]
+    for subscriber in subscribers:
+        await subscriber.connected.wait()
+    connect_s = time.perf_counter() - started
+    per_subscriber_kb = (rss_mb() - baseline) * 1024 / args.subscribers
+    print(f"subscribers: {hub.stats()['subscribers']} on {hub.stats()['topics']} topics, "
+          f"connected in {connect_s:.2f}s, {per_subscriber_kb:.1f} KB RSS each")
+
+    cpu = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_before = cpu.ru_utime + cpu.ru_stime
+    await asyncio.sleep(args.idle)
+    cpu = resource.getrusage(resource.RUSAGE_SELF)
+    print(f"idle {args.idle:.0f}s: {(cpu.ru_utime + cpu.ru_stime - cpu_before) / args.idle * 100:.1f}% of one CPU "
+          f"(heartbeat every {hub.heartbeat:.0f}s)")
+
+    watching = sum(1 for s in subscribers if s.path == "/api/venues/venue-0/slot-events")
+    publish_times, latencies = [], []
+    for n in range(args.rounds):
+        marker = arrivals[f"direct{n}"] = Arrivals(watching)
+        started = time.perf_counter()
+        hub.publish("slot.created", "venue-0", slot_date, ground_id="ground-0", slot={"id": f"marker-direct{n}"})
+        publish_times.append(time.perf_counter() - started)
+        await asyncio.wait_for(marker.done.wait(), 60)
+        latencies.append(marker.last - started)
+    print(f"direct publish to {watching} subscribers: publish() {summarize(publish_times)['p50_ms']:.1f}ms p50, "
+          f"all delivered {summarize(latencies)['p50_ms']:.1f}ms p50 / {summarize(latencies)['max_ms']:.1f}ms max")
+
+    auth = {"Authorization": f"Bearer {server.create_user_token({'email': OWNER, 'id': 'owner-1', 'role': 'owner'})}"}
+    first, last = [], []
+    for n in range(args.rounds):
+        marker = arrivals[f"route{n}"] = Arrivals(watching)
+        started = time.perf_counter()
+        status, _, body = await asgi_request(server.app, "POST", "/api/owner/slots", {
+            "ground_id": "ground-0", "slot_date": slot_date, "start_time": f"marker-route{n}", "end_time": "-", "price": 1
+        }, headers=auth)
+        if status != 200:
+            raise RuntimeError(f"POST /api/owner/slots -> {status}: {body}")
+        await asyncio.wait_for(marker.done.wait(), 60)
+        first.append(marker.first - started)
+        last.append(marker.last - started)
+    print(f"POST /api/owner/slots to {watching} subscribers: first {summarize(first)['p50_ms']:.1f}ms, "
+          f"last {summarize(last)['p50_ms']:.1f}ms p50")
+
+    for subscriber in subscribers:
+        subscriber.closed.set()
+    await asyncio.gather(*tasks)
+    print(f"after disconnect: {hub.stats()['subscribers']} subscribers, {hub.stats()['topics']} topics")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--topics", type=int, default=1, help="venues the subscribers are spread over (one date each)")
+    parser.add_argument("--idle", type=float, default=10.0, help="seconds to measure idle CPU")
+    parser.add_argument("--rounds", type=int, default=5, help="fan-out measurements per path")
+    args = parser.parse_args()
+    os.environ.setdefault("SLOT_EVENTS_MAX_SUBSCRIBERS", str(args.subscribers))
+    asyncio.run(run(load_server(), args))
+
+
+if __name__ == "__main__":
+    main()
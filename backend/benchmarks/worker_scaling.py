@@ -0,0 +1,209 @@
+"""Throughput of the real HTTP server as uvicorn workers go from 1 to N.
+
+Each run starts `uvicorn server:app --workers N` on one scratch database,
+drives a read-heavy player mix (venue list, availability, my bookings) from
+several client processes, and reports requests/second and latency.
+
+    python -m benchmarks.worker_scaling --max-workers 4 --duration 10
+    python -m benchmarks.worker_scaling --workers 1 2 4 8 --out scaling.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, summarize
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path: str, workers: int, port: int):
+    env = dict(
+        os.environ,
+        DB_PATH=db_path,
+        BCRYPT_ROUNDS="4",
+        BCRYPT_WORKERS="0",
+        EPHEMERAL_STORE="sqlite",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"Server with {workers} workers did not become healthy")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def seed(base: str, players: int, days: int) -> dict:
+    """Owner, one venue with four grounds, hourly slots, and players with a booking each"""
+    with httpx.Client(base_url=base, timeout=30) as client:
+        def register(number, role):
+            name = f"{role}{number}"
+            response = client.post("/api/auth/register", json={
+                "fullName": "Bench User",
+                "username": name,
+                "mobileNumber": f"+91{9000000000 + number + (0 if role == 'player' else 500000)}",
+                "email": f"{name}@boxgames-bench.com",
+                "password": "Passw0rd!",
+                "role": role,
+            })
+            response.raise_for_status()
+            return response.json()["access_token"]
+
+        owner = {"Authorization": f"Bearer {register(0, 'owner')}"}
+        venue = client.post("/api/owner/venues", headers=owner,
+                            json={"name": "Bench Arena", "location": "Bench", "image_url": ""}).json()
+        start = date.today() + timedelta(days=1)
+        slot_ids = []
+        for number in range(4):
+            ground = client.post("/api/owner/grounds", headers=owner,
+                                 json={"name": f"Ground {number}", "venue_id": venue["id"]}).json()
+            client.post("/api/owner/slots/bulk", headers=owner, json={"template": {
+                "ground_ids": [ground["id"]],
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=days - 1)).isoformat(),
+                "open_time": "06:00",
+                "close_time": "22:00",
+                "duration_minutes": 60,
+                "price": 500,
+            }}).raise_for_status()
+            slots = client.get(f"/api/grounds/{ground['id']}/slots", params={"limit": 200}).json()
+            slot_ids += [slot["id"] for slot in slots]
+
+        tokens = []
+        for number in range(players):
+            token = register(number, "player")
+            client.post("/api/bookings", headers={"Authorization": f"Bearer {token}"},
+                        json={"slot_id": slot_ids[number]}).raise_for_status()
+            tokens.append(token)
+    return {"venue_id": venue["id"], "from": start.isoformat(), "tokens": tokens}
+
+
+async def _drive(base: str, fixture: dict, concurrency: int, duration: float):
+    samples = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    venue_id = fixture["venue_id"]
+
+    async def worker(number: int):
+        nonlocal errors
+        headers = {"Authorization": f"Bearer {fixture['tokens'][number % len(fixture['tokens'])]}"}
+        requests = [
+            ("/api/venues", None, None),
+            (f"/api/venues/{venue_id}/availability", {"from": fixture["from"], "to": fixture["from"]}, None),
+            ("/api/bookings/my", None, headers),
+        ]
+        async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+            turn = number
+            while time.perf_counter() < deadline:
+                path, params, request_headers = requests[turn % len(requests)]
+                turn += 1
+                started = time.perf_counter()
+                response = await client.get(path, params=params, headers=request_headers)
+                samples.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return samples, errors
+
+
+def client_process(base, fixture, concurrency, duration, results):
+    results.put(asyncio.run(_drive(base, fixture, concurrency, duration)))
+
+
+def measure(base: str, fixture: dict, clients: int, concurrency: int, duration: float) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    procs = [
+        context.Process(target=client_process, args=(base, fixture, concurrency, duration, results))
+        for _ in range(clients)
+    ]
+    for proc in procs:
+        proc.start()
+    samples, errors = [], 0
+    for _ in procs:
+        part, part_errors = results.get()
+        samples += part
+        errors += part_errors
+    for proc in procs:
+        proc.join()
+    return {"requests": len(samples), "errors": errors, "rps": round(len(samples) / duration, 1),
+            "latency": summarize(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", help="worker counts to try (default 1..--max-workers)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per load generator")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    counts = args.workers or list(range(1, args.max_workers + 1))
+    db_path = os.path.join(tempfile.mkdtemp(prefix="boxgames-scaling-"), "bench.db")
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+
+    proc = start_server(db_path, 1, port)
+    try:
+        fixture = seed(base, args.players, args.days)
+    finally:
+        stop_server(proc)
+
+    runs = []
+    for workers in counts:
+        proc = start_server(db_path, workers, port)
+        try:
+            result = measure(base, fixture, args.clients, args.concurrency, args.duration)
+        finally:
+            stop_server(proc)
+        result["workers"] = workers
+        runs.append(result)
+        latency = result["latency"]
+        print(f"workers={workers:<3} {result['rps']:>9.1f} req/s  p50={latency['p50_ms']}ms "
+              f"p95={latency['p95_ms']}ms p99={latency['p99_ms']}ms errors={result['errors']}")
+
+    baseline = runs[0]["rps"] or 1
+    for result in runs:
+        result["speedup"] = round(result["rps"] / baseline, 2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump({"cpu_count": os.cpu_count(), "duration": args.duration, "runs": runs}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Collision-free allocation of numeric verification codes.
+
+Codes are a keyed permutation (a Feistel network with cycle walking) of a
+persisted counter, so every allocation yields a fresh code in O(1) without
+probing the users or bookings tables. Each code length has its own secret
+and counter. Codes released by verified, cancelled or expired bookings are
+handed out again once the fresh sequence for that length is used up; with
+both exhausted, allocation fails fast with CodeSpaceExhausted. Codes of
+pending bookings whose slot has ended come back through BookingExpirer, a
+background pass of short batched transactions.
+
+    python code_allocator.py --status
+    python code_allocator.py --expire   # release codes of past, unverified bookings
+"""
+import argparse
+import hashlib
+import hmac
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+FEISTEL_ROUNDS = 4
+
+
+class CodeSpaceExhausted(Exception):
+    """Raised when every code of the configured length is in use"""
+
+
+def _feistel(secret: bytes, value: int, half_bits: int) -> int:
+    mask = (1 << half_bits) - 1
+    left, right = value >> half_bits, value & mask
+    for round_no in range(FEISTEL_ROUNDS):
+        digest = hmac.new(secret, f"{round_no}:{right}".encode(), hashlib.sha256).digest()
+        left, right = right, left ^ (int.from_bytes(digest[:8], "big") & mask)
+    return (left << half_bits) | right
+
+
+def permute(secret: bytes, index: int, space: int) -> int:
+    """Bijection on [0, space): Feistel over the next even bit width, cycle-walked back into range"""
+    half_bits = max(1, ((space - 1).bit_length() + 1) // 2)
+    value = index
+    while True:
+        value = _feistel(secret, value, half_bits)
+        if value < space:
+            return value
+
+
+def allocate(conn, length: int = 6) -> str:
+    """Hand out an unused code; must run inside the caller's write transaction"""
+    return allocate_many(conn, 1, length)[0]
+
+
+def allocate_many(conn, count: int, length: int = 6) -> list:
+    """Hand out count unused codes with one sequence read and write; same rules as allocate()"""
+    space = 10 ** length
+    row = conn.execute("SELECT secret, next_index FROM code_sequences WHERE length = ?", (length,)).fetchone()
+    if row is None:
+        row = (secrets.token_hex(32), 0)
+        conn.execute("INSERT INTO code_sequences (length, secret, next_index) VALUES (?, ?, ?)", (length, *row))
+    secret, index = bytes.fromhex(row[0]), row[1]
+
+    codes = []
+    # Databases created after the allocator have no legacy codes to skip
+    check_legacy = conn.execute("SELECT 1 FROM legacy_codes LIMIT 1").fetchone() is not None
+    while index < space and len(codes) < count:
+        candidate = str(permute(secret, index, space)).zfill(length)
+        index += 1
+        if not check_legacy or not conn.execute("SELECT 1 FROM legacy_codes WHERE code = ?", (candidate,)).fetchone():
+            codes.append(candidate)
+    conn.execute("UPDATE code_sequences SET next_index = ? WHERE length = ?", (index, length))
+
+    # Only the released pool from here; expiring stale bookings is left to
+    # BookingExpirer rather than done inside this write transaction
+    while len(codes) < count:
+        reused = conn.execute(
+            "SELECT code FROM released_codes WHERE length = ? ORDER BY released_at LIMIT 1", (length,)
+        ).fetchone()
+        if reused is None:
+            raise CodeSpaceExhausted(f"All {space} codes of length {length} are in use")
+        conn.execute("DELETE FROM released_codes WHERE code = ?", (reused[0],))
+        codes.append(reused[0])
+    return codes
+
+
+def release(conn, code: str):
+    """Make a booking's code available again; call after the booking stops being pending"""
+    if not code:
+        return
+    # User codes are permanent, and a reused code may already back a newer
+    # pending booking; never recycle either
+    if conn.execute("SELECT 1 FROM users WHERE verification_code = ?", (code,)).fetchone():
+        return
+    if conn.execute("SELECT 1 FROM bookings WHERE verification_code = ? AND status = 'pending'", (code,)).fetchone():
+        return
+    conn.execute(
+        "INSERT OR IGNORE INTO released_codes (code, length, released_at) VALUES (?, ?, ?)",
+        (code, len(code), datetime.now(timezone.utc).isoformat())
+    )
+
+
+def expire_stale_bookings(conn, now: str = None, limit: int = 500) -> int:
+    """Mark up to limit pending bookings whose slot has ended as expired and release their codes.
+
+    Run it in a loop of short transactions until it returns less than limit.
+    """
+    now = now or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M")
+    # Walk only the pending bookings (partial idx_bookings_pending), then
+    # look each slot up by id; CROSS JOIN keeps SQLite from starting at slots
+    expired = conn.execute(
+        """
+        UPDATE bookings SET status = 'expired'
+        WHERE id IN (
+            SELECT b.id FROM bookings b CROSS JOIN slots s ON s.id = b.slot_id
+            WHERE b.status = 'pending' AND s.slot_date <= ? AND (s.slot_date || 'T' || s.end_time) < ?
+            LIMIT ?
+        )
+        RETURNING verification_code
+        """,
+        (now[:10], now, limit)
+    ).fetchall()
+    for (code,) in expired:
+        release(conn, code)
+    return len(expired)
+
+
+class BookingExpirer:
+    """Expires stale pending bookings in batches, one short write transaction each"""
+
+    def __init__(self, pool, batch_size: int = 500, pause: float = 0.05):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.pause = pause
+        self.expired = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> int:
+        expired = 0
+        while not self._stop.is_set():
+            with self.pool.transaction() as conn:
+                batch = expire_stale_bookings(conn, limit=self.batch_size)
+            expired += batch
+            if batch < self.batch_size:
+                break
+            # Let queued writers in between batches
+            time.sleep(self.pause)
+        self.expired += expired
+        return expired
+
+    def start(self, interval: float = 300.0):
+        """Run the expiry every interval seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def _run():
+            while not self._stop.wait(interval):
+                try:
+                    self.run_once()
+                except Exception:
+                    logger.exception("Expiring stale bookings failed")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_run, name="booking-expirer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+
+def main():
+    from migrations import DB_PATH, migrate
+
+    parser = argparse.ArgumentParser(description="Inspect the verification code allocator")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--status", action="store_true")
+    parser.add_argument("--expire", action="store_true", help="expire past pending bookings and release their codes")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        migrate(conn)
+        if args.expire:
+            count, batch = 0, None
+            while batch is None or batch == 500:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    batch = expire_stale_bookings(conn, limit=500)
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+                count += batch
+            print(f"Expired {count} bookings")
+        for length, next_index in conn.execute("SELECT length, next_index FROM code_sequences ORDER BY length"):
+            released = conn.execute("SELECT COUNT(*) FROM released_codes WHERE length = ?", (length,)).fetchone()[0]
+            print(f"length {length}: {next_index}/{10 ** length} fresh codes used, {released} released for reuse")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Bounded in-memory index of active booking verification codes.
+
+Maps the code of a pending booking whose slot has not ended to the row the
+verify-code route answers with (booking, player, slot, ground and venue
+fields), so checking a code at the counter is a dictionary lookup. The index
+fills when this process creates a booking or looks a code up in the
+database, and keeps the most recently used max_entries codes.
+
+Cancelling or confirming a booking bumps the code's resource version (see
+booking_code_resource in server.py). The VersionTracker listener drops the
+code here at once in the process that made the change, and in every other
+worker on its next refresh. A code that is not in the index is simply looked
+up in the database.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+def _now() -> str:
+    # Same format expire_stale_bookings compares slot ends against
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M")
+
+
+def is_active(row: dict, now: str = None) -> bool:
+    """A pending booking whose slot has not ended yet"""
+    if row.get("status") != "pending" or row.get("slot_date") is None:
+        return False
+    return f"{row['slot_date']}T{row['end_time']}" >= (now or _now())
+
+
+class CodeIndex:
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # code -> verify row
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, code: str):
+        """The active row for a code, or None (not indexed, or its slot has ended)"""
+        with self._lock:
+            row = self._entries.get(code)
+            if row is not None and not is_active(row):
+                del self._entries[code]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(code)
+            self.hits += 1
+            return dict(row)
+
+    def put(self, code: str, row: dict):
+        """Index a row if it is active; anything else is left to the database"""
+        if self.max_entries <= 0 or not is_active(row):
+            return
+        with self._lock:
+            self._entries[code] = dict(row)
+            self._entries.move_to_end(code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, code: str):
+        with self._lock:
+            if self._entries.pop(code, None) is not None:
+                self.invalidations += 1
+
+    def invalidate(self, resources):
+        """VersionTracker listener: drop the codes whose resource version moved"""
+        for resource in resources:
+            if resource.startswith("code:"):
+                self.discard(resource[len("code:"):])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
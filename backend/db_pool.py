@@ -0,0 +1,307 @@
+"""SQLite connection pool used by the API's db_* helpers.
+
+Every worker thread checks out its own connection, so reads run concurrently
+with writes under WAL instead of queueing behind one shared handle.
+
+Pooled connections time every statement they run, whoever runs it: the
+pool's observers are called with (sql, params, rows, seconds) once the
+statement's rows have been consumed (or its cursor is re-used or dropped),
+so the time includes fetching, not just the first step.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA profiles applied to every pooled connection
+PRAGMA_PROFILES = {
+    "durable": {"synchronous": "FULL", "cache_size": -16000, "mmap_size": 0, "busy_timeout": 5000},
+    "balanced": {"synchronous": "NORMAL", "cache_size": -64000, "mmap_size": 268435456, "busy_timeout": 5000},
+    "fast": {"synchronous": "OFF", "cache_size": -262144, "mmap_size": 1073741824, "busy_timeout": 10000},
+}
+
+PRAGMA_ENV = {
+    "synchronous": "DB_SYNCHRONOUS",
+    "cache_size": "DB_CACHE_SIZE",
+    "mmap_size": "DB_MMAP_SIZE",
+    "busy_timeout": "DB_BUSY_TIMEOUT",
+}
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection frees up within the checkout timeout"""
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Reports each statement, with the time spent executing and fetching it, to the connection's observers"""
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._statement = None  # [sql, params, rows fetched, seconds] until reported
+
+    def execute(self, sql, parameters=()):
+        self._report()
+        self._statement = [sql, parameters, 0, 0.0]
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._statement[3] += time.perf_counter() - started
+
+    def executemany(self, sql, seq_of_parameters):
+        self._report()
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            # Parameters of a batch are not kept; observers get None
+            self._notify(sql, None, max(self.rowcount, 0), time.perf_counter() - started)
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            if self._statement is not None:
+                self._statement[3] += time.perf_counter() - started
+
+    def fetchone(self):
+        row = self._timed_fetch(super().fetchone)
+        if row is None:
+            self._report()
+        elif self._statement is not None:
+            self._statement[2] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._report()
+        elif self._statement is not None:
+            self._statement[2] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(super().fetchall)
+        if self._statement is not None:
+            self._statement[2] += len(rows)
+        self._report()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._report()
+        super().close()
+
+    def __del__(self):
+        self._report()
+
+    def _report(self):
+        statement, self._statement = self._statement, None
+        if statement is not None:
+            sql, params, rows, seconds = statement
+            # Statements without a result set report the rows they changed
+            self._notify(sql, params, rows if self.description else max(self.rowcount, 0), seconds)
+
+    def _notify(self, sql, params, rows, seconds):
+        for observer in self.connection.observers:
+            try:
+                observer(sql, params, rows, seconds)
+            except Exception:
+                logger.exception("Query observer failed")
+
+
+class TimedConnection(sqlite3.Connection):
+    observers = ()  # replaced by the pool's observer list
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionPool:
+    def __init__(self, path: str, size: int = 8, profile: str = "balanced", overrides: dict = None, timeout: float = 30.0):
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Unknown PRAGMA profile: {profile}")
+        self.path = path
+        self.size = max(1, size)
+        self.profile = profile
+        self.pragmas = {**PRAGMA_PROFILES[profile], **(overrides or {})}
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._in_use = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self.on_connect = []  # called with every new connection, e.g. to ATTACH more databases
+        self.observers = []  # called with (sql, params, rows, seconds) for every statement run
+
+    @classmethod
+    def from_env(cls, path: str):
+        """Build a pool from DB_POOL_SIZE, DB_PRAGMA_PROFILE and the per-PRAGMA overrides"""
+        overrides = {}
+        for pragma, env_name in PRAGMA_ENV.items():
+            value = os.environ.get(env_name)
+            if value:
+                overrides[pragma] = value if pragma == "synchronous" else int(value)
+        return cls(
+            path,
+            size=int(os.environ.get("DB_POOL_SIZE", 8)),
+            profile=os.environ.get("DB_PRAGMA_PROFILE", "balanced"),
+            overrides=overrides,
+            timeout=float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        )
+
+    def _connect(self):
+        # Autocommit mode: single statements commit on their own, multi-statement
+        # work goes through transaction() with an explicit BEGIN IMMEDIATE
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=self.pragmas["busy_timeout"] / 1000,
+            factory=TimedConnection,
+        )
+        conn.observers = self.observers
+        conn.execute("PRAGMA journal_mode=WAL")
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma}={value}")
+        for hook in self.on_connect:
+            hook(conn)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._waits += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the current thread (re-entrant within a thread)"""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        conn = self._acquire()
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements in one write transaction, committed on success"""
+        with self.connection() as conn:
+            if conn.in_transaction:
+                # Nested use joins the outer transaction
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    @contextmanager
+    def snapshot(self):
+        """Run several reads against one consistent snapshot (a read transaction)"""
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.rollback()
+
+    def dedicated_connection(self):
+        """Open a connection outside the pool and serve it to this thread's connection() calls"""
+        conn = self._connect()
+        self._local.conn = conn
+        return conn
+
+    def release_dedicated(self, conn):
+        self._local.conn = None
+        conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": len(self._all),
+                "in_use": self._in_use,
+                "idle": len(self._all) - self._in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "total_wait_ms": round(self._total_wait * 1000, 3),
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+                "avg_wait_ms": round(self._total_wait * 1000 / self._waits, 3) if self._waits else 0.0,
+                "profile": self.profile,
+                "pragmas": dict(self.pragmas),
+            }
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
@@ -0,0 +1,310 @@
+"""Short-lived key/value state with real TTLs (password reset codes, OTPs, holds).
+
+Two backends share one interface:
+
+* MemoryStore  - per-process dict, fastest, but invisible to other workers
+* SQLiteStore  - rows in the app database, shared by every worker on the box
+
+Expired entries are dropped lazily on read and by a background sweeper, and
+each store is capped at max_entries (soonest-to-expire entries go first).
+Values must be JSON-serializable.
+"""
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EphemeralStore:
+    shared = False  # whether other workers see this store's entries
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.expired = 0
+        self.evicted = 0
+        self._sweeper = None
+        self._stop = threading.Event()
+
+    def get(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> bool:
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+    def count(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def changed_since(self, namespaces, seq: int) -> tuple:
+        """Live entries of the namespaces written after seq, for mirrors of a shared store.
+
+        Returns ({(namespace, key): (value, expires_at)}, the seq to pass next time).
+        """
+        raise NotImplementedError
+
+    def get_many(self, keys) -> dict:
+        """Look up several (namespace, key) pairs; returns {(namespace, key): value} for live entries"""
+        found = {}
+        for namespace, key in keys:
+            value = self.get(namespace, key)
+            if value is not None:
+                found[(namespace, key)] = value
+        return found
+
+    def pop(self, namespace: str, key: str):
+        value = self.get(namespace, key)
+        if value is not None:
+            self.delete(namespace, key)
+        return value
+
+    def start_sweeper(self, interval: float = 30.0):
+        """Purge expired entries every interval seconds on a daemon thread"""
+        if self._sweeper is not None:
+            return
+
+        def _run():
+            while not self._stop.wait(interval):
+                try:
+                    self.purge_expired()
+                except Exception:
+                    logger.exception("Ephemeral store sweep failed")
+
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=_run, name="ephemeral-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+        self._sweeper = None
+
+
+class MemoryStore(EphemeralStore):
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 100000):
+        super().__init__(max_entries)
+        self._data = {}  # (namespace, key) -> (expires_at, value)
+        self._expiries = []  # heap of (expires_at, namespace, key); may hold stale entries
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._data[(namespace, key)]
+                self.expired += 1
+                return None
+            return json.loads(entry[1])
+
+    def set(self, namespace: str, key: str, value, ttl: float):
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._data[(namespace, key)] = (expires_at, json.dumps(value))
+            heapq.heappush(self._expiries, (expires_at, namespace, key))
+            while len(self._data) > self.max_entries:
+                self._pop_soonest(evicting=True)
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            return self._data.pop((namespace, key), None) is not None
+
+    def pop(self, namespace: str, key: str):
+        # One lock acquisition, so concurrent callers cannot both get the value
+        with self._lock:
+            entry = self._data.pop((namespace, key), None)
+            if entry is not None and entry[0] <= time.time():
+                self.expired += 1
+                entry = None
+        return json.loads(entry[1]) if entry is not None else None
+
+    def count(self, namespace: str) -> int:
+        now = time.time()
+        with self._lock:
+            return sum(1 for (ns, _), entry in self._data.items() if ns == namespace and entry[0] > now)
+
+    def _pop_soonest(self, evicting: bool):
+        expires_at, namespace, key = heapq.heappop(self._expiries)
+        entry = self._data.get((namespace, key))
+        if entry is not None and entry[0] == expires_at:
+            del self._data[(namespace, key)]
+            if evicting:
+                self.evicted += 1
+            else:
+                self.expired += 1
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            before = len(self._data)
+            while self._expiries and self._expiries[0][0] <= now:
+                self._pop_soonest(evicting=False)
+            # Drop heap entries left behind by overwrites and deletes
+            if len(self._expiries) > 2 * len(self._data) + 1024:
+                self._expiries = [(e[0], ns, k) for (ns, k), e in self._data.items()]
+                heapq.heapify(self._expiries)
+            return before - len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+class SQLiteStore(EphemeralStore):
+    """Entries live in the ephemeral_kv table (created by the migrations).
+
+    Every write takes the next seq, so mirrors such as the token revocation
+    list read only what changed since their last refresh.
+
+    Writes check max_entries against a row count cached per worker (the last
+    exact count plus this worker's writes since); only when that passes the
+    cap does a write count and trim the table. The sweeper recounts exactly,
+    which also picks up rows written by other workers.
+    """
+    backend = "sqlite"
+    shared = True
+
+    def __init__(self, pool, max_entries: int = 100000):
+        super().__init__(max_entries)
+        self.pool = pool
+        self._rows = None  # upper bound on the row count; None until first counted
+
+    def get(self, namespace: str, key: str):
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM ephemeral_kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                conn.execute(
+                    "DELETE FROM ephemeral_kv WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                    (namespace, key, time.time())
+                )
+                self.expired += 1
+                return None
+            return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value, ttl: float):
+        with self.pool.connection() as conn:
+            # MAX(seq) is answered from idx_ephemeral_kv_seq, not a scan
+            conn.execute(
+                "INSERT INTO ephemeral_kv (namespace, key, value, expires_at, seq) "
+                "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM ephemeral_kv)) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET "
+                "value = excluded.value, expires_at = excluded.expires_at, seq = excluded.seq",
+                (namespace, key, json.dumps(value), time.time() + ttl)
+            )
+        # Overwrites count as inserts too, so this only ever overestimates
+        if self._rows is not None:
+            self._rows += 1
+        if self._rows is None or self._rows > self.max_entries:
+            with self.pool.transaction() as conn:
+                self._trim(conn)
+
+    def _trim(self, conn):
+        """Evict the soonest-to-expire rows over max_entries and refresh the cached row count"""
+        rows = conn.execute("SELECT COUNT(*) FROM ephemeral_kv").fetchone()[0]
+        over = rows - self.max_entries
+        if over > 0:
+            conn.execute(
+                "DELETE FROM ephemeral_kv WHERE rowid IN (SELECT rowid FROM ephemeral_kv ORDER BY expires_at LIMIT ?)",
+                (over,)
+            )
+            self.evicted += over
+            rows -= over
+        self._rows = rows
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "DELETE FROM ephemeral_kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).rowcount > 0
+
+    def get_many(self, keys) -> dict:
+        # One round trip; expired rows are left for the sweeper
+        keys = list(keys)
+        if not keys:
+            return {}
+        match = " OR ".join(["(namespace = ? AND key = ?)"] * len(keys))
+        params = [part for pair in keys for part in pair]
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT namespace, key, value FROM ephemeral_kv WHERE ({match}) AND expires_at > ?",
+                (*params, time.time())
+            ).fetchall()
+        return {(namespace, key): json.loads(value) for namespace, key, value in rows}
+
+    def count(self, namespace: str) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM ephemeral_kv WHERE namespace = ? AND expires_at > ?", (namespace, time.time())
+            ).fetchone()[0]
+
+    def changed_since(self, namespaces, seq: int) -> tuple:
+        namespaces = list(namespaces)
+        marks = ",".join(["?"] * len(namespaces))
+        with self.pool.snapshot() as conn:
+            high = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM ephemeral_kv").fetchone()[0]
+            rows = conn.execute(
+                f"SELECT namespace, key, value, expires_at FROM ephemeral_kv "
+                f"WHERE seq > ? AND seq <= ? AND namespace IN ({marks}) AND expires_at > ?",
+                (seq, high, *namespaces, time.time())
+            ).fetchall()
+        return {(namespace, key): (json.loads(value), expires_at) for namespace, key, value, expires_at in rows}, high
+
+    def pop(self, namespace: str, key: str):
+        # Atomic across workers: only one caller gets the value
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "DELETE FROM ephemeral_kv WHERE namespace = ? AND key = ? RETURNING value, expires_at",
+                (namespace, key)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def purge_expired(self) -> int:
+        with self.pool.transaction() as conn:
+            purged = conn.execute("DELETE FROM ephemeral_kv WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._trim(conn)
+        self.expired += purged
+        return purged
+
+    def stats(self) -> dict:
+        with self.pool.connection() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM ephemeral_kv").fetchone()[0]
+        return {
+            "backend": self.backend,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+def store_from_env(pool) -> EphemeralStore:
+    """EPHEMERAL_STORE=sqlite (default, shared across workers) or memory"""
+    backend = os.environ.get("EPHEMERAL_STORE", "sqlite")
+    max_entries = int(os.environ.get("EPHEMERAL_MAX_ENTRIES", 100000))
+    if backend == "memory":
+        return MemoryStore(max_entries)
+    if backend == "sqlite":
+        return SQLiteStore(pool, max_entries)
+    raise ValueError(f"Unknown EPHEMERAL_STORE backend: {backend}")
@@ -0,0 +1,302 @@
+"""Synthetic dataset generator for capacity testing.
+
+Builds a database with the server's own schema (through migrations.py) at
+whatever scale is asked for: owners, venues, grounds, hourly slots from
+--days-back days ago to --days-ahead days ahead, players and bookings.
+Bookings follow a demand curve: evenings and early mornings fill first,
+weekends more than weekdays, popular venues more than quiet ones, and future
+slots fill up as their date gets closer. Past bookings are verified or
+expired; future ones are pending and get codes from code_allocator so the
+server can keep allocating after the load. Rollup tables are filled in the
+same pass. With --schedules, grounds get schedule rules instead and only the
+booked slots are stored, the way the server stores them.
+
+Rows are generated a few venues at a time and written with executemany in
+one transaction per batch, with secondary indexes dropped until the end and
+journaling and fsync turned off. A killed run leaves an unusable file, so
+only point it at a scratch database.
+
+    python generate_dataset.py --db /tmp/capacity.db --replace
+    python generate_dataset.py --db /tmp/capacity.db --replace --venues 10000 --players 500000
+    python generate_dataset.py --db /tmp/capacity.db --replace --schedules
+    VERIFICATION_CODE_LENGTH=8 python generate_dataset.py --db /tmp/capacity.db --venues 20000 ...
+
+Run the server with the same VERIFICATION_CODE_LENGTH. Every generated user
+logs in with the password printed at the end.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import code_allocator
+import rollups
+import schedules
+from password_hashing import make_context
+
+PASSWORD = "Passw0rd!"
+EMAIL_DOMAIN = "boxgames-data.com"
+HOURS = range(6, 22)
+
+# Relative demand per start hour: before-work and after-work slots sell out, midday barely moves
+HOUR_DEMAND = {
+    6: 0.9, 7: 1.0, 8: 0.8, 9: 0.5, 10: 0.35, 11: 0.3, 12: 0.3, 13: 0.3,
+    14: 0.35, 15: 0.45, 16: 0.7, 17: 1.1, 18: 1.6, 19: 1.8, 20: 1.7, 21: 1.2,
+}
+WEEKEND_DEMAND = 1.3
+PEAK_HOURS = range(17, 22)
+MAX_FILL = 0.97
+VERIFIED_SHARE = 0.9  # past bookings that were verified; the rest expired unverified
+BOOKING_LEAD_MINUTES = 7 * 24 * 60  # bookings are made up to a week before the slot
+
+# Indexes rebuilt after the load; building one from sorted data beats updating it row by row
+LOADED_TABLES = ("venues", "grounds", "slots", "bookings", "schedule_rules")
+
+FAST_LOAD_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "MEMORY",
+    "cache_size": -524288,
+}
+
+
+def _demand_curve() -> dict:
+    mean = sum(HOUR_DEMAND[h] for h in HOURS) / len(HOURS)
+    return {h: HOUR_DEMAND[h] / mean for h in HOURS}
+
+
+def _drop_secondary_indexes(conn) -> list:
+    placeholders = ", ".join("?" * len(LOADED_TABLES))
+    indexes = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+        LOADED_TABLES
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    return [sql for _, sql in indexes]
+
+
+def _insert_users(conn, role: str, count: int, password_hash: str, code_length: int, batch: int, created_at: str):
+    prefix = 8 if role == "owner" else 9
+    for start in range(0, count, batch):
+        stop = min(count, start + batch)
+        conn.execute("BEGIN")
+        codes = code_allocator.allocate_many(conn, stop - start, code_length)
+        conn.executemany(
+            "INSERT INTO users (id, fullName, username, email, mobileNumber, password_hash, role, verification_code, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (f"{role}-{n:08d}", f"{role.title()} {n}", f"{role}{n}", f"{role}{n}@{EMAIL_DOMAIN}",
+                 f"+91{prefix * 10 ** 9 + n}", password_hash, role, code, created_at)
+                for n, code in zip(range(start, stop), codes)
+            )
+        )
+        conn.execute("COMMIT")
+
+
+def _schedule_rules(ground_id: str, first_day: date, base_price: int, created_at: str) -> list:
+    """Weekday and weekend rules producing the same hours and prices as the stored slots"""
+    rows = []
+    for name, days, surcharge in (("weekdays", range(5), 0), ("weekends", range(5, 7), 100)):
+        price = base_price + surcharge
+        bands = [{"start_time": f"{PEAK_HOURS[0]:02d}:00", "end_time": f"{PEAK_HOURS[-1] + 1:02d}:00", "price": price + 200}]
+        rows.append((
+            f"{ground_id}-{name}", ground_id, schedules.days_mask(days), first_day.isoformat(),
+            f"{HOURS[0]:02d}:00", f"{HOURS[-1] + 1:02d}:00", price, json.dumps(bands), created_at
+        ))
+    return rows
+
+
+def _generate_venues(conn, args, rng, first_day: date, today: date, code_length: int) -> dict:
+    """Insert venues with their grounds, slots, bookings and rollups, one transaction per batch"""
+    demand = _demand_curve()
+    days = []
+    for d in range(args.days_back + args.days_ahead):
+        day = first_day + timedelta(days=d)
+        ahead = (day - today).days
+        # Future slots are still filling: the further out, the emptier
+        lead = 1.0 if ahead < 0 else max(0.1, 1 - ahead / (args.days_ahead + 1))
+        weekend = day.weekday() >= 5
+        hours = [
+            (f"{d:04d}-{h:02d}", f"{h:02d}:00", f"{h + 1:02d}:00",
+             200 * (h in PEAK_HOURS) + 100 * weekend,
+             lead * (WEEKEND_DEMAND if weekend else 1.0) * demand[h],
+             datetime(day.year, day.month, day.day, h, tzinfo=timezone.utc))
+            for h in HOURS
+        ]
+        days.append((day.isoformat(), ahead < 0, hours))
+    owners = max(1, args.venues // args.venues_per_owner)
+    space = 10 ** code_length
+    random = rng.random
+    now = datetime.now(timezone.utc)
+    created_at = now.isoformat()
+    totals = {"slots": 0, "bookings": 0, "pending": 0}
+    started = time.perf_counter()
+
+    for batch_start in range(0, args.venues, args.batch_venues):
+        venue_rows, ground_rows, rule_rows, slot_rows, booking_rows, daily_rows = [], [], [], [], [], []
+        pending = []  # indexes into booking_rows that still need a code
+        for v in range(batch_start, min(args.venues, batch_start + args.batch_venues)):
+            venue_id = f"venue-{v:06d}"
+            venue_rows.append((venue_id, f"Arena {v}", f"Sector {v % 97}", "", f"owner{v % owners}@{EMAIL_DOMAIN}"))
+            popularity = args.occupancy * rng.uniform(0.5, 1.5)
+            base_price = 600 + 50 * rng.randrange(19)
+            # (slot id suffix, start, end, price, fill probability, start datetime) per day, shared by the grounds
+            venue_days = [
+                (slot_date, past, [
+                    (suffix, start, end, base_price + surcharge, min(MAX_FILL, popularity * day_demand), slot_at)
+                    for suffix, start, end, surcharge, day_demand, slot_at in hours
+                ])
+                for slot_date, past, hours in days
+            ]
+            for g in range(args.grounds_per_venue):
+                ground_id = f"ground-{v:06d}-{g:03d}"
+                ground_rows.append((ground_id, f"Ground {g + 1}", venue_id))
+                if args.schedules:
+                    rule_rows += _schedule_rules(ground_id, first_day, base_price, created_at)
+                prefix = f"{v:06d}-{g:03d}-"
+                for slot_date, past, hours in venue_days:
+                    booked_slots = booked_revenue = verified = verified_revenue = 0
+                    for suffix, start, end, price, p, slot_at in hours:
+                        slot_id = schedules.slot_id(ground_id, slot_date, start) if args.schedules else f"slot-{prefix}{suffix}"
+                        if random() >= p:
+                            if not args.schedules:
+                                slot_rows.append((slot_id, ground_id, slot_date, start, end, price, 0))
+                            continue
+                        slot_rows.append((slot_id, ground_id, slot_date, start, end, price, 1))
+                        booking_id = f"booking-{prefix}{suffix}"
+                        # Slots starting within the lead window were still booked in the past
+                        booked_at = min(slot_at - timedelta(minutes=60 + int(random() * BOOKING_LEAD_MINUTES)), now).isoformat()
+                        # A few regulars make most bookings
+                        user_id = f"player{int(args.players * random() ** 2)}@{EMAIL_DOMAIN}"
+                        booked_slots += 1
+                        booked_revenue += price
+                        if not past:
+                            pending.append(len(booking_rows))
+                            booking_rows.append([booking_id, user_id, slot_id, None, "pending", booked_at, None])
+                            continue
+                        code = str(int(random() * space)).zfill(code_length)
+                        if random() < VERIFIED_SHARE:
+                            verified += 1
+                            verified_revenue += price
+                            verified_at = (slot_at - timedelta(minutes=5 + int(random() * 25))).isoformat()
+                            booking_rows.append((booking_id, user_id, slot_id, code, "verified", booked_at, verified_at))
+                        else:
+                            booking_rows.append((booking_id, user_id, slot_id, code, "expired", booked_at, None))
+                    stored = booked_slots if args.schedules else len(HOURS)
+                    daily_rows.append((ground_id, slot_date, stored, booked_slots, booked_revenue, verified, verified_revenue))
+
+        conn.execute("BEGIN")
+        # Past bookings no longer hold their code; only pending ones need a unique one
+        for i, code in zip(pending, code_allocator.allocate_many(conn, len(pending), code_length)):
+            booking_rows[i][3] = code
+        conn.executemany("INSERT INTO venues (id, name, location, image_url, owner_id) VALUES (?, ?, ?, ?, ?)", venue_rows)
+        conn.executemany("INSERT INTO grounds (id, name, venue_id) VALUES (?, ?, ?)", ground_rows)
+        conn.executemany(
+            "INSERT INTO schedule_rules (id, ground_id, days_mask, start_date, end_date, open_time, close_time, "
+            "duration_minutes, price, price_bands, created_at) VALUES (?, ?, ?, ?, NULL, ?, ?, 60, ?, ?, ?)",
+            rule_rows
+        )
+        conn.executemany(
+            "INSERT INTO slots (id, ground_id, slot_date, start_time, end_time, price, is_booked) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            slot_rows
+        )
+        conn.executemany(
+            "INSERT INTO bookings (id, user_id, slot_id, verification_code, status, booked_at, verified_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            booking_rows
+        )
+        conn.executemany(
+            f"INSERT INTO ground_daily_stats (ground_id, slot_date, {', '.join(rollups.COUNTERS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            daily_rows
+        )
+        conn.execute("COMMIT")
+
+        totals["slots"] += len(slot_rows)
+        totals["bookings"] += len(booking_rows)
+        totals["pending"] += len(pending)
+        done = min(args.venues, batch_start + args.batch_venues)
+        elapsed = time.perf_counter() - started
+        print(f"  {done}/{args.venues} venues, {totals['slots']} slots, {totals['bookings']} bookings "
+              f"({totals['slots'] / elapsed:,.0f} slots/s)", flush=True)
+    return totals
+
+
+def main():
+    from migrations import DB_PATH, migrate
+
+    parser = argparse.ArgumentParser(description="Generate a large synthetic dataset for capacity testing")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--replace", action="store_true", help="delete the database file first")
+    parser.add_argument("--venues", type=int, default=1000)
+    parser.add_argument("--grounds-per-venue", type=int, default=10)
+    parser.add_argument("--venues-per-owner", type=int, default=5)
+    parser.add_argument("--days-back", type=int, default=21, help="days of past slots, ending yesterday")
+    parser.add_argument("--days-ahead", type=int, default=14, help="days of future slots, starting today")
+    parser.add_argument("--players", type=int, default=50000)
+    parser.add_argument("--occupancy", type=float, default=0.35, help="mean share of slots booked at full demand")
+    parser.add_argument("--batch-venues", type=int, default=25, help="venues written per transaction")
+    parser.add_argument("--schedules", action="store_true",
+                        help="give grounds schedule rules and store only booked slots, instead of every slot")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    code_length = int(os.environ.get("VERIFICATION_CODE_LENGTH", 6))
+    owners = max(1, args.venues // args.venues_per_owner)
+    future_slots = args.venues * args.grounds_per_venue * args.days_ahead * len(HOURS)
+    codes_needed = owners + args.players + int(future_slots * min(MAX_FILL, args.occupancy * 1.5))
+    if codes_needed > 10 ** code_length:
+        sys.exit(f"Users and pending bookings may need up to {codes_needed} verification codes but length "
+                 f"{code_length} has {10 ** code_length}; set VERIFICATION_CODE_LENGTH higher (and run the server with it)")
+
+    if args.replace:
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        migrate(conn)
+        if conn.execute("SELECT 1 FROM venues LIMIT 1").fetchone() or conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+            sys.exit(f"{args.db} already has data; pass --replace to start from an empty database")
+        for name, value in FAST_LOAD_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        rng = random.Random(args.seed)
+        today = datetime.now(timezone.utc).date()
+        started = time.perf_counter()
+        index_sql = _drop_secondary_indexes(conn)
+
+        password_hash = make_context(int(os.environ.get("BCRYPT_ROUNDS", 12))).hash(PASSWORD)
+        created_at = datetime.now(timezone.utc).isoformat()
+        print(f"Creating {owners} owners and {args.players} players...")
+        _insert_users(conn, "owner", owners, password_hash, code_length, 50000, created_at)
+        _insert_users(conn, "player", args.players, password_hash, code_length, 50000, created_at)
+
+        print(f"Creating {args.venues} venues x {args.grounds_per_venue} grounds x "
+              f"{args.days_back + args.days_ahead} days x {len(HOURS)} hourly slots...")
+        totals = _generate_venues(conn, args, rng, today - timedelta(days=args.days_back), today, code_length)
+
+        print(f"Rebuilding {len(index_sql)} indexes and ground totals...")
+        conn.execute("BEGIN")
+        for sql in index_sql:
+            conn.execute(sql)
+        rollups.rebuild_totals(conn)
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA journal_mode = WAL")
+
+        elapsed = time.perf_counter() - started
+        print(f"Generated {owners} owners, {args.players} players, {args.venues} venues, "
+              f"{args.venues * args.grounds_per_venue} grounds, {totals['slots']} slots and {totals['bookings']} bookings "
+              f"({totals['pending']} pending) in {elapsed:.1f}s")
+        print(f"Logins: owner0@{EMAIL_DOMAIN} / player0@{EMAIL_DOMAIN}, password {PASSWORD}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
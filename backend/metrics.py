@@ -0,0 +1,224 @@
+"""Prometheus text-format metrics without a client library dependency.
+
+Counters, gauges and histograms live in one in-process registry and are
+rendered by GET /metrics. Values are per worker process; with several
+uvicorn workers each scrape sees the worker that answered it.
+"""
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HOP_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_registry = []
+_collectors = []
+
+# ASGI scope of the request being handled; copied into threadpool calls with the rest of the context
+_current_scope = ContextVar("current_scope", default=None)
+# One-element list counting the thread dispatches made while handling the current request
+_hops = ContextVar("thread_hops", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0, 0.0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += 1
+            state[2] += value
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._values.items())
+        for labels, (counts, count, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_labels(self.labelnames, labels, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, labels, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+        return lines
+
+
+def current_route():
+    """Route template of the request being handled, once the router has matched it"""
+    scope = _current_scope.get()
+    return getattr(scope.get("route"), "path", None) if scope else None
+
+
+async def dispatch(kind: str, run, fn, *args):
+    """Await run(fn, *args) on another thread as one of the current request's hops.
+
+    Whatever the await costs beyond fn itself (queueing for a thread, the
+    switches there and back, a group commit) is recorded as the hop's overhead.
+    """
+    hops = _hops.get()
+    if hops is not None:
+        hops[0] += 1
+    ran = 0.0
+
+    def timed(*args):
+        nonlocal ran
+        started = perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            ran = perf_counter() - started
+
+    started = perf_counter()
+    try:
+        return await run(timed, *args)
+    finally:
+        overhead = max(0.0, perf_counter() - started - ran)
+        THREAD_HOP_OVERHEAD.observe(current_route() or "unmatched", kind, value=overhead)
+
+
+def register_collector(fn):
+    """fn() is called at scrape time and returns extra (name, kind, help, [(labels dict, value)]) tuples"""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines += metric.render()
+    for collector in _collectors:
+        for name, kind, documentation, samples in collector():
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Time spent running and fetching SQLite statements", ("table", "operation"),
+    QUERY_BUCKETS
+)
+
+HTTP_THREAD_HOPS = Histogram(
+    "http_request_thread_hops", "Thread dispatches (threadpool calls and writer jobs) per request", ("method", "route"),
+    HOP_BUCKETS
+)
+THREAD_HOP_OVERHEAD = Histogram(
+    "thread_hop_overhead_seconds", "Time a thread dispatch adds on top of the work it runs", ("route", "kind"),
+    QUERY_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: counts and times requests by matched route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = perf_counter()
+        token = _current_scope.set(scope)
+        hops = [0]
+        hops_token = _hops.set(hops)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _hops.reset(hops_token)
+            _current_scope.reset(token)
+            HTTP_IN_FLIGHT.dec()
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            labels = (scope["method"], route, str(status_code))
+            HTTP_REQUESTS.inc(*labels)
+            HTTP_LATENCY.observe(*labels, value=perf_counter() - started)
+            HTTP_THREAD_HOPS.observe(scope["method"], route, value=hops[0])
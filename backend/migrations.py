@@ -0,0 +1,509 @@
+"""Versioned schema migrations for the SQLite database.
+
+Each migration runs once, in order, and is recorded in ``schema_migrations``.
+server.py, seed_data.py and test_db.py all build the schema through here.
+Every migration carries its own SQL rather than calling into the modules that
+use the tables, so later changes to those modules never rewrite history.
+
+    python migrations.py                # apply pending migrations
+    python migrations.py --status       # list applied versions
+    python migrations.py --check-plans  # EXPLAIN QUERY PLAN the hot route queries
+"""
+import argparse
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+DB_PATH = os.environ.get('DB_PATH', str(ROOT_DIR / "app.db"))
+
+# Columns every table must end up with; older databases created by the
+# previous seed script are missing some of them
+BASE_SCHEMA = {
+    "users": [
+        ("id", "TEXT PRIMARY KEY"),
+        ("fullName", "TEXT"),
+        ("username", "TEXT UNIQUE"),
+        ("email", "TEXT UNIQUE"),
+        ("mobileNumber", "TEXT UNIQUE"),
+        ("password_hash", "TEXT"),
+        ("role", "TEXT"),
+        ("verification_code", "TEXT UNIQUE"),
+        ("created_at", "TEXT"),
+    ],
+    "venues": [
+        ("id", "TEXT PRIMARY KEY"),
+        ("name", "TEXT"),
+        ("location", "TEXT"),
+        ("image_url", "TEXT"),
+        ("owner_id", "TEXT"),
+    ],
+    "grounds": [
+        ("id", "TEXT PRIMARY KEY"),
+        ("name", "TEXT"),
+        ("venue_id", "TEXT"),
+    ],
+    "slots": [
+        ("id", "TEXT PRIMARY KEY"),
+        ("ground_id", "TEXT"),
+        ("slot_date", "TEXT"),
+        ("start_time", "TEXT"),
+        ("end_time", "TEXT"),
+        ("price", "INTEGER"),
+        ("is_booked", "INTEGER DEFAULT 0"),
+    ],
+    "bookings": [
+        ("id", "TEXT PRIMARY KEY"),
+        ("user_id", "TEXT"),
+        ("slot_id", "TEXT"),
+        ("verification_code", "TEXT UNIQUE"),
+        ("status", "TEXT DEFAULT 'pending'"),
+        ("booked_at", "TEXT"),
+        ("verified_at", "TEXT"),
+    ],
+}
+
+
+def _m001_base_schema(conn):
+    for table, columns in BASE_SCHEMA.items():
+        column_sql = ",\n    ".join(f"{name} {decl}" for name, decl in columns)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    {column_sql}\n)")
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, decl in columns:
+            if name not in existing:
+                # ALTER TABLE cannot add UNIQUE columns; uniqueness comes from an index instead
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl.replace(' UNIQUE', '')}")
+                if "UNIQUE" in decl:
+                    conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_{name} ON {table}({name})")
+
+
+def _has_leading_index(conn, table, column) -> bool:
+    for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        columns = conn.execute(f"PRAGMA index_info({index[1]})").fetchall()
+        if columns and columns[0][2] == column:
+            return True
+    return False
+
+
+def _m002_hot_lookup_indexes(conn):
+    # Login/register OR lookups need an index on each column; databases from
+    # the old seed script created username without UNIQUE
+    for column in ("email", "username", "mobileNumber"):
+        if not _has_leading_index(conn, "users", column):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_users_{column} ON users({column})")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_venues_owner ON venues(owner_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_grounds_venue ON grounds(venue_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slots_ground_date ON slots(ground_id, slot_date, start_time)")
+    # Covers the booked-slot revenue queries without touching the table
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slots_ground_booked ON slots(ground_id, is_booked, price)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings(user_id, booked_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_slot ON bookings(slot_id)")
+
+
+def _m003_bookings_keyset_index(conn):
+    # Serves GET /bookings/my keyset pages straight from the index, ties included
+    conn.execute("DROP INDEX IF EXISTS idx_bookings_user")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user_keyset ON bookings(user_id, booked_at, id)")
+
+
+def _m004_owner_rollups(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ground_daily_stats (
+            ground_id TEXT NOT NULL,
+            slot_date TEXT NOT NULL,
+            total_slots INTEGER NOT NULL DEFAULT 0,
+            booked_slots INTEGER NOT NULL DEFAULT 0,
+            booked_revenue INTEGER NOT NULL DEFAULT 0,
+            verified_bookings INTEGER NOT NULL DEFAULT 0,
+            verified_revenue INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ground_id, slot_date)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ground_stats (
+            ground_id TEXT PRIMARY KEY,
+            total_slots INTEGER NOT NULL DEFAULT 0,
+            booked_slots INTEGER NOT NULL DEFAULT 0,
+            booked_revenue INTEGER NOT NULL DEFAULT 0,
+            verified_bookings INTEGER NOT NULL DEFAULT 0,
+            verified_revenue INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("DELETE FROM ground_daily_stats")
+    conn.execute("DELETE FROM ground_stats")
+    conn.execute(
+        """
+        INSERT INTO ground_daily_stats (ground_id, slot_date, total_slots, booked_slots, booked_revenue,
+                                        verified_bookings, verified_revenue)
+        SELECT s.ground_id, s.slot_date,
+               COUNT(*),
+               SUM(CASE WHEN s.is_booked THEN 1 ELSE 0 END),
+               SUM(CASE WHEN s.is_booked THEN COALESCE(s.price, 0) ELSE 0 END),
+               SUM(CASE WHEN vb.slot_id IS NOT NULL THEN 1 ELSE 0 END),
+               SUM(CASE WHEN vb.slot_id IS NOT NULL THEN COALESCE(s.price, 0) ELSE 0 END)
+        FROM slots s
+        LEFT JOIN (SELECT DISTINCT slot_id FROM bookings WHERE status = 'verified') vb ON vb.slot_id = s.id
+        WHERE s.ground_id IS NOT NULL AND s.slot_date IS NOT NULL
+        GROUP BY s.ground_id, s.slot_date
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO ground_stats (ground_id, total_slots, booked_slots, booked_revenue,
+                                  verified_bookings, verified_revenue)
+        SELECT ground_id, SUM(total_slots), SUM(booked_slots), SUM(booked_revenue),
+               SUM(verified_bookings), SUM(verified_revenue)
+        FROM ground_daily_stats GROUP BY ground_id
+        """
+    )
+
+
+def _m005_verification_code_allocator(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS code_sequences (length INTEGER PRIMARY KEY, secret TEXT NOT NULL, next_index INTEGER NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS released_codes (code TEXT PRIMARY KEY, length INTEGER NOT NULL, released_at TEXT NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_released_codes_length ON released_codes(length, released_at)")
+    # Codes handed out by the old random generator; the permutation skips them
+    conn.execute("CREATE TABLE IF NOT EXISTS legacy_codes (code TEXT PRIMARY KEY) WITHOUT ROWID")
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO legacy_codes (code)
+        SELECT verification_code FROM users WHERE verification_code IS NOT NULL
+        UNION
+        SELECT verification_code FROM bookings WHERE verification_code IS NOT NULL
+        """
+    )
+    # Booking codes are unique only among pending bookings so verified and
+    # expired codes can be reused; SQLite needs a table rebuild to drop UNIQUE
+    conn.execute(
+        """
+        CREATE TABLE bookings_new (
+            id TEXT PRIMARY KEY,
+            user_id TEXT,
+            slot_id TEXT,
+            verification_code TEXT,
+            status TEXT DEFAULT 'pending',
+            booked_at TEXT,
+            verified_at TEXT
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO bookings_new (id, user_id, slot_id, verification_code, status, booked_at, verified_at) "
+        "SELECT id, user_id, slot_id, verification_code, status, booked_at, verified_at FROM bookings"
+    )
+    conn.execute("DROP TABLE bookings")
+    conn.execute("ALTER TABLE bookings_new RENAME TO bookings")
+    conn.execute("CREATE INDEX idx_bookings_user_keyset ON bookings(user_id, booked_at, id)")
+    conn.execute("CREATE INDEX idx_bookings_slot ON bookings(slot_id)")
+    conn.execute("CREATE INDEX idx_bookings_code ON bookings(verification_code, status)")
+    conn.execute("CREATE UNIQUE INDEX ux_bookings_pending_code ON bookings(verification_code) WHERE status = 'pending'")
+
+
+def _m006_ephemeral_store(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ephemeral_kv (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ephemeral_kv_expires ON ephemeral_kv(expires_at)")
+
+
+def _m007_list_keyset_indexes(conn):
+    # Every list route pages by (filter, sort key..., id); the id suffix makes
+    # the order total so deep pages seek instead of skipping
+    conn.execute("DROP INDEX IF EXISTS idx_venues_owner")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_venues_owner_keyset ON venues(owner_id, id)")
+    conn.execute("DROP INDEX IF EXISTS idx_grounds_venue")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_grounds_venue_keyset ON grounds(venue_id, id)")
+    conn.execute("DROP INDEX IF EXISTS idx_slots_ground_date")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slots_ground_keyset ON slots(ground_id, slot_date, start_time, id)")
+
+
+def _m008_resource_versions(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resource_versions (
+            resource TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resource_versions_version ON resource_versions(version)")
+
+
+def _m009_slow_query_log(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS slow_queries (
+            id INTEGER PRIMARY KEY,
+            template TEXT NOT NULL,
+            param_count INTEGER NOT NULL,
+            row_count INTEGER,
+            duration_ms REAL NOT NULL,
+            route TEXT,
+            logged_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slow_queries_template ON slow_queries(template)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS query_plans (template TEXT PRIMARY KEY, plan TEXT NOT NULL, captured_at REAL NOT NULL)"
+    )
+
+
+def _m010_schedules(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schedule_rules (
+            id TEXT PRIMARY KEY,
+            ground_id TEXT NOT NULL,
+            days_mask INTEGER NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            open_time TEXT NOT NULL,
+            close_time TEXT NOT NULL,
+            duration_minutes INTEGER NOT NULL,
+            price INTEGER NOT NULL,
+            price_bands TEXT,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_schedule_rules_ground ON schedule_rules(ground_id, start_date)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS slot_exceptions (
+            ground_id TEXT NOT NULL,
+            slot_date TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            price INTEGER,
+            PRIMARY KEY (ground_id, slot_date, start_time)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _m011_archive_index(conn):
+    # The archiver seeks past slots per booked state instead of scanning the table
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slots_archive ON slots(is_booked, slot_date)")
+
+
+def _m012_ephemeral_seq(conn):
+    # Write order of ephemeral entries, so workers mirror revocations incrementally
+    conn.execute("ALTER TABLE ephemeral_kv ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ephemeral_kv_seq ON ephemeral_kv(seq)")
+
+
+def _m013_pending_bookings_index(conn):
+    # Only pending bookings can expire; the expirer walks this index instead of
+    # every booked slot ever recorded
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_pending ON bookings(status, slot_id) WHERE status = 'pending'")
+
+
+# (version, name, apply function) — append only, never edit an applied migration
+MIGRATIONS = [
+    (1, "base schema", _m001_base_schema),
+    (2, "hot lookup indexes", _m002_hot_lookup_indexes),
+    (3, "bookings keyset index", _m003_bookings_keyset_index),
+    (4, "owner analytics rollups", _m004_owner_rollups),
+    (5, "verification code allocator", _m005_verification_code_allocator),
+    (6, "ephemeral key/value store", _m006_ephemeral_store),
+    (7, "list keyset indexes", _m007_list_keyset_indexes),
+    (8, "resource versions", _m008_resource_versions),
+    (9, "slow query log", _m009_slow_query_log),
+    (10, "slot schedules", _m010_schedules),
+    (11, "slot archive index", _m011_archive_index),
+    (12, "ephemeral store write order", _m012_ephemeral_seq),
+    (13, "pending bookings index", _m013_pending_bookings_index),
+]
+
+# Queries issued by the API routes; none of them may need a full table scan
+HOT_QUERIES = {
+    "get_current_user": ("SELECT * FROM users WHERE email = ? LIMIT 1", 1),
+    "register": ("SELECT * FROM users WHERE email = ? OR username = ? OR mobileNumber = ? LIMIT 1", 3),
+    "login": ("SELECT * FROM users WHERE email = ? OR username = ? LIMIT 1", 2),
+    "verify_code": (
+        "SELECT b.id, b.status, u.fullName, s.slot_date, g.name, v.name FROM bookings b "
+        "LEFT JOIN users u ON u.email = b.user_id LEFT JOIN slots s ON s.id = b.slot_id "
+        "LEFT JOIN grounds g ON g.id = s.ground_id LEFT JOIN venues v ON v.id = g.venue_id "
+        "WHERE b.verification_code = ? ORDER BY b.status = 'pending' DESC, b.booked_at DESC LIMIT 1",
+        1,
+    ),
+    "ground_pending_codes": (
+        "SELECT b.verification_code FROM bookings b JOIN slots s ON s.id = b.slot_id "
+        "WHERE b.status = 'pending' AND s.ground_id IN (?)",
+        1,
+    ),
+    "revocation_refresh": (
+        "SELECT namespace, key, value, expires_at FROM ephemeral_kv "
+        "WHERE seq > ? AND seq <= ? AND namespace IN (?, ?) AND expires_at > ?",
+        5,
+    ),
+    "expire_stale_bookings": (
+        "SELECT b.id FROM bookings b CROSS JOIN slots s ON s.id = b.slot_id "
+        "WHERE b.status = 'pending' AND s.slot_date <= ? AND (s.slot_date || 'T' || s.end_time) < ? LIMIT ?",
+        3,
+    ),
+    "allocate_code": ("SELECT secret, next_index FROM code_sequences WHERE length = ?", 1),
+    "reuse_code": ("SELECT code FROM released_codes WHERE length = ? ORDER BY released_at LIMIT 1", 1),
+    "get_venue": ("SELECT * FROM venues WHERE id = ? LIMIT 1", 1),
+    "get_venues": ("SELECT * FROM venues WHERE (id) > (?) ORDER BY id LIMIT ?", 2),
+    "get_owner_venues": ("SELECT * FROM venues WHERE owner_id = ? AND (id) > (?) ORDER BY id LIMIT ?", 3),
+    "get_venue_grounds": ("SELECT * FROM grounds WHERE venue_id = ? AND (id) > (?) ORDER BY id LIMIT ?", 3),
+    "get_owner_grounds": (
+        "SELECT * FROM grounds WHERE venue_id IN (SELECT id FROM venues WHERE owner_id = ?) "
+        "AND (venue_id, id) > (?, ?) ORDER BY venue_id, id LIMIT ?",
+        4,
+    ),
+    "get_ground_slots": (
+        "SELECT * FROM slots WHERE ground_id = ? AND (slot_date, start_time, id) > (?, ?, ?) "
+        "ORDER BY slot_date, start_time, id LIMIT ?",
+        5,
+    ),
+    "get_ground_slots_by_date": (
+        "SELECT * FROM slots WHERE ground_id = ? AND slot_date = ? AND (start_time, id) > (?, ?) "
+        "ORDER BY start_time, id LIMIT ?",
+        5,
+    ),
+    "get_venue_availability": (
+        "SELECT g.id, s.id FROM grounds g LEFT JOIN slots s ON s.ground_id = g.id AND s.slot_date BETWEEN ? AND ? "
+        "WHERE g.venue_id = ? ORDER BY g.rowid, s.slot_date, s.start_time",
+        3,
+    ),
+    "get_owner_analytics": (
+        "SELECT v.name, g.name, r.booked_slots FROM venues v JOIN grounds g ON g.venue_id = v.id "
+        "LEFT JOIN ground_stats r ON r.ground_id = g.id WHERE v.owner_id = ?",
+        1,
+    ),
+    "create_booking": ("UPDATE slots SET is_booked = 1 WHERE id = ? AND is_booked = 0", 1),
+    "rollup_daily": ("UPDATE ground_daily_stats SET booked_slots = 1 WHERE ground_id = ? AND slot_date = ?", 2),
+    "get_my_bookings": (
+        "SELECT b.id, v.name, g.name, s.slot_date FROM bookings b LEFT JOIN slots s ON s.id = b.slot_id "
+        "LEFT JOIN grounds g ON g.id = s.ground_id LEFT JOIN venues v ON v.id = g.venue_id "
+        "WHERE b.user_id = ? AND (b.booked_at, b.id) < (?, ?) ORDER BY b.booked_at DESC, b.id DESC LIMIT ?",
+        4,
+    ),
+    "cancel_booking": (
+        "SELECT b.slot_id, s.slot_date, s.start_time FROM bookings b LEFT JOIN slots s ON s.id = b.slot_id "
+        "WHERE b.id = ? AND b.user_id = ?",
+        2,
+    ),
+    "bookings_for_slot": ("SELECT * FROM bookings WHERE slot_id = ? LIMIT 1", 1),
+    "ephemeral_get": ("SELECT value, expires_at FROM ephemeral_kv WHERE namespace = ? AND key = ?", 2),
+    "ephemeral_get_many": (
+        "SELECT namespace, key, value FROM ephemeral_kv "
+        "WHERE ((namespace = ? AND key = ?) OR (namespace = ? AND key = ?)) AND expires_at > ?",
+        5,
+    ),
+    "resource_versions_refresh": (
+        "SELECT resource, version, updated_at FROM resource_versions WHERE version > ? ORDER BY version",
+        1,
+    ),
+    "ephemeral_purge": ("DELETE FROM ephemeral_kv WHERE expires_at <= ?", 1),
+    "schedule_rules": (
+        "SELECT * FROM schedule_rules WHERE ground_id IN (?) AND start_date <= ? AND (end_date IS NULL OR end_date >= ?)",
+        3,
+    ),
+    "slot_exceptions": ("SELECT * FROM slot_exceptions WHERE ground_id IN (?) AND slot_date BETWEEN ? AND ?", 3),
+    "archive_batch": (
+        "SELECT id, ground_id FROM main.slots WHERE is_booked = ? AND slot_date < ? ORDER BY slot_date LIMIT ?",
+        3,
+    ),
+    "stored_slot_times": (
+        "SELECT ground_id, slot_date, start_time FROM slots WHERE ground_id IN (?) AND slot_date BETWEEN ? AND ?",
+        3,
+    ),
+}
+
+
+def applied_versions(conn) -> list:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)"
+    )
+    return [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+
+def migrate(conn) -> list:
+    """Apply pending migrations; returns the versions applied by this call.
+
+    The whole run holds the write lock, so concurrent processes starting on
+    the same database apply each migration exactly once.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = set(applied_versions(conn))
+        applied = []
+        for version, name, apply in MIGRATIONS:
+            if version in done:
+                continue
+            apply(conn)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, datetime.now(timezone.utc).isoformat())
+            )
+            applied.append(version)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return applied
+
+
+def check_query_plans(conn) -> dict:
+    """Return {route: plan details} for every hot query whose plan scans a table"""
+    offenders = {}
+    for route, (sql, param_count) in HOT_QUERIES.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", ("",) * param_count)]
+        if any(detail.startswith("SCAN") for detail in plan):
+            offenders[route] = plan
+    return offenders
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply and inspect database migrations")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--status", action="store_true", help="list applied migrations")
+    parser.add_argument("--check-plans", action="store_true", help="fail if any hot route query scans a table")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        if args.status:
+            applied = set(applied_versions(conn))
+            for version, name, _ in MIGRATIONS:
+                print(f"{version:04d} {name}: {'applied' if version in applied else 'pending'}")
+            return
+        applied = migrate(conn)
+        print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+        if args.check_plans:
+            offenders = check_query_plans(conn)
+            for route, plan in offenders.items():
+                print(f"SCAN in {route}: {plan}")
+            if offenders:
+                raise SystemExit(1)
+            print(f"All {len(HOT_QUERIES)} hot route queries use indexes")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""bcrypt hashing off the event loop.
+
+Hashes and verifications run on a small process pool so a burst of logins
+cannot stall unrelated requests. Work beyond the queue limit is rejected
+straight away with HasherOverloaded instead of piling up.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+_contexts = {}
+
+
+def make_context(rounds: int) -> CryptContext:
+    # min = max = default, so hashes at any other cost are flagged for rehash
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def _context(rounds: int) -> CryptContext:
+    if rounds not in _contexts:
+        _contexts[rounds] = make_context(rounds)
+    return _contexts[rounds]
+
+
+def _hash(rounds: int, password: str) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(rounds: int, password: str, password_hash: str):
+    return _context(rounds).verify_and_update(password, password_hash)
+
+
+class HasherOverloaded(Exception):
+    """Raised when too many hashing jobs are already queued"""
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 64):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            rounds=int(os.environ.get("BCRYPT_ROUNDS", 12)),
+            workers=int(os.environ.get("BCRYPT_WORKERS", min(4, os.cpu_count() or 1))),
+            max_pending=int(os.environ.get("BCRYPT_MAX_PENDING", 64)),
+        )
+
+    def _get_executor(self):
+        if self._executor is None and self.workers > 0:
+            # spawn: never fork the server process while its threads hold locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherOverloaded(f"{self._pending} password operations already queued")
+        self._pending += 1
+        try:
+            # workers=0 falls back to the default thread pool (bcrypt releases the GIL)
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, self.rounds, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str):
+        """Returns (verified, new_hash); new_hash is set when the stored cost is out of date"""
+        if not password_hash:
+            return False, None
+        return await self._submit(_verify_and_update, password, password_hash)
+
+    def stats(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
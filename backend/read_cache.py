@@ -0,0 +1,90 @@
+"""Read-through LRU cache for catalog and slot reads.
+
+Keys are (resource, version, variant): a write bumps the resource version
+(see resource_versions), so stale entries are never served, and
+invalidate() frees them as soon as the bump is seen. Concurrent misses on
+one key share a single load, so a burst of requests for a popular venue
+costs one database query.
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+
+
+class ReadThroughCache:
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> value
+        self._by_resource = {}  # resource -> set of keys
+        self._inflight = {}  # key -> loading task (event loop thread only)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: tuple, loader):
+        """Return the cached value for key, or await loader() once for all concurrent callers"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            # A task of its own, so a caller that disconnects does not cancel the others' load
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: tuple, task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = task.result()
+            self._by_resource.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._forget(evicted)
+                self.evictions += 1
+
+    def _forget(self, key: tuple):
+        keys = self._by_resource.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_resource[key[0]]
+
+    def invalidate(self, resources):
+        """Drop every cached entry of the given resources"""
+        with self._lock:
+            for resource in resources:
+                for key in self._by_resource.pop(resource, ()):
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_resource.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "coalesced": self.coalesced,
+                "loading": len(self._inflight),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,106 @@
+"""Per-resource version numbers for HTTP conditional caching.
+
+Write routes bump the versions of the resources they change inside their own
+write transaction. Versions come from one database-wide counter, so a
+resource's version never repeats and other workers can pick up changes with
+a single "WHERE version > last seen" query.
+
+VersionTracker mirrors the table in memory so a conditional GET can be
+answered without touching the database. Bumps made by this process are
+visible at once; bumps made by other workers are picked up at most
+refresh_interval seconds later.
+"""
+import threading
+import time
+
+
+def bump(conn, resources) -> tuple:
+    """Give every resource a new version; must run inside the caller's write transaction.
+
+    Returns (version, updated_at) for VersionTracker.note once the transaction commits.
+    """
+    version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM resource_versions").fetchone()[0]
+    updated_at = time.time()
+    conn.executemany(
+        "INSERT INTO resource_versions (resource, version, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(resource) DO UPDATE SET version = excluded.version, updated_at = excluded.updated_at",
+        [(resource, version, updated_at) for resource in resources]
+    )
+    return version, updated_at
+
+
+class VersionTracker:
+    def __init__(self, pool, refresh_interval: float = 1.0):
+        self.pool = pool
+        self.refresh_interval = refresh_interval
+        self._versions = {}  # resource -> (version, updated_at)
+        self._high = 0  # highest version read from the table
+        self._refreshed_at = float("-inf")
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.listeners = []  # called with the list of resources whose version moved
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def refresh(self):
+        """Load versions bumped since the last refresh (by any worker)"""
+        with self._lock:
+            high = self._high
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT resource, version, updated_at FROM resource_versions WHERE version > ? ORDER BY version",
+                (high,)
+            ).fetchall()
+        with self._lock:
+            changed = []
+            for resource, version, updated_at in rows:
+                if self._store(resource, version, updated_at):
+                    changed.append(resource)
+                self._high = max(self._high, version)
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+        self._notify(changed)
+
+    def note(self, resources, version: int, updated_at: float):
+        """Record a bump committed by this process"""
+        with self._lock:
+            changed = [resource for resource in resources if self._store(resource, version, updated_at)]
+        self._notify(changed)
+
+    def _store(self, resource, version, updated_at) -> bool:
+        current = self._versions.get(resource)
+        if current is None or current[0] < version:
+            self._versions[resource] = (version, updated_at)
+            return True
+        return False
+
+    def _notify(self, changed):
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
+
+    def get(self, resource: str) -> tuple:
+        """(version, updated_at) of a resource; (0, None) if it was never bumped"""
+        with self._lock:
+            return self._versions.get(resource, (0, None))
+
+    def last_modified(self, resource: str):
+        """updated_at truncated to whole seconds for Last-Modified, or None.
+
+        None until the second of the last bump has passed; before that a
+        second write within it could not be told apart (RFC 9110 8.8.2.2).
+        """
+        updated_at = self.get(resource)[1]
+        if updated_at is None or time.time() < int(updated_at) + 1:
+            return None
+        return int(updated_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resources": len(self._versions),
+                "high_version": self._high,
+                "refresh_interval": self.refresh_interval,
+                "refreshes": self.refreshes,
+            }
@@ -0,0 +1,120 @@
+"""Booking and revenue rollups for the owner analytics and dashboard.
+
+``ground_daily_stats`` holds one row per ground per slot date and
+``ground_stats`` the running totals per ground. Both are updated inside the
+same transaction as the slot/booking write that changes them, so the owner
+routes read O(grounds) rows instead of scanning slots.
+
+    python rollups.py --rebuild   # recompute both tables from slots/bookings
+"""
+import argparse
+import os
+import sqlite3
+
+import archive
+
+COUNTERS = ("total_slots", "booked_slots", "booked_revenue", "verified_bookings", "verified_revenue")
+
+
+def apply_delta(conn, ground_id: str, slot_date: str, **deltas):
+    """Add deltas (keyword per counter) to the ground's daily and total rows"""
+    apply_deltas(conn, [(ground_id, slot_date, deltas)])
+
+
+def apply_deltas(conn, rows):
+    """Apply many (ground_id, slot_date, {counter: delta}) changes with one executemany per table"""
+    daily = []
+    totals = {}
+    for ground_id, slot_date, deltas in rows:
+        unknown = set(deltas) - set(COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown rollup counters: {sorted(unknown)}")
+        values = [int(deltas.get(name, 0) or 0) for name in COUNTERS]
+        daily.append((ground_id, slot_date, *values))
+        running = totals.setdefault(ground_id, [0] * len(COUNTERS))
+        for i, value in enumerate(values):
+            running[i] += value
+    if not daily:
+        return
+    updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in COUNTERS)
+    columns = ", ".join(COUNTERS)
+    placeholders = ", ".join("?" * len(COUNTERS))
+    conn.executemany(
+        f"INSERT INTO ground_daily_stats (ground_id, slot_date, {columns}) VALUES (?, ?, {placeholders}) "
+        f"ON CONFLICT(ground_id, slot_date) DO UPDATE SET {updates}",
+        daily
+    )
+    conn.executemany(
+        f"INSERT INTO ground_stats (ground_id, {columns}) VALUES (?, {placeholders}) "
+        f"ON CONFLICT(ground_id) DO UPDATE SET {updates}",
+        [(ground_id, *values) for ground_id, values in totals.items()]
+    )
+
+
+def rebuild(conn):
+    """Recompute every rollup row from the slots and bookings tables, archived rows included"""
+    conn.execute("DELETE FROM ground_daily_stats")
+    conn.execute("DELETE FROM ground_stats")
+    conn.execute(
+        f"""
+        INSERT INTO ground_daily_stats (ground_id, slot_date, total_slots, booked_slots, booked_revenue,
+                                        verified_bookings, verified_revenue)
+        SELECT s.ground_id, s.slot_date,
+               COUNT(*),
+               SUM(CASE WHEN s.is_booked THEN 1 ELSE 0 END),
+               SUM(CASE WHEN s.is_booked THEN COALESCE(s.price, 0) ELSE 0 END),
+               SUM(CASE WHEN vb.slot_id IS NOT NULL THEN 1 ELSE 0 END),
+               SUM(CASE WHEN vb.slot_id IS NOT NULL THEN COALESCE(s.price, 0) ELSE 0 END)
+        FROM {archive.union(conn, "slots")} s
+        LEFT JOIN (SELECT DISTINCT slot_id FROM {archive.union(conn, "bookings")} WHERE status = 'verified') vb
+               ON vb.slot_id = s.id
+        WHERE s.ground_id IS NOT NULL AND s.slot_date IS NOT NULL
+        GROUP BY s.ground_id, s.slot_date
+        """
+    )
+    rebuild_totals(conn)
+
+
+def rebuild_totals(conn):
+    """Recompute ground_stats from ground_daily_stats"""
+    conn.execute("DELETE FROM ground_stats")
+    sums = ", ".join(f"SUM({name})" for name in COUNTERS)
+    conn.execute(
+        f"INSERT INTO ground_stats (ground_id, {', '.join(COUNTERS)}) "
+        f"SELECT ground_id, {sums} FROM ground_daily_stats GROUP BY ground_id"
+    )
+
+
+def main():
+    from migrations import DB_PATH, migrate
+
+    parser = argparse.ArgumentParser(description="Maintain the owner analytics rollup tables")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--archive", default=os.environ.get("ARCHIVE_DB_PATH"), help="archive database to include")
+    parser.add_argument("--rebuild", action="store_true", help="recompute rollups from slots and bookings")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        if args.archive:
+            archive.attach(conn, args.archive)
+        migrate(conn)
+        if args.rebuild:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rebuild(conn)
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        grounds, slots, booked, revenue = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(total_slots), 0), COALESCE(SUM(booked_slots), 0), "
+            "COALESCE(SUM(booked_revenue), 0) FROM ground_stats"
+        ).fetchone()
+        print(f"{grounds} grounds, {slots} slots, {booked} booked, revenue {revenue}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
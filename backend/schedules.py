@@ -0,0 +1,184 @@
+"""Recurring slot schedules expanded at read time.
+
+A ground carries schedule rules (weekdays, date range, opening window, slot
+length, base price and optional price bands) instead of one slots row per
+bookable period. Slots are generated from the rules whenever a list or
+availability route reads them, so nothing is stored for slots nobody books.
+Exceptions override the rules for one date: a window closed entirely, or a
+custom price for the slots starting inside it.
+
+A virtual slot's id encodes where it comes from, "<ground_id>@<date>T<HH:MM>".
+Booking one inserts it into slots under that id, so bookings, verification,
+cancellation and the rollups work on it like on any stored slot. Stored
+slots always win over a generated slot at the same ground, date and time.
+"""
+import json
+from datetime import date, timedelta
+
+END_OF_DAY = "24:00"
+
+
+def days_mask(days_of_week) -> int:
+    """Bit per weekday, 0 = Monday; None means every day"""
+    if days_of_week is None:
+        return 0b1111111
+    mask = 0
+    for day in days_of_week:
+        mask |= 1 << day
+    return mask
+
+
+def days_of_week(mask: int) -> list:
+    return [day for day in range(7) if mask & (1 << day)]
+
+
+def minutes(hhmm: str) -> int:
+    hours, mins = hhmm.split(":")
+    return int(hours) * 60 + int(mins)
+
+
+def hhmm(total: int) -> str:
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def slot_id(ground_id: str, slot_date: str, start_time: str) -> str:
+    return f"{ground_id}@{slot_date}T{start_time}"
+
+
+def parse_slot_id(value: str):
+    """(ground_id, slot_date, start_time) of a virtual slot id, or None for a stored slot's id"""
+    ground_id, sep, when = value.rpartition("@")
+    if not sep or not ground_id:
+        return None
+    slot_date, sep, start_time = when.partition("T")
+    try:
+        date.fromisoformat(slot_date)
+        if not sep or len(start_time) != 5 or not 0 <= minutes(start_time) < 24 * 60:
+            return None
+    except ValueError:
+        return None
+    return ground_id, slot_date, start_time
+
+
+def rules_overlap(a: dict, b: dict) -> bool:
+    """True when two rules of one ground could generate slots at the same time"""
+    if not a["days_mask"] & b["days_mask"]:
+        return False
+    if a["end_date"] is not None and a["end_date"] < b["start_date"]:
+        return False
+    if b["end_date"] is not None and b["end_date"] < a["start_date"]:
+        return False
+    return a["open_time"] < b["close_time"] and b["open_time"] < a["close_time"]
+
+
+def _rule_slots(rule: dict) -> list:
+    """(start_time, end_time, price) for one day of a rule"""
+    bands = [(minutes(b["start_time"]), minutes(b["end_time"]), b["price"]) for b in json.loads(rule["price_bands"] or "[]")]
+    close = minutes(rule["close_time"])
+    start = minutes(rule["open_time"])
+    slots = []
+    while start + rule["duration_minutes"] <= close:
+        price = next((p for band_start, band_end, p in bands if band_start <= start < band_end), rule["price"])
+        slots.append((hhmm(start), hhmm(start + rule["duration_minutes"]), price))
+        start += rule["duration_minutes"]
+    return slots
+
+
+def expand(ground_id: str, rules: list, exceptions: list, first: date, last: date, taken=frozenset()) -> list:
+    """Generated slots of one ground from first to last inclusive, ordered by date and start time.
+
+    exceptions are slot_exceptions rows of the ground within the range; taken
+    holds (slot_date, start_time) pairs already stored in slots.
+    """
+    by_date = {}
+    for exc in exceptions:
+        by_date.setdefault(exc["slot_date"], []).append(exc)
+    day_slots = {rule["id"]: _rule_slots(rule) for rule in rules}
+
+    slots = []
+    day = first
+    while day <= last:
+        slot_date = day.isoformat()
+        weekday = 1 << day.weekday()
+        todays = by_date.get(slot_date, ())
+        generated = []
+        for rule in rules:
+            if not rule["days_mask"] & weekday or slot_date < rule["start_date"]:
+                continue
+            if rule["end_date"] is not None and slot_date > rule["end_date"]:
+                continue
+            for start_time, end_time, price in day_slots[rule["id"]]:
+                if (slot_date, start_time) in taken:
+                    continue
+                exc = next((e for e in todays if e["start_time"] <= start_time < e["end_time"]), None)
+                if exc is not None:
+                    if exc["price"] is None:
+                        continue
+                    price = exc["price"]
+                generated.append({
+                    "id": slot_id(ground_id, slot_date, start_time),
+                    "ground_id": ground_id,
+                    "slot_date": slot_date,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "price": price,
+                    "is_booked": False,
+                })
+        generated.sort(key=lambda s: s["start_time"])
+        slots += generated
+        day += timedelta(days=1)
+    return slots
+
+
+def _rows(cur) -> list:
+    columns = [d[0] for d in cur.description]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def virtual_slots(conn, ground_ids, first: date, last: date) -> dict:
+    """ground_id -> generated slots from first to last that are not stored in slots"""
+    if not ground_ids:
+        return {}
+    placeholders = ",".join("?" * len(ground_ids))
+    first_s, last_s = first.isoformat(), last.isoformat()
+    rules = _rows(conn.execute(
+        f"SELECT * FROM schedule_rules WHERE ground_id IN ({placeholders}) AND start_date <= ? "
+        "AND (end_date IS NULL OR end_date >= ?)",
+        (*ground_ids, last_s, first_s)
+    ))
+    if not rules:
+        return {}
+    ground_ids = sorted({rule["ground_id"] for rule in rules})
+    placeholders = ",".join("?" * len(ground_ids))
+    exceptions = _rows(conn.execute(
+        f"SELECT * FROM slot_exceptions WHERE ground_id IN ({placeholders}) AND slot_date BETWEEN ? AND ?",
+        (*ground_ids, first_s, last_s)
+    ))
+    taken = conn.execute(
+        f"SELECT ground_id, slot_date, start_time FROM slots WHERE ground_id IN ({placeholders}) AND slot_date BETWEEN ? AND ?",
+        (*ground_ids, first_s, last_s)
+    ).fetchall()
+
+    result = {}
+    for ground_id in ground_ids:
+        result[ground_id] = expand(
+            ground_id,
+            [rule for rule in rules if rule["ground_id"] == ground_id],
+            [exc for exc in exceptions if exc["ground_id"] == ground_id],
+            first, last,
+            {(d, t) for g, d, t in taken if g == ground_id}
+        )
+    return result
+
+
+def resolve(conn, value: str):
+    """The generated slot behind a virtual slot id, or None if no rule produces it (or it is stored)"""
+    parsed = parse_slot_id(value)
+    if parsed is None:
+        return None
+    ground_id, slot_date, _ = parsed
+    day = date.fromisoformat(slot_date)
+    for slot in virtual_slots(conn, [ground_id], day, day).get(ground_id, ()):
+        if slot["id"] == value:
+            return slot
+    return None
@@ -4,11 +4,12 @@ from datetime import datetime, timezone, timedelta
 import os
 from dotenv import load_dotenv
 from pathlib import Path
+from migrations import migrate
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-DB_PATH = str(ROOT_DIR / "app.db")
+DB_PATH = os.environ.get('DB_PATH', str(ROOT_DIR / "app.db"))
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def seed_database():
@@ -16,83 +17,8 @@ def seed_database():
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
     print(f"Using DB path: {DB_PATH}")
-    # Ensure tables exist (same schema as server.init_db_sync)
-    try:
-        cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            username TEXT,
-            email TEXT UNIQUE,
-            password_hash TEXT,
-            role TEXT,
-            created_at TEXT
-        )
-        """
-        )
-    except Exception as e:
-        print("Error creating users table:", e)
-        raise
-    try:
-        cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS venues (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            location TEXT,
-            image_url TEXT,
-            owner_id TEXT
-        )
-        """
-        )
-    except Exception as e:
-        print("Error creating venues table:", e)
-        raise
-    try:
-        cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS grounds (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            venue_id TEXT
-        )
-        """
-        )
-    except Exception as e:
-        print("Error creating grounds table:", e)
-        raise
-    try:
-        cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS slots (
-            id TEXT PRIMARY KEY,
-            ground_id TEXT,
-            slot_date TEXT,
-            start_time TEXT,
-            end_time TEXT,
-            price INTEGER,
-            is_booked INTEGER DEFAULT 0
-        )
-        """
-        )
-    except Exception as e:
-        print("Error creating slots table:", e)
-        raise
-    try:
-        cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS bookings (
-            id TEXT PRIMARY KEY,
-            user_id TEXT,
-            slot_id TEXT,
-            booked_at TEXT
-        )
-        """
-        )
-    except Exception as e:
-        print("Error creating bookings table:", e)
-        raise
-    conn.commit()
+    # Bring the schema up to date (same migrations as the server)
+    migrate(conn)
     # verify tables
     cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
     res = cur.fetchone()
@@ -109,25 +35,31 @@ def seed_database():
     owner_email = "owner@boxgames.com"
     owner = (
         "owner123",
+        "John Doe",
         "johndoe",
         owner_email,
+        "+919000000001",
         pwd_context.hash("password123"),
         "owner",
+        "100001",
         datetime.now(timezone.utc).isoformat()
     )
-    cur.execute("INSERT INTO users (id, username, email, password_hash, role, created_at) VALUES (?, ?, ?, ?, ?, ?)", owner)
+    cur.execute("INSERT INTO users (id, fullName, username, email, mobileNumber, password_hash, role, verification_code, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", owner)
     print(f"Created owner: {owner_email}")
 
     player_email = "player@boxgames.com"
     player = (
         "player123",
+        "Jane Smith",
         "janesmith",
         player_email,
+        "+919000000002",
         pwd_context.hash("password123"),
         "player",
+        "100002",
         datetime.now(timezone.utc).isoformat()
     )
-    cur.execute("INSERT INTO users (id, username, email, password_hash, role, created_at) VALUES (?, ?, ?, ?, ?, ?)", player)
+    cur.execute("INSERT INTO users (id, fullName, username, email, mobileNumber, password_hash, role, verification_code, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", player)
     print(f"Created player: {player_email}")
 
     venues = [
@@ -1,163 +1,206 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-import sqlite3
 from starlette.concurrency import run_in_threadpool
+import anyio
 import os
 import logging
 import random
+import base64
+import hashlib
+import json
+import uuid
 from pathlib import Path
+from email.utils import formatdate, parsedate_to_datetime
 from pydantic import BaseModel, Field, ConfigDict, EmailStr, field_validator
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta, date, time
-from passlib.context import CryptContext
 import jwt
+import re
+from db_pool import ConnectionPool
+from write_queue import WriteQueue
+from migrations import migrate
+import archive
+import rollups
+import schedules
+import code_allocator
+import metrics
+import resource_versions
+from read_cache import ReadThroughCache
+import slow_query_log
+from slow_query_log import SlowQueryLog
+from auth_cache import UserCache, TokenRevocationList
+from ephemeral_store import store_from_env
+from slot_events import SlotEventHub, HubFull
+from code_index import CodeIndex
+from password_hashing import PasswordHasher, HasherOverloaded
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# SQLite connection (single-file DB)
-DB_PATH = str(ROOT_DIR / "app.db")
-conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+# SQLite connection pool (single-file DB, one connection per worker thread)
+DB_PATH = os.environ.get('DB_PATH', str(ROOT_DIR / "app.db"))
+db_pool = ConnectionPool.from_env(DB_PATH)
+
+# Optional cold tier for past slots and settled bookings, attached to every pooled connection
+ARCHIVE_DB_PATH = os.environ.get('ARCHIVE_DB_PATH')
+if ARCHIVE_DB_PATH:
+    db_pool.on_connect.append(lambda conn: archive.attach(conn, ARCHIVE_DB_PATH))
+
+# Mutations go through one writer thread that group-commits whatever is queued
+# (see write_queue.py); DB_WRITE_QUEUE=0 commits each call on the threadpool
+write_queue = WriteQueue.from_env(db_pool) if os.environ.get('DB_WRITE_QUEUE', '1') != '0' else None
+
+
+async def run_in_thread(fn, *args):
+    """run_in_threadpool, counted as one of the request's thread hops"""
+    return await metrics.dispatch('threadpool', run_in_threadpool, fn, *args)
+
+
+async def run_write(fn):
+    """Run a write-path _sync function, acknowledged once its commit is done"""
+    if write_queue is None:
+        return await metrics.dispatch('threadpool', run_in_threadpool, fn)
+    return await metrics.dispatch('writer', write_queue.run, fn)
 
 
-# Initialize SQLite tables
 def _row_to_dict(cursor, row):
     if row is None:
         return None
     return {description[0]: row[idx] for idx, description in enumerate(cursor.description)}
 
-def db_find_one_sync(table: str, where_clause: str, params: tuple = ()):
-    """Synchronous database lookup for verification codes"""
-    cur = conn.cursor()
-    cur.row_factory = _row_to_dict
-    cur.execute(f"SELECT * FROM {table} WHERE {where_clause}", params)
-    return cur.fetchone()
-
 def init_db_sync():
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            fullName TEXT,
-            username TEXT UNIQUE,
-            email TEXT UNIQUE,
-            mobileNumber TEXT UNIQUE,
-            password_hash TEXT,
-            role TEXT,
-            verification_code TEXT UNIQUE,
-            created_at TEXT
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS venues (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            location TEXT,
-            image_url TEXT,
-            owner_id TEXT
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS grounds (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            venue_id TEXT
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS slots (
-            id TEXT PRIMARY KEY,
-            ground_id TEXT,
-            slot_date TEXT,
-            start_time TEXT,
-            end_time TEXT,
-            price INTEGER,
-            is_booked INTEGER DEFAULT 0
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS bookings (
-            id TEXT PRIMARY KEY,
-            user_id TEXT,
-            slot_id TEXT,
-            verification_code TEXT UNIQUE,
-            status TEXT DEFAULT 'pending',
-            booked_at TEXT,
-            verified_at TEXT
-        )
-        """
-    )
-    conn.commit()
+    with db_pool.connection() as conn:
+        migrate(conn)
+
+
+# Opt-in: SLOW_QUERY_MS=50 logs every statement slower than 50ms (see slow_query_log.py)
+slow_queries = SlowQueryLog(
+    threshold_ms=float(os.environ['SLOW_QUERY_MS']) if os.environ.get('SLOW_QUERY_MS') else None
+)
+SLOW_QUERY_FLUSH_INTERVAL = float(os.environ.get('SLOW_QUERY_FLUSH_INTERVAL', 1.0))
+
+
+_SQL_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(?:\w+\.)?(\w+)', re.IGNORECASE)
+
+def observe_query(sql: str, params: tuple, rows: int, seconds: float):
+    """Pool observer: every statement's latency by table and operation, and the slow query log"""
+    match = _SQL_TABLE.search(sql)
+    operation = sql.split(None, 1)[0].lower() if sql.strip() else 'unknown'
+    metrics.DB_QUERY_LATENCY.observe(match.group(1) if match else 'none', operation, value=seconds)
+    if slow_queries.enabled:
+        slow_queries.record(sql, params, rows, seconds, metrics.current_route())
+
+db_pool.observers.append(observe_query)
 
 
 async def db_find_one(table: str, where_clause: str, params: tuple = ()):  # returns dict or None
     def _sync():
-        cur = conn.cursor()
-        cur.execute(f"SELECT * FROM {table} WHERE {where_clause} LIMIT 1", params)
-        row = cur.fetchone()
-        return _row_to_dict(cur, row)
-    return await run_in_threadpool(_sync)
+        with db_pool.connection() as conn:
+            cur = conn.execute(f"SELECT * FROM {table} WHERE {where_clause} LIMIT 1", params)
+            return _row_to_dict(cur, cur.fetchone())
+    return await run_in_thread(_sync)
+
 
+async def db_find_page(table: str, where_clause: str, params: tuple, order_by: tuple, cursor: Optional[str], limit: int):
+    """One keyset page ordered by order_by (its last column must be unique); returns (rows, next_cursor)"""
+    columns = ", ".join(order_by)
+    conditions = [where_clause] if where_clause else []
+    if cursor:
+        conditions.append(f"({columns}) > ({', '.join(['?'] * len(order_by))})")
+        params = params + tuple(decode_cursor(cursor, len(order_by)))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-async def db_find(table: str, where_clause: str = None, params: tuple = (), limit: int = 1000):
     def _sync():
-        cur = conn.cursor()
-        if where_clause:
-            cur.execute(f"SELECT * FROM {table} WHERE {where_clause} LIMIT ?", params + (limit,))
-        else:
-            cur.execute(f"SELECT * FROM {table} LIMIT ?", (limit,))
-        rows = cur.fetchall()
-        return [ _row_to_dict(cur, r) for r in rows]
-    return await run_in_threadpool(_sync)
+        with db_pool.connection() as conn:
+            cur = conn.execute(f"SELECT * FROM {table} {where} ORDER BY {columns} LIMIT ?", params + (limit + 1,))
+            return [_row_to_dict(cur, r) for r in cur.fetchall()]
+    rows = await run_in_thread(_sync)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*(rows[-1][column] for column in order_by))
 
 
 async def db_insert(table: str, data: dict):
     def _sync():
-        cur = conn.cursor()
-        keys = ",".join(data.keys())
-        placeholders = ",".join(["?"] * len(data))
-        cur.execute(f"INSERT INTO {table} ({keys}) VALUES ({placeholders})", tuple(data.values()))
-        conn.commit()
-        return data
-    return await run_in_threadpool(_sync)
+        with db_pool.connection() as conn:
+            keys = ",".join(data.keys())
+            placeholders = ",".join(["?"] * len(data))
+            conn.execute(f"INSERT INTO {table} ({keys}) VALUES ({placeholders})", tuple(data.values()))
+            return data
+    return await run_write(_sync)
 
 
 async def db_update(table: str, set_clause: str, params: tuple = ()):  # params should include where params
     def _sync():
-        cur = conn.cursor()
-        cur.execute(f"UPDATE {table} SET {set_clause}", params)
-        conn.commit()
-        return cur.rowcount
-    return await run_in_threadpool(_sync)
+        with db_pool.connection() as conn:
+            return conn.execute(f"UPDATE {table} SET {set_clause}", params).rowcount
+    return await run_write(_sync)
 
 
 async def db_delete(table: str, where_clause: str, params: tuple = ()):  # returns deleted count
     def _sync():
-        cur = conn.cursor()
-        cur.execute(f"DELETE FROM {table} WHERE {where_clause}", params)
-        conn.commit()
-        return cur.rowcount
-    return await run_in_threadpool(_sync)
+        with db_pool.connection() as conn:
+            return conn.execute(f"DELETE FROM {table} WHERE {where_clause}", params).rowcount
+    return await run_write(_sync)
 
 
-# Initialize DB at import
-init_db_sync()
+async def db_execute(sql: str, params: tuple = ()):  # returns affected row count
+    def _sync():
+        with db_pool.connection() as conn:
+            return conn.execute(sql, params).rowcount
+    return await run_write(_sync)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class UnitOfWork:
+    """A handler's whole sequence of queries on one connection, inside one transaction"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def find_one(self, table: str, where_clause: str, params: tuple = ()):  # returns dict or None
+        cur = self.conn.execute(f"SELECT * FROM {table} WHERE {where_clause} LIMIT 1", params)
+        return _row_to_dict(cur, cur.fetchone())
+
+    def find_all(self, table: str, where_clause: str, params: tuple = (), order_by: Optional[str] = None):
+        order = f" ORDER BY {order_by}" if order_by else ""
+        cur = self.conn.execute(f"SELECT * FROM {table} WHERE {where_clause}{order}", params)
+        return [_row_to_dict(cur, r) for r in cur.fetchall()]
+
+    def insert(self, table: str, data: dict):
+        self.conn.execute(
+            f"INSERT INTO {table} ({','.join(data.keys())}) VALUES ({','.join(['?'] * len(data))})", tuple(data.values())
+        )
+        return data
+
+    def fetch_one(self, sql: str, params: tuple = ()):  # returns dict or None
+        cur = self.conn.execute(sql, params)
+        return _row_to_dict(cur, cur.fetchone())
+
+    def execute(self, sql: str, params: tuple = ()):  # returns affected row count
+        return self.conn.execute(sql, params).rowcount
+
+
+async def run_unit(work, write: bool = False):
+    """Run work(uow) in one thread hop: a read snapshot, or one transaction on the writer thread"""
+    def _sync():
+        with (db_pool.transaction() if write else db_pool.snapshot()) as conn:
+            return work(UnitOfWork(conn))
+    return await (run_write(_sync) if write else run_in_thread(_sync))
+
+
+# Apply schema migrations at import. migrate() holds the write lock for the
+# whole run, so workers starting together apply each migration once; set
+# DB_MIGRATE_ON_START=0 when migrations.py runs as a separate release step.
+if os.environ.get('DB_MIGRATE_ON_START', '1') != '0':
+    init_db_sync()
+
+# Password hashing (bcrypt on a bounded process pool, off the event loop)
+password_hasher = PasswordHasher.from_env()
 
 # JWT settings
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
@@ -167,6 +210,20 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 # Security
 security = HTTPBearer()
 
+# Authenticated user rows cached by email; invalidated on password reset
+user_cache = UserCache(
+    max_size=int(os.environ.get('USER_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('USER_CACHE_TTL', 60))
+)
+
+# Short-lived state with real TTLs (reset codes, revocations); shared by all workers when backed by SQLite
+ephemeral = store_from_env(db_pool)
+EPHEMERAL_SWEEP_INTERVAL = float(os.environ.get('EPHEMERAL_SWEEP_INTERVAL', 30))
+token_revocations = TokenRevocationList(
+    ephemeral, max_token_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    refresh_interval=float(os.environ.get('TOKEN_REVOCATION_REFRESH', 1.0))
+)
+
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
@@ -201,8 +258,12 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Outermost, so latency covers CORS handling and error responses too
+app.add_middleware(metrics.MetricsMiddleware)
+
 # ==================== MODELS ====================
 
 class UserRegister(BaseModel):
@@ -296,6 +357,90 @@ class SlotResponse(BaseModel):
     price: int
     is_booked: bool
 
+class SlotTemplate(BaseModel):
+    ground_ids: List[str]
+    start_date: date
+    end_date: date
+    days_of_week: Optional[List[int]] = None  # 0 = Monday ... 6 = Sunday, None = every day
+    open_time: time
+    close_time: time
+    duration_minutes: int = Field(60, gt=0, le=24 * 60)
+    price: int
+
+    @field_validator('days_of_week')
+    @classmethod
+    def validate_days(cls, v):
+        if v is not None and any(d < 0 or d > 6 for d in v):
+            raise ValueError('days_of_week must be between 0 (Monday) and 6 (Sunday)')
+        return v
+
+class PriceBand(BaseModel):
+    start_time: time
+    end_time: time
+    price: int
+
+class ScheduleRuleCreate(BaseModel):
+    days_of_week: Optional[List[int]] = None  # 0 = Monday ... 6 = Sunday, None = every day
+    start_date: date
+    end_date: Optional[date] = None  # None = open-ended
+    open_time: time
+    close_time: time
+    duration_minutes: int = Field(60, gt=0, le=24 * 60)
+    price: int
+    price_bands: List[PriceBand] = []  # prices for slots starting inside a band
+
+    @field_validator('days_of_week')
+    @classmethod
+    def validate_days(cls, v):
+        if v is not None and (not v or any(d < 0 or d > 6 for d in v)):
+            raise ValueError('days_of_week must list days between 0 (Monday) and 6 (Sunday)')
+        return v
+
+class ScheduleRuleResponse(BaseModel):
+    id: str
+    ground_id: str
+    days_of_week: List[int]
+    start_date: str
+    end_date: Optional[str] = None
+    open_time: str
+    close_time: str
+    duration_minutes: int
+    price: int
+    price_bands: List[dict]
+
+class SlotExceptionCreate(BaseModel):
+    slot_date: date
+    start_time: time = time(0, 0)
+    end_time: Optional[time] = None  # None = end of day
+    price: Optional[int] = None  # None = closed
+
+class SlotExceptionResponse(BaseModel):
+    ground_id: str
+    slot_date: str
+    start_time: str
+    end_time: str
+    price: Optional[int] = None
+
+class BulkSlotCreate(BaseModel):
+    slots: Optional[List[SlotCreate]] = None
+    template: Optional[SlotTemplate] = None
+
+class BulkSlotResponse(BaseModel):
+    created: int
+    skipped: int
+
+class AvailabilityGround(BaseModel):
+    id: str
+    name: str
+    days: dict  # slot_date -> [[id, start_time, end_time, price, is_booked], ...]
+
+class AvailabilityResponse(BaseModel):
+    venue_id: str
+    from_date: str = Field(serialization_alias="from")
+    to_date: str = Field(serialization_alias="to")
+    columns: List[str]
+    grounds: List[AvailabilityGround]
+
 class BookingCreate(BaseModel):
     slot_id: str
 
@@ -335,23 +480,41 @@ class AnalyticsResponse(BaseModel):
     ground_name: str
     total_bookings: int
     total_revenue: int
+    verified_bookings: int = 0
+    verified_revenue: int = 0
 
 # ==================== HELPER FUNCTIONS ====================
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def _hasher_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
+
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HasherOverloaded:
+        raise _hasher_busy()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str):
+    """Returns (verified, new_hash); new_hash is set when the stored bcrypt cost is out of date"""
+    try:
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
+    except HasherOverloaded:
+        raise _hasher_busy()
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Sub-second iat so a password reset also revokes tokens issued earlier in the same second
+    to_encode.update({"exp": expire, "iat": now.timestamp(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def create_user_token(user: dict) -> str:
+    """Access token carrying the user's id and role alongside the email subject"""
+    return create_access_token({"sub": user["email"], "uid": user["id"], "role": user["role"]})
+
+async def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     token = credentials.credentials
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -362,28 +525,168 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    
-    user = await db_find_one('users', 'email = ?', (email,))
+    # Other workers' revocations are read at most once per refresh interval
+    if token_revocations.stale():
+        await run_in_thread(token_revocations.refresh)
+    if token_revocations.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return payload
+
+async def load_user(email: str) -> dict:
+    user = user_cache.get(email)
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
+        user = await db_find_one('users', 'email = ?', (email,))
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.put(email, user)
     return user
 
+async def get_current_user(claims: dict = Depends(get_token_claims)):
+    return await load_user(claims["sub"])
+
 def require_role(required_roles: List[str]):
-    def role_checker(current_user: dict = Depends(get_current_user)):
+    async def role_checker(claims: dict = Depends(get_token_claims)):
+        # Tokens carry the role, so unauthorized callers are rejected without a DB hit
+        if "role" in claims and claims["role"] not in required_roles:
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+        current_user = await load_user(claims["sub"])
         if current_user["role"] not in required_roles:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         return current_user
     return role_checker
 
-def generate_unique_code():
-    """Generate a unique 6-digit code for bookings"""
-    import string
-    while True:
-        code = ''.join(str(random.randint(0, 9)) for _ in range(6))
-        # Check if code already exists in bookings table
-        existing = db_find_one_sync('bookings', 'verification_code = ?', (code,))
-        if not existing:
-            return code
+def encode_cursor(*values) -> str:
+    """Opaque keyset pagination cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+# Versions of the cached catalog resources, bumped by the write routes
+resource_tracker = resource_versions.VersionTracker(
+    db_pool, refresh_interval=float(os.environ.get('RESOURCE_VERSION_REFRESH', 1.0))
+)
+
+# Catalog and slot list pages cached per resource version; a bump drops the old pages
+read_cache = ReadThroughCache(max_entries=int(os.environ.get('READ_CACHE_SIZE', 2048)))
+resource_tracker.listeners.append(read_cache.invalidate)
+
+async def cached_read(request: Request, resource: str, loader, variant: str = ""):
+    """Serve a read from read_cache, keyed by the resource's current version, the URL and variant"""
+    version = resource_tracker.get(resource)[0]
+    return await read_cache.get_or_load(
+        (resource, version, str(request.url.path), str(request.url.query), variant), loader
+    )
+
+# Cache-Control per cached route; override with CACHE_CONTROL_<ROUTE>,
+# e.g. CACHE_CONTROL_VENUES="public, max-age=60"
+CACHE_CONTROL = {
+    route: os.environ.get(f'CACHE_CONTROL_{route.upper()}', 'no-cache')
+    for route in ('venues', 'venue', 'venue_grounds', 'ground_slots')
+}
+
+def venue_resource(venue_id: str) -> str:
+    return f"venue:{venue_id}"
+
+def venue_grounds_resource(venue_id: str) -> str:
+    return f"venue:{venue_id}:grounds"
+
+def ground_slots_resource(ground_id: str) -> str:
+    return f"ground:{ground_id}:slots"
+
+def booking_code_resource(code: str) -> str:
+    return f"code:{code}"
+
+def pending_code_resources(conn, ground_ids_sql: str, params: tuple) -> list:
+    """Code resources of the pending bookings on the grounds ground_ids_sql selects"""
+    rows = conn.execute(
+        "SELECT b.verification_code FROM bookings b JOIN slots s ON s.id = b.slot_id "
+        f"WHERE b.status = 'pending' AND s.ground_id IN ({ground_ids_sql})",
+        params
+    )
+    return [booking_code_resource(code) for code, in rows]
+
+# Active verification codes -> the verify-code answer; a code resource bump drops the entry
+code_index = CodeIndex(max_entries=int(os.environ.get('CODE_INDEX_SIZE', 50000)))
+resource_tracker.listeners.append(code_index.invalidate)
+
+# Moves past slots and settled bookings to the archive every ARCHIVE_INTERVAL seconds
+archiver = archive.Archiver(
+    db_pool,
+    slot_days=int(os.environ.get('ARCHIVE_SLOT_DAYS', 1)),
+    booking_days=int(os.environ.get('ARCHIVE_BOOKING_DAYS', 30)),
+    batch_size=int(os.environ.get('ARCHIVE_BATCH_SIZE', 500)),
+    on_batch=lambda conn, ground_ids: resource_versions.bump(conn, [ground_slots_resource(g) for g in ground_ids])
+) if ARCHIVE_DB_PATH else None
+ARCHIVE_INTERVAL = float(os.environ.get('ARCHIVE_INTERVAL', 3600))
+
+# Expires pending bookings of ended slots and releases their codes every CODE_EXPIRY_INTERVAL seconds
+booking_expirer = code_allocator.BookingExpirer(db_pool, batch_size=int(os.environ.get('CODE_EXPIRY_BATCH_SIZE', 500)))
+CODE_EXPIRY_INTERVAL = float(os.environ.get('CODE_EXPIRY_INTERVAL', 300))
+
+# Pushes slot created/booked/cancelled deltas to clients watching a venue and date
+slot_hub = SlotEventHub.from_env()
+
+def hot_window(first: Optional[date], last: Optional[date]) -> tuple:
+    """Clip a date range for schedule-generated slots to the dates not yet archived"""
+    if archiver is None or first is None:
+        return first, last
+    first = max(first, archiver.hot_since())
+    return (first, last) if first <= last else (None, None)
+
+async def not_modified(request: Request, response: Response, route: str, resource: str, variant: str = "") -> Optional[Response]:
+    """Set ETag, Last-Modified and Cache-Control; returns a 304 when the client's copy is current.
+
+    variant covers whatever else the body depends on besides the resource version and URL.
+    """
+    if resource_tracker.stale():
+        await run_in_thread(resource_tracker.refresh)
+    version = resource_tracker.get(resource)[0]
+    # Strong: a resource version plus the exact URL and variant always serialize to the same body
+    key = f"{request.url.path}?{request.url.query}" + (f"#{variant}" if variant else "")
+    etag = f'"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+    # Whole seconds, and only once the second of the last write has passed
+    modified = resource_tracker.last_modified(resource)
+    if modified is not None:
+        headers["Last-Modified"] = formatdate(modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    elif modified is not None and request.headers.get("if-modified-since"):
+        # Only consulted without If-None-Match; the ETag is exact, this is not
+        try:
+            since = int(parsedate_to_datetime(request.headers["if-modified-since"]).timestamp())
+        except (TypeError, ValueError):
+            return None
+        if modified <= since:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+# Length of player and booking verification codes; raising it starts a fresh code sequence
+VERIFICATION_CODE_LENGTH = int(os.environ.get('VERIFICATION_CODE_LENGTH', 6))
+
+def allocate_code(conn) -> str:
+    """Allocate a unique verification code inside the caller's write transaction"""
+    try:
+        return code_allocator.allocate(conn, VERIFICATION_CODE_LENGTH)
+    except code_allocator.CodeSpaceExhausted:
+        logger.error("Verification code space exhausted; increase VERIFICATION_CODE_LENGTH")
+        raise HTTPException(status_code=503, detail="Unable to allocate a verification code")
 
 # ==================== AUTH ROUTES ====================
 
@@ -394,9 +697,6 @@ async def register(user: UserRegister):
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
     
-    # Generate unique verification code
-    verification_code = generate_unique_code()
-    
     # Create user
     user_doc = {
         "id": str(datetime.now(timezone.utc).timestamp()),
@@ -404,16 +704,26 @@ async def register(user: UserRegister):
         "username": user.username,
         "mobileNumber": user.mobileNumber,
         "email": user.email,
-        "password_hash": hash_password(user.password),
+        "password_hash": await hash_password(user.password),
         "role": user.role,
-        "verification_code": verification_code,
+        "verification_code": None,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db_insert('users', user_doc)
+    # Allocate the unique verification code and insert the user together
+    def _sync():
+        with db_pool.transaction() as conn:
+            user_doc["verification_code"] = allocate_code(conn)
+            conn.execute(
+                f"INSERT INTO users ({','.join(user_doc.keys())}) VALUES ({','.join(['?'] * len(user_doc))})",
+                tuple(user_doc.values())
+            )
+
+    await run_write(_sync)
+    verification_code = user_doc["verification_code"]
     
     # Create token
-    access_token = create_access_token({"sub": user.email})
+    access_token = create_user_token(user_doc)
     
     return {
         "access_token": access_token,
@@ -432,10 +742,17 @@ async def register(user: UserRegister):
 async def login(credentials: UserLogin):
     # Try to find user by email or username
     user = await db_find_one('users', 'email = ? OR username = ?', (credentials.identifier, credentials.identifier))
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    verified, new_hash = await verify_password(credentials.password, user["password_hash"])
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Transparently upgrade hashes made with a different BCRYPT_ROUNDS
+        await db_execute('UPDATE users SET password_hash = ? WHERE id = ?', (new_hash, user["id"]))
+        user_cache.invalidate(user["email"])
     
-    access_token = create_access_token({"sub": user["email"]})
+    access_token = create_user_token(user)
     
     return {
         "access_token": access_token,
@@ -461,8 +778,19 @@ async def get_me(current_user: dict = Depends(get_current_user)):
         "created_at": current_user["created_at"]
     }
 
-# Password reset storage (in-memory for simplicity, use Redis in production)
-password_reset_codes = {}
+@api_router.post("/auth/logout")
+async def logout(claims: dict = Depends(get_token_claims)):
+    """Revoke the presented access token"""
+    if "jti" in claims:
+        await run_in_thread(token_revocations.revoke, claims["jti"], claims["exp"])
+    else:
+        # Tokens issued before jti claims existed can only be revoked per user
+        await run_in_thread(token_revocations.revoke_user, claims["sub"])
+    return {"message": "Logged out successfully"}
+
+# Password reset codes live in the ephemeral store and expire on their own
+PASSWORD_RESET_NAMESPACE = "password_reset"
+PASSWORD_RESET_TTL = int(os.environ.get('PASSWORD_RESET_TTL', 15 * 60))
 
 class ForgotPasswordRequest(BaseModel):
     email: str
@@ -488,11 +816,10 @@ async def forgot_password(request: ForgotPasswordRequest):
     import random
     reset_code = str(random.randint(100000, 999999))
     
-    # Store code with expiry (in production, use Redis with TTL)
-    password_reset_codes[request.email] = {
-        "code": reset_code,
-        "expires": datetime.utcnow().isoformat()
-    }
+    # Store code with expiry; a new request replaces any earlier code
+    await run_in_thread(
+        ephemeral.set, PASSWORD_RESET_NAMESPACE, request.email, {"code": reset_code}, PASSWORD_RESET_TTL
+    )
     
     # In production, send email with the code
     # For now, we'll use the user's verification_code as the reset code for simplicity
@@ -503,7 +830,7 @@ async def forgot_password(request: ForgotPasswordRequest):
 @api_router.post("/auth/verify-reset-code")
 async def verify_reset_code(request: VerifyResetCodeRequest):
     """Verify the password reset code"""
-    stored = password_reset_codes.get(request.email)
+    stored = await run_in_thread(ephemeral.get, PASSWORD_RESET_NAMESPACE, request.email)
     if not stored or stored["code"] != request.verification_code:
         raise HTTPException(status_code=400, detail="Invalid or expired verification code")
     
@@ -512,7 +839,8 @@ async def verify_reset_code(request: VerifyResetCodeRequest):
 @api_router.post("/auth/reset-password")
 async def reset_password(request: ResetPasswordRequest):
     """Reset password with verified code"""
-    stored = password_reset_codes.get(request.email)
+    # Consume the code atomically so two concurrent resets cannot both use it
+    stored = await run_in_thread(ephemeral.pop, PASSWORD_RESET_NAMESPACE, request.email)
     if not stored or stored["code"] != request.verification_code:
         raise HTTPException(status_code=400, detail="Invalid or expired verification code")
     
@@ -521,200 +849,568 @@ async def reset_password(request: ResetPasswordRequest):
         raise HTTPException(status_code=404, detail="User not found")
     
     # Hash new password
-    hashed_password = pwd_context.hash(request.new_password)
+    hashed_password = await hash_password(request.new_password)
     
     # Update password in database
     await db_execute(
-        'UPDATE users SET password = ? WHERE email = ?',
+        'UPDATE users SET password_hash = ? WHERE email = ?',
         (hashed_password, request.email)
     )
     
-    # Remove used reset code
-    del password_reset_codes[request.email]
+    # Drop the cached row and sign out every session issued before the reset
+    user_cache.invalidate(request.email)
+    await run_in_thread(token_revocations.revoke_user, request.email)
     
     return {"message": "Password reset successfully"}
 
+# Everything verify-code answers with, in one query. Codes are reused after
+# verification or expiry, so prefer the pending booking holding a code.
+VERIFY_LOOKUP = """
+    SELECT b.id AS booking_id, b.status, b.slot_id,
+           u.email AS player_email, u.fullName AS player_name, u.mobileNumber AS mobile_number,
+           s.ground_id, s.slot_date, s.start_time, s.end_time, s.price,
+           g.venue_id, g.name AS ground_name, v.name AS venue_name
+    FROM bookings b
+    LEFT JOIN users u ON u.email = b.user_id
+    LEFT JOIN slots s ON s.id = b.slot_id
+    LEFT JOIN grounds g ON g.id = s.ground_id
+    LEFT JOIN venues v ON v.id = g.venue_id
+    WHERE b.verification_code = ?
+    ORDER BY b.status = 'pending' DESC, b.booked_at DESC
+    LIMIT 1
+"""
+
+async def lookup_code(code: str) -> dict:
+    """The VERIFY_LOOKUP row for a code, from code_index when the code is active and indexed"""
+    if resource_tracker.stale():
+        await run_in_thread(resource_tracker.refresh)
+    row = code_index.get(code)
+    if row is not None:
+        return row
+    version = resource_tracker.get(booking_code_resource(code))[0]
+    row = await run_unit(lambda uow: uow.fetch_one(VERIFY_LOOKUP, (code,)))
+    # A cancel or confirm noted while the query ran may have been read before it
+    if row is not None and resource_tracker.get(booking_code_resource(code))[0] == version:
+        code_index.put(code, row)
+    return row
+
 @api_router.post("/bookings/verify-code", response_model=VerifyCodeResponse)
 async def verify_code(request: VerifyCodeRequest):
     """Owner verifies booking code to confirm single booking"""
-    # Find booking by verification code
-    booking = await db_find_one('bookings', 'verification_code = ?', (request.verification_code,))
-    if not booking:
+    row = await lookup_code(request.verification_code)
+    if not row:
         raise HTTPException(status_code=404, detail="Invalid verification code")
-    
-    # Find player details
-    player = await db_find_one('users', 'email = ?', (booking["user_id"],))
-    if not player:
+    if row["player_email"] is None:
         raise HTTPException(status_code=404, detail="Player not found")
-    
-    # Get slot details
-    slot = await db_find_one('slots', 'id = ?', (booking["slot_id"],))
-    if not slot:
+    if row["slot_date"] is None:
         raise HTTPException(status_code=404, detail="Slot not found")
-    
-    # Get ground details
-    ground = await db_find_one('grounds', 'id = ?', (slot["ground_id"],))
-    if not ground:
+    if row["venue_id"] is None:
         raise HTTPException(status_code=404, detail="Ground not found")
-    
-    # Get venue details
-    venue = await db_find_one('venues', 'id = ?', (ground["venue_id"],))
-    
+
     return {
         "success": True,
-        "booking_id": booking["id"],
-        "player_name": player["fullName"],
-        "player_email": player["email"],
-        "mobile_number": player["mobileNumber"],
-        "venue_name": venue["name"] if venue else "Unknown",
-        "ground_name": ground["name"],
-        "booking_date": slot["slot_date"],
-        "booking_time": f"{slot['start_time']} - {slot['end_time']}",
-        "booking_price": slot["price"],
-        "status": booking.get("status", "pending")
+        "booking_id": row["booking_id"],
+        "player_name": row["player_name"],
+        "player_email": row["player_email"],
+        "mobile_number": row["mobile_number"],
+        "venue_name": row["venue_name"] or "Unknown",
+        "ground_name": row["ground_name"],
+        "booking_date": row["slot_date"],
+        "booking_time": f"{row['start_time']} - {row['end_time']}",
+        "booking_price": row["price"],
+        "status": row["status"] or "pending"
     }
 
 @api_router.post("/bookings/confirm-verification")
 async def confirm_verification(request: VerifyCodeRequest, current_user: dict = Depends(require_role(["owner"]))):
     """Owner confirms single booking after verification"""
-    # Find booking by verification code
-    booking = await db_find_one('bookings', 'verification_code = ?', (request.verification_code,))
-    if not booking:
-        raise HTTPException(status_code=404, detail="Invalid verification code")
-    
-    # Check if already verified
-    if booking.get("status") == "verified":
-        raise HTTPException(status_code=400, detail="Booking already verified")
-    
-    # Get slot and venue to calculate revenue for owner
-    slot = await db_find_one('slots', 'id = ?', (booking["slot_id"],))
-    if not slot:
-        raise HTTPException(status_code=404, detail="Slot not found")
-    
-    # Update single booking to verified
-    def _sync():
-        cur = conn.cursor()
+    code = request.verification_code
+    indexed = code_index.get(code)
+
+    def _work(uow):
         verified_at = datetime.now(timezone.utc).isoformat()
-        cur.execute(
-            "UPDATE bookings SET status = ?, verified_at = ? WHERE id = ?",
-            ("verified", verified_at, booking["id"])
-        )
-        conn.commit()
-        return verified_at
-    
-    verified_at = await run_in_threadpool(_sync)
+        # An indexed code names its booking; the update itself re-checks it is still pending
+        row = indexed if indexed is not None and uow.execute(
+            "UPDATE bookings SET status = 'verified', verified_at = ? WHERE id = ? AND verification_code = ? AND status = 'pending'",
+            (verified_at, indexed["booking_id"], code)
+        ) else None
+        if row is None:
+            row = uow.fetch_one(VERIFY_LOOKUP, (code,))
+            if not row:
+                raise HTTPException(status_code=404, detail="Invalid verification code")
+            if row["status"] == "verified":
+                raise HTTPException(status_code=400, detail="Booking already verified")
+            # Expired bookings have already given their code back; confirming
+            # one would count revenue and release the code a second time
+            if row["status"] == "expired":
+                raise HTTPException(status_code=400, detail="Booking has expired")
+            if row["slot_date"] is None:
+                raise HTTPException(status_code=404, detail="Slot not found")
+            updated = uow.execute(
+                "UPDATE bookings SET status = 'verified', verified_at = ? WHERE id = ? AND status = 'pending'",
+                (verified_at, row["booking_id"])
+            )
+            if not updated:
+                raise HTTPException(status_code=400, detail="Booking is not pending")
+        code_allocator.release(uow.conn, code)
+        rollups.apply_delta(uow.conn, row["ground_id"], row["slot_date"], verified_bookings=1, verified_revenue=row["price"])
+        resources = [booking_code_resource(code)]
+        return row, verified_at, resources, resource_versions.bump(uow.conn, resources)
+
+    row, verified_at, resources, bumped = await run_unit(_work, write=True)
+    resource_tracker.note(resources, *bumped)
     
     return {
         "success": True,
-        "message": f"Booking verified successfully. ₹{slot['price']} added to your revenue.",
-        "booking_id": booking["id"],
-        "amount_added": slot["price"],
+        "message": f"Booking verified successfully. ₹{row['price']} added to your revenue.",
+        "booking_id": row["booking_id"],
+        "amount_added": row["price"],
         "verified_at": verified_at
     }
 
 # ==================== PLAYER ROUTES ====================
 
 @api_router.get("/venues", response_model=List[VenueResponse])
-async def get_venues():
-    venues = await db_find('venues')
+async def get_venues(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    cached = await not_modified(request, response, 'venues', 'venues')
+    if cached:
+        return cached
+    venues, next_cursor = await cached_read(
+        request, 'venues', lambda: db_find_page('venues', None, (), ('id',), cursor, limit)
+    )
+    set_next_cursor(response, next_cursor)
     return venues
 
 @api_router.get("/venues/{venue_id}", response_model=VenueResponse)
-async def get_venue(venue_id: str):
-    venue = await db_find_one('venues', 'id = ?', (venue_id,))
+async def get_venue(venue_id: str, request: Request, response: Response):
+    cached = await not_modified(request, response, 'venue', venue_resource(venue_id))
+    if cached:
+        return cached
+    venue = await cached_read(request, venue_resource(venue_id), lambda: db_find_one('venues', 'id = ?', (venue_id,)))
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
     return venue
 
 @api_router.get("/venues/{venue_id}/grounds", response_model=List[GroundResponse])
-async def get_venue_grounds(venue_id: str):
-    grounds = await db_find('grounds', 'venue_id = ?', (venue_id,))
+async def get_venue_grounds(
+    venue_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    cached = await not_modified(request, response, 'venue_grounds', venue_grounds_resource(venue_id))
+    if cached:
+        return cached
+    grounds, next_cursor = await cached_read(
+        request, venue_grounds_resource(venue_id),
+        lambda: db_find_page('grounds', 'venue_id = ?', (venue_id,), ('id',), cursor, limit)
+    )
+    set_next_cursor(response, next_cursor)
     return grounds
 
+# Days of schedule-generated slots listed when no slot_date is given
+SCHEDULE_HORIZON_DAYS = int(os.environ.get('SCHEDULE_HORIZON_DAYS', 30))
+
 @api_router.get("/grounds/{ground_id}/slots", response_model=List[SlotResponse])
-async def get_ground_slots(ground_id: str, slot_date: Optional[str] = None):
+async def get_ground_slots(
+    ground_id: str,
+    request: Request,
+    response: Response,
+    slot_date: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    # Without a date, schedule rules are expanded from today, so the body changes at midnight
+    today = datetime.now(timezone.utc).date()
+    variant = "" if slot_date else today.isoformat()
+    cached = await not_modified(request, response, 'ground_slots', ground_slots_resource(ground_id), variant)
+    if cached:
+        return cached
+    # Chronological; stored slots are served from idx_slots_ground_keyset
     if slot_date:
-        slots = await db_find('slots', 'ground_id = ? AND slot_date = ?', (ground_id, slot_date))
+        where, params, order_by = 'ground_id = ? AND slot_date = ?', (ground_id, slot_date), ('start_time', 'id')
+        try:
+            first = last = date.fromisoformat(slot_date)
+        except ValueError:
+            first = last = None
     else:
-        slots = await db_find('slots', 'ground_id = ?', (ground_id,))
-    for s in slots:
-        if s and 'is_booked' in s:
-            s['is_booked'] = bool(s['is_booked'])
+        where, params, order_by = 'ground_id = ?', (ground_id,), ('slot_date', 'start_time', 'id')
+        first, last = today, today + timedelta(days=SCHEDULE_HORIZON_DAYS - 1)
+    first, last = hot_window(first, last)
+
+    def sort_key(slot):
+        return tuple(slot[column] for column in order_by)
+
+    def _generated():
+        with db_pool.connection() as conn:
+            return schedules.virtual_slots(conn, [ground_id], first, last).get(ground_id, [])
+
+    async def load():
+        slots, next_cursor = await db_find_page('slots', where, params, order_by, cursor, limit)
+        for s in slots:
+            if s and 'is_booked' in s:
+                s['is_booked'] = bool(s['is_booked'])
+        generated = await run_in_thread(_generated) if first else []
+        if not generated:
+            return slots, next_cursor
+        if cursor:
+            after = tuple(decode_cursor(cursor, len(order_by)))
+            generated = [slot for slot in generated if sort_key(slot) > after]
+        # A full stored page ends at or before anything it left out, so merging
+        # and cutting at limit never skips a stored slot
+        merged = sorted(slots + generated, key=sort_key)
+        page = merged[:limit]
+        more = next_cursor is not None or len(merged) > limit
+        return page, encode_cursor(*sort_key(page[-1])) if more and page else None
+
+    slots, next_cursor = await cached_read(request, ground_slots_resource(ground_id), load, variant)
+    set_next_cursor(response, next_cursor)
     return slots
 
+AVAILABILITY_COLUMNS = ["id", "start_time", "end_time", "price", "is_booked"]
+MAX_AVAILABILITY_DAYS = 31
+
+@api_router.get("/venues/{venue_id}/availability", response_model=AvailabilityResponse, response_model_by_alias=True)
+async def get_venue_availability(
+    venue_id: str,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to")
+):
+    """Slot availability for every ground of a venue over a date range, from one query.
+
+    Each ground maps slot dates to rows ordered as AVAILABILITY_COLUMNS, with
+    is_booked encoded as 0/1.
+    """
+    from_date = from_date or datetime.now(timezone.utc).date()
+    to_date = to_date or from_date
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_AVAILABILITY_DAYS} days")
+
+    def _sync():
+        with db_pool.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT g.id, g.name, s.slot_date, s.id, s.start_time, s.end_time, s.price, s.is_booked
+                FROM grounds g
+                LEFT JOIN slots s ON s.ground_id = g.id AND s.slot_date BETWEEN ? AND ?
+                WHERE g.venue_id = ?
+                ORDER BY g.rowid, s.slot_date, s.start_time
+                """,
+                (from_date.isoformat(), to_date.isoformat(), venue_id)
+            ).fetchall()
+            if not rows and not conn.execute("SELECT 1 FROM venues WHERE id = ?", (venue_id,)).fetchone():
+                raise HTTPException(status_code=404, detail="Venue not found")
+            ground_ids = list(dict.fromkeys(row[0] for row in rows))
+            first, last = hot_window(from_date, to_date)
+            return rows, schedules.virtual_slots(conn, ground_ids, first, last) if first else {}
+
+    rows, generated = await run_in_thread(_sync)
+    grounds = {}
+    for ground_id, ground_name, slot_date, slot_id, start_time, end_time, price, is_booked in rows:
+        ground = grounds.setdefault(ground_id, {"id": ground_id, "name": ground_name, "days": {}})
+        if slot_id is not None:
+            ground["days"].setdefault(slot_date, []).append([slot_id, start_time, end_time, price, 1 if is_booked else 0])
+    for ground_id, slots in generated.items():
+        days = grounds[ground_id]["days"]
+        for slot in slots:
+            days.setdefault(slot["slot_date"], []).append(
+                [slot["id"], slot["start_time"], slot["end_time"], slot["price"], 0]
+            )
+        grounds[ground_id]["days"] = {d: sorted(days[d], key=lambda row: row[1]) for d in sorted(days)}
+
+    return {
+        "venue_id": venue_id,
+        "from_date": from_date.isoformat(),
+        "to_date": to_date.isoformat(),
+        "columns": AVAILABILITY_COLUMNS,
+        "grounds": list(grounds.values())
+    }
+
+MAX_WATCHED_DATES = 31
+
+@api_router.get("/venues/{venue_id}/slot-events")
+async def stream_slot_events(venue_id: str, dates: List[date] = Query(..., alias="date")):
+    """Server-Sent Events stream of slot deltas for a venue on the given dates.
+
+    Each event's data is one JSON delta (slot.created, slot.booked,
+    slot.cancelled); {"type": "resync"} means re-fetch availability.
+    """
+    if len(dates) > MAX_WATCHED_DATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_WATCHED_DATES} dates per stream")
+    if slot_hub.full:
+        raise HTTPException(status_code=503, detail="Too many slot event subscribers")
+
+    async def events():
+        # Subscribe once streaming starts, so a client gone before then leaves nothing behind
+        try:
+            subscription = slot_hub.subscribe()
+        except HubFull:
+            return
+        try:
+            for slot_date in dates:
+                slot_hub.watch(subscription, venue_id, slot_date.isoformat())
+            yield f"retry: 3000\n: watching {len(dates)} dates\n\n"
+            while True:
+                batch = await subscription.next_batch(slot_hub.heartbeat)
+                yield "".join(f"data: {message}\n\n" for message in batch) if batch else ": ping\n\n"
+        finally:
+            slot_hub.close(subscription)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _slot_event_command(subscription, command) -> Optional[str]:
+    """Apply one WebSocket watch/unwatch command; returns an error message or None"""
+    if not isinstance(command, dict):
+        return "Commands are JSON objects"
+    action = command.get("action")
+    venue_id = command.get("venue_id")
+    try:
+        slot_date = date.fromisoformat(str(command.get("date"))).isoformat()
+    except ValueError:
+        return f"Invalid date: {command.get('date')}"
+    if not isinstance(venue_id, str):
+        return "venue_id is required"
+    if action == "watch":
+        if len(subscription.topics) >= MAX_WATCHED_DATES:
+            return f"At most {MAX_WATCHED_DATES} topics per connection"
+        slot_hub.watch(subscription, venue_id, slot_date)
+    elif action == "unwatch":
+        slot_hub.unwatch(subscription, venue_id, slot_date)
+    else:
+        return f"Unknown action: {action}"
+    return None
+
+@api_router.websocket("/slot-events/ws")
+async def slot_events_socket(websocket: WebSocket):
+    """WebSocket variant: send {"action": "watch"|"unwatch", "venue_id": ..., "date": ...} to change topics"""
+    await websocket.accept()
+    try:
+        subscription = slot_hub.subscribe()
+    except HubFull:
+        await websocket.close(code=1013)
+        return
+
+    async def send_events():
+        try:
+            while True:
+                for message in await subscription.next_batch(slot_hub.heartbeat):
+                    await websocket.send_text(message)
+        except Exception:
+            # The socket is gone; the receive side sees the disconnect and ends the session
+            return
+
+    try:
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(send_events)
+            try:
+                while True:
+                    try:
+                        command = await websocket.receive_json()
+                    except ValueError:
+                        command = None
+                    error = _slot_event_command(subscription, command)
+                    if error:
+                        subscription.offer(json.dumps({"type": "error", "detail": error}))
+            except WebSocketDisconnect:
+                pass
+            finally:
+                tasks.cancel_scope.cancel()
+    finally:
+        slot_hub.close(subscription)
+
 @api_router.post("/bookings", response_model=BookingResponse)
 async def create_booking(booking: BookingCreate, current_user: dict = Depends(get_current_user)):
-    # Check if slot exists and is not booked
-    slot = await db_find_one('slots', 'id = ?', (booking.slot_id,))
-    if not slot:
-        raise HTTPException(status_code=404, detail="Slot not found")
-    if slot.get("is_booked"):
-        raise HTTPException(status_code=400, detail="Slot already booked")
-    
-    # Generate unique verification code for this booking
-    verification_code = generate_unique_code()
-    
-    # Create booking
-    booking_doc = {
-        "id": str(datetime.now(timezone.utc).timestamp()),
-        "user_id": current_user["email"],
-        "slot_id": booking.slot_id,
-        "verification_code": verification_code,
-        "status": "pending",
-        "booked_at": datetime.now(timezone.utc).isoformat()
-    }
-    
-    await db_insert('bookings', booking_doc)
-    await db_update('slots', 'is_booked = ? WHERE id = ?', (1, booking.slot_id))
+    # Claim the slot and insert the booking in one write transaction so two
+    # players racing for the same slot can never both succeed
+    def _sync():
+        with db_pool.transaction() as conn:
+            claimed = conn.execute(
+                "UPDATE slots SET is_booked = 1 WHERE id = ? AND is_booked = 0 RETURNING ground_id, slot_date, start_time, end_time, price",
+                (booking.slot_id,)
+            ).fetchone()
+            stored = 0
+            if not claimed:
+                if conn.execute("SELECT 1 FROM slots WHERE id = ?", (booking.slot_id,)).fetchone():
+                    raise HTTPException(status_code=400, detail="Slot already booked")
+                # A slot generated by a schedule rule is stored once it is booked
+                slot = schedules.resolve(conn, booking.slot_id)
+                if slot is None or (archiver is not None and slot["slot_date"] < archiver.hot_since().isoformat()):
+                    raise HTTPException(status_code=404, detail="Slot not found")
+                conn.execute(
+                    "INSERT INTO slots (id, ground_id, slot_date, start_time, end_time, price, is_booked) VALUES (?, ?, ?, ?, ?, ?, 1)",
+                    (slot["id"], slot["ground_id"], slot["slot_date"], slot["start_time"], slot["end_time"], slot["price"])
+                )
+                claimed, stored = (slot["ground_id"], slot["slot_date"], slot["start_time"], slot["end_time"], slot["price"]), 1
+
+            # Create booking with a unique verification code
+            booking_doc = {
+                "id": str(datetime.now(timezone.utc).timestamp()),
+                "user_id": current_user["email"],
+                "slot_id": booking.slot_id,
+                "verification_code": allocate_code(conn),
+                "status": "pending",
+                "booked_at": datetime.now(timezone.utc).isoformat()
+            }
+            conn.execute(
+                "INSERT INTO bookings (id, user_id, slot_id, verification_code, status, booked_at) VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(booking_doc.values())
+            )
+            ground_id, slot_date, start_time, end_time, price = claimed
+            rollups.apply_delta(conn, ground_id, slot_date, total_slots=stored, booked_slots=1, booked_revenue=price)
+            venue_id, ground_name, venue_name = conn.execute(
+                "SELECT g.venue_id, g.name, v.name FROM grounds g LEFT JOIN venues v ON v.id = g.venue_id WHERE g.id = ?",
+                (ground_id,)
+            ).fetchone() or (None, None, None)
+            # The verify-code answer for the new code, as VERIFY_LOOKUP would return it
+            verify_row = {
+                "booking_id": booking_doc["id"], "status": "pending", "slot_id": booking.slot_id,
+                "player_email": current_user["email"], "player_name": current_user.get("fullName"),
+                "mobile_number": current_user.get("mobileNumber"),
+                "ground_id": ground_id, "slot_date": slot_date, "start_time": start_time, "end_time": end_time, "price": price,
+                "venue_id": venue_id, "ground_name": ground_name, "venue_name": venue_name
+            }
+            resources = [ground_slots_resource(ground_id)]
+            return booking_doc, verify_row, resources, resource_versions.bump(conn, resources)
+
+    booking_doc, verify_row, resources, bumped = await run_write(_sync)
+    resource_tracker.note(resources, *bumped)
+    if verify_row["venue_id"] is not None:
+        code_index.put(booking_doc["verification_code"], verify_row)
+        slot_hub.publish("slot.booked", verify_row["venue_id"], verify_row["slot_date"],
+                         ground_id=verify_row["ground_id"], slot_id=booking.slot_id)
     
     return {
         "id": booking_doc["id"],
         "user_id": booking_doc["user_id"],
         "slot_id": booking_doc["slot_id"],
-        "verification_code": verification_code,
+        "verification_code": booking_doc["verification_code"],
         "status": "pending",
         "booked_at": booking_doc["booked_at"],
         "verified_at": None
     }
 
 @api_router.get("/bookings/my", response_model=List[BookingResponse])
-async def get_my_bookings(current_user: dict = Depends(get_current_user)):
-    bookings = await db_find('bookings', 'user_id = ?', (current_user["email"],))
-    
-    # Enrich bookings with slot, ground, and venue details
-    enriched_bookings = []
-    for booking in bookings:
-        slot = await db_find_one('slots', 'id = ?', (booking["slot_id"],))
-        if slot:
-            ground = await db_find_one('grounds', 'id = ?', (slot["ground_id"],))
-            if ground:
-                venue = await db_find_one('venues', 'id = ?', (ground["venue_id"],))
-                booking["venue_name"] = venue["name"] if venue else "Unknown"
-                booking["ground_name"] = ground["name"]
-                booking["slot_date"] = slot["slot_date"]
-                booking["start_time"] = slot["start_time"]
-                booking["end_time"] = slot["end_time"]
-                booking["price"] = slot["price"]
-        enriched_bookings.append(booking)
-    
-    return enriched_bookings
+async def get_my_bookings(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    when: Optional[str] = Query(None, pattern="^(upcoming|past)$"),
+    status: Optional[str] = Query(None, pattern="^(pending|verified|expired)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    # One joined query per page, newest bookings first; the next page's
+    # cursor is returned in the X-Next-Cursor header
+    where = ["b.user_id = ?"]
+    params = [current_user["email"]]
+    if cursor:
+        booked_at, booking_id = decode_cursor(cursor, 2)
+        where.append("(b.booked_at, b.id) < (?, ?)")
+        params += [booked_at, booking_id]
+    if when:
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M")
+        where.append(f"(s.slot_date || 'T' || s.start_time) {'>=' if when == 'upcoming' else '<'} ?")
+        params.append(now)
+    if status:
+        where.append("b.status = ?")
+        params.append(status)
+
+    # Archived bookings are paged with the same keyset and merged in; archive
+    # copies of rows still in main (an interrupted archive batch) are skipped
+    tiers = ["main", "archive"] if ARCHIVE_DB_PATH else ["main"]
+    sql = f"""
+        SELECT b.id, b.user_id, b.slot_id, b.verification_code, b.status, b.booked_at, b.verified_at,
+               CASE WHEN g.id IS NOT NULL THEN COALESCE(v.name, 'Unknown') END AS venue_name,
+               g.name AS ground_name, s.slot_date, s.start_time, s.end_time, s.price
+        FROM {{tier}}.bookings b
+        LEFT JOIN {{tier}}.slots s ON s.id = b.slot_id
+        LEFT JOIN grounds g ON g.id = s.ground_id
+        LEFT JOIN venues v ON v.id = g.venue_id
+        WHERE {' AND '.join(where)}{{skip_copies}}
+        ORDER BY b.booked_at DESC, b.id DESC
+        LIMIT ?
+    """
+
+    def _sync():
+        rows = []
+        with db_pool.connection() as conn:
+            for tier in tiers:
+                skip_copies = f" AND {archive.not_in_main('bookings', 'b')}" if tier == "archive" else ""
+                cur = conn.execute(sql.format(tier=tier, skip_copies=skip_copies), tuple(params) + (limit + 1,))
+                rows += [_row_to_dict(cur, r) for r in cur.fetchall()]
+        if len(tiers) > 1:
+            rows.sort(key=lambda b: (b["booked_at"] or "", b["id"]), reverse=True)
+        return rows[:limit + 1]
+
+    bookings = await run_in_thread(_sync)
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        set_next_cursor(response, encode_cursor(bookings[-1]["booked_at"], bookings[-1]["id"]))
+    return bookings
 
 @api_router.delete("/bookings/{booking_id}")
 async def cancel_booking(booking_id: str, current_user: dict = Depends(get_current_user)):
-    booking = await db_find_one('bookings', 'id = ? AND user_id = ?', (booking_id, current_user["email"]))
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    
-    # Check if slot is more than 1 hour away
-    slot = await db_find_one('slots', 'id = ?', (booking["slot_id"],))
-    if slot:
-        slot_datetime = datetime.fromisoformat(f"{slot['slot_date']}T{slot['start_time']}").replace(tzinfo=timezone.utc)
-        if datetime.now(timezone.utc) >= slot_datetime - timedelta(hours=1):
-            raise HTTPException(status_code=400, detail="Cannot cancel booking within 1 hour of slot time")
-    
-    # Delete booking and unmark slot
-    await db_delete('bookings', 'id = ?', (booking_id,))
-    await db_update('slots', 'is_booked = ? WHERE id = ?', (0, booking["slot_id"]))
+    # Delete the booking and release its slot in one write transaction
+    def _sync():
+        with db_pool.transaction() as conn:
+            cur = conn.execute(
+                """
+                SELECT b.slot_id, b.status, b.verification_code, s.ground_id, s.slot_date, s.start_time, s.price, s.is_booked,
+                       g.venue_id
+                FROM bookings b LEFT JOIN slots s ON s.id = b.slot_id LEFT JOIN grounds g ON g.id = s.ground_id
+                WHERE b.id = ? AND b.user_id = ?
+                """,
+                (booking_id, current_user["email"])
+            )
+            row = cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Booking not found")
+            slot_id, booking_status, code, ground_id, slot_date, start_time, price, is_booked, venue_id = row
+
+            # Check if slot is more than 1 hour away
+            if slot_date is not None:
+                slot_datetime = datetime.fromisoformat(f"{slot_date}T{start_time}").replace(tzinfo=timezone.utc)
+                if datetime.now(timezone.utc) >= slot_datetime - timedelta(hours=1):
+                    raise HTTPException(status_code=400, detail="Cannot cancel booking within 1 hour of slot time")
+
+            conn.execute("DELETE FROM bookings WHERE id = ?", (booking_id,))
+            # A schedule-generated slot goes back to being virtual
+            generated = schedules.parse_slot_id(slot_id) is not None
+            if generated:
+                conn.execute("DELETE FROM slots WHERE id = ?", (slot_id,))
+            else:
+                conn.execute("UPDATE slots SET is_booked = 0 WHERE id = ?", (slot_id,))
+            code_allocator.release(conn, code)
+            if slot_date is None:
+                return None, [], None
+            verified = booking_status == "verified"
+            rollups.apply_delta(
+                conn, ground_id, slot_date,
+                total_slots=-1 if generated else 0,
+                booked_slots=-1 if is_booked else 0,
+                booked_revenue=-price if is_booked else 0,
+                verified_bookings=-1 if verified else 0,
+                verified_revenue=-price if verified else 0
+            )
+            resources = [ground_slots_resource(ground_id), booking_code_resource(code)]
+            event = (venue_id, slot_date, ground_id, slot_id) if venue_id else None
+            return event, resources, resource_versions.bump(conn, resources)
+
+    event, resources, bumped = await run_write(_sync)
+    if bumped:
+        resource_tracker.note(resources, *bumped)
+    if event:
+        venue_id, slot_date, ground_id, slot_id = event
+        slot_hub.publish("slot.cancelled", venue_id, slot_date, ground_id=ground_id, slot_id=slot_id)
     
     return {"message": "Booking cancelled successfully"}
 
@@ -729,85 +1425,122 @@ async def create_venue(venue: VenueCreate, current_user: dict = Depends(require_
         "image_url": venue.image_url,
         "owner_id": current_user["email"]
     }
+    resources = ['venues', venue_resource(venue_doc["id"])]
     
-    await db_insert('venues', venue_doc)
+    def _sync():
+        with db_pool.transaction() as conn:
+            conn.execute(
+                "INSERT INTO venues (id, name, location, image_url, owner_id) VALUES (?, ?, ?, ?, ?)",
+                tuple(venue_doc.values())
+            )
+            return resource_versions.bump(conn, resources)
+
+    resource_tracker.note(resources, *await run_write(_sync))
     return venue_doc
 
 @api_router.get("/owner/venues", response_model=List[VenueResponse])
-async def get_owner_venues(current_user: dict = Depends(require_role(["owner", "admin"]))):
-    venues = await db_find('venues', 'owner_id = ?', (current_user["email"],))
+async def get_owner_venues(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(require_role(["owner", "admin"]))
+):
+    venues, next_cursor = await db_find_page('venues', 'owner_id = ?', (current_user["email"],), ('id',), cursor, limit)
+    set_next_cursor(response, next_cursor)
     return venues
 
 @api_router.put("/owner/venues/{venue_id}", response_model=VenueResponse)
 async def update_venue(venue_id: str, venue: VenueCreate, current_user: dict = Depends(require_role(["owner", "admin"]))):
-    existing_venue = await db_find_one('venues', 'id = ? AND owner_id = ?', (venue_id, current_user["email"]))
-    if not existing_venue:
-        raise HTTPException(status_code=404, detail="Venue not found")
-    
-    await db_update('venues', 'name = ?, location = ?, image_url = ? WHERE id = ?', (venue.name, venue.location, venue.image_url, venue_id))
-    
-    updated_venue = await db_find_one('venues', 'id = ?', (venue_id,))
+    def _sync():
+        with db_pool.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE venues SET name = ?, location = ?, image_url = ? WHERE id = ? AND owner_id = ? RETURNING *",
+                (venue.name, venue.location, venue.image_url, venue_id, current_user["email"])
+            )
+            updated = _row_to_dict(cur, cur.fetchone())
+            if not updated:
+                raise HTTPException(status_code=404, detail="Venue not found")
+            # Indexed verify-code answers name the venue
+            resources = ['venues', venue_resource(venue_id)] + pending_code_resources(
+                conn, "SELECT id FROM grounds WHERE venue_id = ?", (venue_id,)
+            )
+            return updated, resources, resource_versions.bump(conn, resources)
+
+    updated_venue, resources, bumped = await run_write(_sync)
+    resource_tracker.note(resources, *bumped)
     return updated_venue
 
 @api_router.delete("/owner/venues/{venue_id}")
 async def delete_venue(venue_id: str, current_user: dict = Depends(require_role(["owner", "admin"]))):
-    deleted = await db_delete('venues', 'id = ? AND owner_id = ?', (venue_id, current_user["email"]))
-    if deleted == 0:
-        raise HTTPException(status_code=404, detail="Venue not found")
+    def _sync():
+        with db_pool.transaction() as conn:
+            deleted = conn.execute(
+                "DELETE FROM venues WHERE id = ? AND owner_id = ?", (venue_id, current_user["email"])
+            ).rowcount
+            if deleted == 0:
+                raise HTTPException(status_code=404, detail="Venue not found")
+            # Indexed verify-code answers name the venue
+            resources = ['venues', venue_resource(venue_id)] + pending_code_resources(
+                conn, "SELECT id FROM grounds WHERE venue_id = ?", (venue_id,)
+            )
+            return resources, resource_versions.bump(conn, resources)
+
+    resources, bumped = await run_write(_sync)
+    resource_tracker.note(resources, *bumped)
     return {"message": "Venue deleted successfully"}
 
 @api_router.post("/owner/grounds", response_model=GroundResponse)
 async def create_ground(ground: GroundCreate, current_user: dict = Depends(require_role(["owner", "admin"]))):
-    # Verify venue ownership
-    venue = await db_find_one('venues', 'id = ? AND owner_id = ?', (ground.venue_id, current_user["email"]))
-    if not venue:
-        raise HTTPException(status_code=404, detail="Venue not found or not owned by you")
-    
     ground_doc = {
         "id": str(datetime.now(timezone.utc).timestamp()),
         "name": ground.name,
         "venue_id": ground.venue_id
     }
+    resources = [venue_grounds_resource(ground.venue_id)]
     
-    await db_insert('grounds', ground_doc)
+    def _work(uow):
+        # Verify venue ownership
+        if not uow.find_one('venues', 'id = ? AND owner_id = ?', (ground.venue_id, current_user["email"])):
+            raise HTTPException(status_code=404, detail="Venue not found or not owned by you")
+        uow.insert('grounds', ground_doc)
+        return resource_versions.bump(uow.conn, resources)
+
+    resource_tracker.note(resources, *await run_unit(_work, write=True))
     return ground_doc
 
 @api_router.get("/owner/grounds", response_model=List[GroundResponse])
-async def get_owner_grounds(current_user: dict = Depends(require_role(["owner", "admin"]))):
-    # Get all venues owned by user
-    venues = await db_find('venues', 'owner_id = ?', (current_user["email"],))
-    venue_ids = [v["id"] for v in venues]
-    if not venue_ids:
-        return []
-    placeholders = ','.join(['?'] * len(venue_ids))
-    grounds = await db_find('grounds', f"venue_id IN ({placeholders})", tuple(venue_ids))
+async def get_owner_grounds(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(require_role(["owner", "admin"]))
+):
+    # Grounds of every venue the user owns, grouped by venue
+    grounds, next_cursor = await db_find_page(
+        'grounds', 'venue_id IN (SELECT id FROM venues WHERE owner_id = ?)', (current_user["email"],),
+        ('venue_id', 'id'), cursor, limit
+    )
+    set_next_cursor(response, next_cursor)
     return grounds
 
 @api_router.delete("/owner/grounds/{ground_id}")
 async def delete_ground(ground_id: str, current_user: dict = Depends(require_role(["owner", "admin"]))):
-    # Verify ownership through venue
-    ground = await db_find_one('grounds', 'id = ?', (ground_id,))
-    if not ground:
-        raise HTTPException(status_code=404, detail="Ground not found")
-    
-    venue = await db_find_one('venues', 'id = ? AND owner_id = ?', (ground["venue_id"], current_user["email"]))
-    if not venue:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    await db_delete('grounds', 'id = ?', (ground_id,))
+    def _work(uow):
+        # Verify ownership through venue
+        ground = owned_ground(uow, ground_id, current_user)
+        resources = [venue_grounds_resource(ground["venue_id"]), ground_slots_resource(ground_id)]
+        resources += pending_code_resources(uow.conn, "?", (ground_id,))
+        uow.execute("DELETE FROM grounds WHERE id = ?", (ground_id,))
+        uow.execute("DELETE FROM schedule_rules WHERE ground_id = ?", (ground_id,))
+        uow.execute("DELETE FROM slot_exceptions WHERE ground_id = ?", (ground_id,))
+        return resources, resource_versions.bump(uow.conn, resources)
+
+    resources, bumped = await run_unit(_work, write=True)
+    resource_tracker.note(resources, *bumped)
     return {"message": "Ground deleted successfully"}
 
 @api_router.post("/owner/slots", response_model=SlotResponse)
 async def create_slot(slot: SlotCreate, current_user: dict = Depends(require_role(["owner", "admin"]))):
-    # Verify ownership
-    ground = await db_find_one('grounds', 'id = ?', (slot.ground_id,))
-    if not ground:
-        raise HTTPException(status_code=404, detail="Ground not found")
-    
-    venue = await db_find_one('venues', 'id = ? AND owner_id = ?', (ground["venue_id"], current_user["email"]))
-    if not venue:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     slot_doc = {
         "id": str(datetime.now(timezone.utc).timestamp()),
         "ground_id": slot.ground_id,
@@ -817,61 +1550,335 @@ async def create_slot(slot: SlotCreate, current_user: dict = Depends(require_rol
         "price": slot.price,
         "is_booked": 0
     }
+    resources = [ground_slots_resource(slot.ground_id)]
     
-    await db_insert('slots', slot_doc)
+    def _work(uow):
+        # Verify ownership
+        ground = owned_ground(uow, slot.ground_id, current_user)
+        uow.insert('slots', slot_doc)
+        rollups.apply_delta(uow.conn, slot.ground_id, slot.slot_date, total_slots=1)
+        return ground["venue_id"], resource_versions.bump(uow.conn, resources)
+
+    venue_id, bumped = await run_unit(_work, write=True)
+    resource_tracker.note(resources, *bumped)
+    slot_hub.publish(
+        "slot.created", venue_id, slot.slot_date, ground_id=slot.ground_id,
+        slot={key: slot_doc[key] for key in ("id", "start_time", "end_time", "price")}
+    )
     return slot_doc
 
+MAX_BULK_SLOTS = int(os.environ.get('MAX_BULK_SLOTS', 20000))
+
+def expand_slot_template(template: SlotTemplate) -> List[tuple]:
+    """Expand a recurrence template into (ground_id, slot_date, start_time, end_time, price) rows"""
+    if template.end_date < template.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    open_minutes = template.open_time.hour * 60 + template.open_time.minute
+    close_minutes = template.close_time.hour * 60 + template.close_time.minute
+    if close_minutes <= open_minutes:
+        raise HTTPException(status_code=400, detail="close_time must be after open_time")
+
+    days = (template.end_date - template.start_date).days + 1
+    per_day = (close_minutes - open_minutes) // template.duration_minutes
+    if len(template.ground_ids) * days * per_day > MAX_BULK_SLOTS:
+        raise HTTPException(status_code=400, detail=f"Template expands to more than {MAX_BULK_SLOTS} slots")
+
+    rows = []
+    for offset in range(days):
+        slot_date = template.start_date + timedelta(days=offset)
+        if template.days_of_week is not None and slot_date.weekday() not in template.days_of_week:
+            continue
+        for n in range(per_day):
+            start = open_minutes + n * template.duration_minutes
+            end = start + template.duration_minutes
+            for ground_id in template.ground_ids:
+                rows.append((
+                    ground_id,
+                    slot_date.isoformat(),
+                    f"{start // 60:02d}:{start % 60:02d}",
+                    f"{end // 60:02d}:{end % 60:02d}",
+                    template.price
+                ))
+    return rows
+
+@api_router.post("/owner/slots/bulk", response_model=BulkSlotResponse)
+async def create_slots_bulk(request: BulkSlotCreate, current_user: dict = Depends(require_role(["owner", "admin"]))):
+    """Create many slots from an explicit list or a recurrence template in one transaction"""
+    if (request.slots is None) == (request.template is None):
+        raise HTTPException(status_code=400, detail="Provide either slots or template")
+    if request.template is not None:
+        rows = expand_slot_template(request.template)
+    else:
+        if len(request.slots) > MAX_BULK_SLOTS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SLOTS} slots per request")
+        rows = [(s.ground_id, s.slot_date, s.start_time, s.end_time, s.price) for s in request.slots]
+    if not rows:
+        return {"created": 0, "skipped": 0}
+
+    ground_ids = sorted({row[0] for row in rows})
+    dates = [row[1] for row in rows]
+    placeholders = ','.join(['?'] * len(ground_ids))
+    resources = [ground_slots_resource(g) for g in ground_ids]
+
+    def _sync():
+        with db_pool.transaction() as conn:
+            # Verify ownership of every ground once
+            owners = dict(conn.execute(
+                f"SELECT g.id, v.owner_id FROM grounds g LEFT JOIN venues v ON v.id = g.venue_id WHERE g.id IN ({placeholders})",
+                tuple(ground_ids)
+            ).fetchall())
+            missing = [g for g in ground_ids if g not in owners]
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Ground not found: {missing[0]}")
+            if any(owner != current_user["email"] for owner in owners.values()):
+                raise HTTPException(status_code=403, detail="Not authorized")
+
+            # Skip slots that already exist (same ground, date and start time), including repeats in the request
+            seen = set(conn.execute(
+                f"SELECT ground_id, slot_date, start_time FROM slots WHERE ground_id IN ({placeholders}) AND slot_date BETWEEN ? AND ?",
+                tuple(ground_ids) + (min(dates), max(dates))
+            ).fetchall())
+            base_id = datetime.now(timezone.utc).timestamp()
+            new_slots = []
+            deltas = {}
+            for ground_id, slot_date, start_time, end_time, price in rows:
+                key = (ground_id, slot_date, start_time)
+                if key in seen:
+                    continue
+                seen.add(key)
+                new_slots.append((f"{base_id}-{len(new_slots)}", ground_id, slot_date, start_time, end_time, price))
+                deltas[(ground_id, slot_date)] = deltas.get((ground_id, slot_date), 0) + 1
+
+            conn.executemany(
+                "INSERT INTO slots (id, ground_id, slot_date, start_time, end_time, price, is_booked) VALUES (?, ?, ?, ?, ?, ?, 0)",
+                new_slots
+            )
+            rollups.apply_deltas(conn, [(g, d, {"total_slots": n}) for (g, d), n in deltas.items()])
+            if not new_slots:
+                return 0, None
+            return len(new_slots), resource_versions.bump(conn, resources)
+
+    created, bumped = await run_write(_sync)
+    if bumped:
+        resource_tracker.note(resources, *bumped)
+    return {"created": created, "skipped": len(rows) - created}
+
+def owned_ground(uow: UnitOfWork, ground_id: str, current_user: dict) -> dict:
+    """The ground, if it belongs to a venue of current_user (404/403 otherwise)"""
+    ground = uow.find_one('grounds', 'id = ?', (ground_id,))
+    if not ground:
+        raise HTTPException(status_code=404, detail="Ground not found")
+    venue = uow.find_one('venues', 'id = ? AND owner_id = ?', (ground["venue_id"], current_user["email"]))
+    if not venue:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return ground
+
+def _schedule_rule_response(rule: dict) -> dict:
+    return {
+        **{key: value for key, value in rule.items() if key not in ("days_mask", "price_bands", "created_at")},
+        "days_of_week": schedules.days_of_week(rule["days_mask"]),
+        "price_bands": json.loads(rule["price_bands"] or "[]")
+    }
+
+@api_router.post("/owner/grounds/{ground_id}/schedules", response_model=ScheduleRuleResponse)
+async def create_schedule_rule(
+    ground_id: str,
+    rule: ScheduleRuleCreate,
+    current_user: dict = Depends(require_role(["owner", "admin"]))
+):
+    """Add a recurring schedule; its slots are generated when read instead of stored"""
+    if rule.end_date is not None and rule.end_date < rule.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if rule.close_time <= rule.open_time:
+        raise HTTPException(status_code=400, detail="close_time must be after open_time")
+    if any(band.end_time <= band.start_time for band in rule.price_bands):
+        raise HTTPException(status_code=400, detail="Price band end_time must be after start_time")
+
+    rule_doc = {
+        "id": str(uuid.uuid4()),
+        "ground_id": ground_id,
+        "days_mask": schedules.days_mask(rule.days_of_week),
+        "start_date": rule.start_date.isoformat(),
+        "end_date": rule.end_date.isoformat() if rule.end_date else None,
+        "open_time": rule.open_time.strftime("%H:%M"),
+        "close_time": rule.close_time.strftime("%H:%M"),
+        "duration_minutes": rule.duration_minutes,
+        "price": rule.price,
+        "price_bands": json.dumps([
+            {"start_time": band.start_time.strftime("%H:%M"), "end_time": band.end_time.strftime("%H:%M"), "price": band.price}
+            for band in rule.price_bands
+        ]),
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    resources = [ground_slots_resource(ground_id)]
+
+    def _work(uow):
+        owned_ground(uow, ground_id, current_user)
+        for existing in uow.find_all('schedule_rules', 'ground_id = ?', (ground_id,)):
+            if schedules.rules_overlap(existing, rule_doc):
+                raise HTTPException(status_code=400, detail=f"Overlaps schedule {existing['id']}")
+        uow.insert('schedule_rules', rule_doc)
+        return resource_versions.bump(uow.conn, resources)
+
+    resource_tracker.note(resources, *await run_unit(_work, write=True))
+    return _schedule_rule_response(rule_doc)
+
+@api_router.get("/owner/grounds/{ground_id}/schedules", response_model=List[ScheduleRuleResponse])
+async def get_schedule_rules(ground_id: str, current_user: dict = Depends(require_role(["owner", "admin"]))):
+    def _work(uow):
+        owned_ground(uow, ground_id, current_user)
+        return uow.find_all('schedule_rules', 'ground_id = ?', (ground_id,), order_by='start_date, open_time')
+    return [_schedule_rule_response(rule) for rule in await run_unit(_work)]
+
+@api_router.delete("/owner/grounds/{ground_id}/schedules/{rule_id}")
+async def delete_schedule_rule(ground_id: str, rule_id: str, current_user: dict = Depends(require_role(["owner", "admin"]))):
+    """Stop generating a schedule's slots; slots already booked stay"""
+    resources = [ground_slots_resource(ground_id)]
+
+    def _work(uow):
+        owned_ground(uow, ground_id, current_user)
+        deleted = uow.execute("DELETE FROM schedule_rules WHERE id = ? AND ground_id = ?", (rule_id, ground_id))
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Schedule not found")
+        return resource_versions.bump(uow.conn, resources)
+
+    resource_tracker.note(resources, *await run_unit(_work, write=True))
+    return {"message": "Schedule deleted successfully"}
+
+@api_router.put("/owner/grounds/{ground_id}/exceptions", response_model=SlotExceptionResponse)
+async def set_slot_exception(
+    ground_id: str,
+    exception: SlotExceptionCreate,
+    current_user: dict = Depends(require_role(["owner", "admin"]))
+):
+    """Close a window of one date, or set a custom price for the slots starting in it"""
+    end_time = exception.end_time.strftime("%H:%M") if exception.end_time else schedules.END_OF_DAY
+    start_time = exception.start_time.strftime("%H:%M")
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+    exception_doc = {
+        "ground_id": ground_id,
+        "slot_date": exception.slot_date.isoformat(),
+        "start_time": start_time,
+        "end_time": end_time,
+        "price": exception.price
+    }
+    resources = [ground_slots_resource(ground_id)]
+
+    def _work(uow):
+        owned_ground(uow, ground_id, current_user)
+        uow.execute(
+            "INSERT INTO slot_exceptions (ground_id, slot_date, start_time, end_time, price) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(ground_id, slot_date, start_time) DO UPDATE SET end_time = excluded.end_time, price = excluded.price",
+            tuple(exception_doc.values())
+        )
+        return resource_versions.bump(uow.conn, resources)
+
+    resource_tracker.note(resources, *await run_unit(_work, write=True))
+    return exception_doc
+
+@api_router.get("/owner/grounds/{ground_id}/exceptions", response_model=List[SlotExceptionResponse])
+async def get_slot_exceptions(
+    ground_id: str,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    current_user: dict = Depends(require_role(["owner", "admin"]))
+):
+    from_date = from_date or datetime.now(timezone.utc).date()
+
+    def _work(uow):
+        owned_ground(uow, ground_id, current_user)
+        return uow.find_all(
+            'slot_exceptions', 'ground_id = ? AND slot_date BETWEEN ? AND ?',
+            (ground_id, from_date.isoformat(), (to_date or date.max).isoformat()), order_by='slot_date, start_time'
+        )
+    return await run_unit(_work)
+
+@api_router.delete("/owner/grounds/{ground_id}/exceptions/{slot_date}/{start_time}")
+async def delete_slot_exception(
+    ground_id: str,
+    slot_date: str,
+    start_time: str,
+    current_user: dict = Depends(require_role(["owner", "admin"]))
+):
+    resources = [ground_slots_resource(ground_id)]
+
+    def _work(uow):
+        owned_ground(uow, ground_id, current_user)
+        deleted = uow.execute(
+            "DELETE FROM slot_exceptions WHERE ground_id = ? AND slot_date = ? AND start_time = ?",
+            (ground_id, slot_date, start_time)
+        )
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Exception not found")
+        return resource_versions.bump(uow.conn, resources)
+
+    resource_tracker.note(resources, *await run_unit(_work, write=True))
+    return {"message": "Exception deleted successfully"}
+
 @api_router.get("/owner/analytics", response_model=List[AnalyticsResponse])
 async def get_owner_analytics(current_user: dict = Depends(require_role(["owner", "admin"]))):
-    # Get all venues owned by user
-    venues = await db_find('venues', 'owner_id = ?', (current_user["email"],))
-    
-    analytics = []
-    for venue in venues:
-        grounds = await db_find('grounds', 'venue_id = ?', (venue["id"],))
-        
-        for ground in grounds:
-            # Get all booked slots
-            slots = await db_find('slots', 'ground_id = ? AND is_booked = ?', (ground["id"], 1))
-            
-            total_revenue = sum(slot["price"] for slot in slots)
-            total_bookings = len(slots)
-            
-            analytics.append({
-                "venue_name": venue["name"],
-                "ground_name": ground["name"],
-                "total_bookings": total_bookings,
-                "total_revenue": total_revenue
-            })
-    
-    return analytics
+    # Per-ground totals come from the rollup table, one row per ground
+    def _sync():
+        with db_pool.connection() as conn:
+            cur = conn.execute(
+                """
+                SELECT v.name AS venue_name, g.name AS ground_name,
+                       COALESCE(r.booked_slots, 0) AS total_bookings,
+                       COALESCE(r.booked_revenue, 0) AS total_revenue,
+                       COALESCE(r.verified_bookings, 0) AS verified_bookings,
+                       COALESCE(r.verified_revenue, 0) AS verified_revenue
+                FROM venues v
+                JOIN grounds g ON g.venue_id = v.id
+                LEFT JOIN ground_stats r ON r.ground_id = g.id
+                WHERE v.owner_id = ?
+                ORDER BY v.rowid, g.rowid
+                """,
+                (current_user["email"],)
+            )
+            return [_row_to_dict(cur, r) for r in cur.fetchall()]
+    return await run_in_thread(_sync)
 
 @api_router.get("/owner/dashboard")
 async def get_owner_dashboard(current_user: dict = Depends(require_role(["owner", "admin"]))):
-    venues = await db_find('venues', 'owner_id = ?', (current_user["email"],))
-    venue_ids = [v["id"] for v in venues]
-    if not venue_ids:
-        return {"total_venues": 0, "total_grounds": 0, "total_slots": 0, "booked_slots": 0, "total_revenue": 0}
-
-    placeholders = ','.join(['?'] * len(venue_ids))
-    grounds = await db_find('grounds', f"venue_id IN ({placeholders})", tuple(venue_ids))
-    ground_ids = [g["id"] for g in grounds]
-    if not ground_ids:
-        return {"total_venues": len(venues), "total_grounds": 0, "total_slots": 0, "booked_slots": 0, "total_revenue": 0}
-
-    placeholders = ','.join(['?'] * len(ground_ids))
-    all_slots = await db_find('slots', f"ground_id IN ({placeholders})", tuple(ground_ids))
-    total_slots = len(all_slots)
-    booked_slots = len([s for s in all_slots if s.get('is_booked')])
-    all_booked_slots = [s for s in all_slots if s.get('is_booked')]
-    total_revenue = sum(s.get('price', 0) for s in all_booked_slots)
-
+    def _sync():
+        with db_pool.connection() as conn:
+            return conn.execute(
+                """
+                SELECT COUNT(DISTINCT v.id), COUNT(g.id),
+                       COALESCE(SUM(r.total_slots), 0), COALESCE(SUM(r.booked_slots), 0),
+                       COALESCE(SUM(r.booked_revenue), 0), COALESCE(SUM(r.verified_revenue), 0)
+                FROM venues v
+                LEFT JOIN grounds g ON g.venue_id = v.id
+                LEFT JOIN ground_stats r ON r.ground_id = g.id
+                WHERE v.owner_id = ?
+                """,
+                (current_user["email"],)
+            ).fetchone()
+
+    total_venues, total_grounds, total_slots, booked_slots, total_revenue, verified_revenue = await run_in_thread(_sync)
     return {
-        "total_venues": len(venues),
-        "total_grounds": len(grounds),
+        "total_venues": total_venues,
+        "total_grounds": total_grounds,
         "total_slots": total_slots,
         "booked_slots": booked_slots,
-        "total_revenue": total_revenue
+        "total_revenue": total_revenue,
+        "verified_revenue": verified_revenue
+    }
+
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Slow query templates ranked by total time, with their captured query plans"""
+    def _sync():
+        with db_pool.connection() as conn:
+            return slow_query_log.summary(conn, limit)
+    return {
+        "enabled": slow_queries.enabled,
+        **slow_queries.stats(),
+        "templates": await run_in_thread(_sync)
     }
 
 # Include router
@@ -881,22 +1888,103 @@ app.include_router(api_router)
 @app.get("/health", tags=["health"])
 async def health_check():
     """Health check endpoint for container orchestration"""
+    def _sync():
+        with db_pool.connection() as conn:
+            conn.execute("SELECT 1")
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT 1")
-        return {"status": "healthy", "database": "connected"}
+        await run_in_thread(_sync)
+        return {
+            "status": "healthy",
+            "database": "connected",
+            "pool": db_pool.stats(),
+            "user_cache": user_cache.stats(),
+            "password_hasher": password_hasher.stats(),
+            "token_revocations": token_revocations.stats(),
+            "resource_versions": resource_tracker.stats(),
+            "read_cache": read_cache.stats(),
+            "archive": archiver.stats() if archiver is not None else None,
+            "slot_events": slot_hub.stats(),
+            "code_index": code_index.stats(),
+            "write_queue": write_queue.stats() if write_queue is not None else None,
+            "ephemeral_store": await run_in_thread(ephemeral.stats)
+        }
     except Exception as e:
         raise HTTPException(status_code=503, detail="Database connection failed")
 
+@metrics.register_collector
+def runtime_metrics():
+    """Threadpool, connection pool and cache gauges, read at scrape time"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    pool = db_pool.stats()
+    cache = read_cache.stats()
+    users = user_cache.stats()
+    codes = code_index.stats()
+    writes = write_queue.stats() if write_queue is not None else {"batches": 0, "jobs": 0, "failed": 0, "queued": 0}
+    return [
+        ("threadpool_threads_busy", "gauge", "Worker threads running run_in_threadpool calls",
+         [({}, limiter.borrowed_tokens)]),
+        ("threadpool_threads_max", "gauge", "Threadpool capacity", [({}, limiter.total_tokens)]),
+        ("threadpool_queue_depth", "gauge", "Calls waiting for a free worker thread",
+         [({}, limiter.statistics().tasks_waiting)]),
+        ("db_pool_connections", "gauge", "Pooled SQLite connections by state",
+         [({"state": "in_use"}, pool["in_use"]), ({"state": "idle"}, pool["idle"])]),
+        ("db_pool_waits_total", "counter", "Connection checkouts that had to wait", [({}, pool["waits"])]),
+        ("db_pool_timeouts_total", "counter", "Connection checkouts that timed out", [({}, pool["timeouts"])]),
+        ("cache_requests_total", "counter", "Cache lookups by cache and result", [
+            ({"cache": "read", "result": "hit"}, cache["hits"]),
+            ({"cache": "read", "result": "miss"}, cache["misses"]),
+            ({"cache": "user", "result": "hit"}, users["hits"]),
+            ({"cache": "user", "result": "miss"}, users["misses"]),
+            ({"cache": "code", "result": "hit"}, codes["hits"]),
+            ({"cache": "code", "result": "miss"}, codes["misses"]),
+        ]),
+        ("cache_evictions_total", "counter", "Cache evictions by cache", [
+            ({"cache": "read"}, cache["evictions"]),
+            ({"cache": "user"}, users["evictions"]),
+            ({"cache": "code"}, codes["evictions"]),
+        ]),
+        ("db_write_batches_total", "counter", "Group commits made by the writer thread",
+         [({}, writes["batches"])]),
+        ("db_write_jobs_total", "counter", "Write jobs run by the writer thread, by outcome",
+         [({"outcome": "committed"}, writes["jobs"] - writes["failed"]), ({"outcome": "failed"}, writes["failed"])]),
+        ("db_write_queue_depth", "gauge", "Write jobs waiting for the writer thread", [({}, writes["queued"])]),
+        ("slot_event_subscribers", "gauge", "Clients connected to the slot event stream",
+         [({}, slot_hub.stats()["subscribers"])]),
+        ("slot_events_published_total", "counter", "Slot deltas published", [({}, slot_hub.published)]),
+        ("slot_events_delivered_total", "counter", "Slot deltas queued to subscribers", [({}, slot_hub.delivered)]),
+        ("password_hash_pending", "gauge", "Password hashing jobs queued or running",
+         [({}, password_hasher.stats()["pending"])]),
+    ]
+
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_background_jobs():
+    ephemeral.start_sweeper(EPHEMERAL_SWEEP_INTERVAL)
+    if slow_queries.enabled:
+        slow_queries.start(db_pool, SLOW_QUERY_FLUSH_INTERVAL)
+    if CODE_EXPIRY_INTERVAL > 0:
+        booking_expirer.start(CODE_EXPIRY_INTERVAL)
+    if archiver is not None and ARCHIVE_INTERVAL > 0:
+        archiver.start(ARCHIVE_INTERVAL)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    try:
-        conn.close()
-    except Exception:
-        pass
+    ephemeral.stop_sweeper()
+    booking_expirer.stop()
+    slow_queries.stop(db_pool if slow_queries.enabled else None)
+    if archiver is not None:
+        archiver.stop()
+    password_hasher.shutdown()
+    if write_queue is not None:
+        write_queue.close()
+    db_pool.close()
@@ -0,0 +1,167 @@
+"""In-process fan-out of slot availability changes to watching clients.
+
+Clients subscribe to (venue_id, slot_date) topics over Server-Sent Events or
+a WebSocket. Write routes publish a delta once their transaction has
+committed: slot.created, slot.booked or slot.cancelled. publish() serializes
+the delta once and returns; the loop then appends it to each subscriber's
+send buffer a chunk of subscribers at a time, so neither the publishing
+request nor other requests wait for a large fan-out. Nothing waits on a
+connection, so a slow reader never holds up a booking or the other
+subscribers: a subscriber whose buffer fills has it replaced by one
+{"type": "resync"} message and re-fetches availability instead of receiving
+a backlog.
+
+The hub lives on the event loop and is per process: with several uvicorn
+workers, a client only hears about writes made by the worker it is
+connected to.
+
+    SLOT_EVENTS_BUFFER=64                 messages buffered per connection
+    SLOT_EVENTS_MAX_SUBSCRIBERS=20000     connections per process
+    SLOT_EVENTS_HEARTBEAT=15              seconds between keep-alives
+    SLOT_EVENTS_FANOUT_CHUNK=1000         buffers filled per loop iteration
+"""
+import asyncio
+import json
+import os
+from collections import deque
+
+RESYNC = json.dumps({"type": "resync"})
+
+
+class HubFull(Exception):
+    """Raised when the process already serves the maximum number of subscribers"""
+
+
+class Subscription:
+    """One client connection: the topics it watches and its bounded send buffer"""
+
+    __slots__ = ("topics", "limit", "buffer", "resyncs", "_ready")
+
+    def __init__(self, limit: int):
+        self.topics = set()
+        self.limit = limit
+        self.buffer = deque()
+        self.resyncs = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, message: str):
+        if len(self.buffer) >= self.limit:
+            # Too far behind to catch up message by message
+            self.buffer.clear()
+            self.buffer.append(RESYNC)
+            self.resyncs += 1
+        else:
+            self.buffer.append(message)
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list:
+        """Everything buffered, waiting up to timeout for something to arrive ([] on timeout)"""
+        if not self.buffer:
+            self._ready.clear()
+            try:
+                # asyncio.timeout, unlike wait_for, does not spawn a task per wait
+                async with asyncio.timeout(timeout):
+                    await self._ready.wait()
+            except TimeoutError:
+                return []
+        batch = list(self.buffer)
+        self.buffer.clear()
+        return batch
+
+
+class SlotEventHub:
+    def __init__(self, buffer_size: int = 64, max_subscribers: int = 20000, heartbeat: float = 15.0,
+                 fanout_chunk: int = 1000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self.fanout_chunk = max(1, fanout_chunk)
+        self._topics = {}  # (venue_id, slot_date) -> set of Subscription
+        self._subscribers = set()
+        self._pending = deque()  # [message, subscriptions not yet offered it], in publish order
+        self._fanning_out = False
+        self.published = 0
+        self.delivered = 0
+        self._resyncs = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            buffer_size=int(os.environ.get("SLOT_EVENTS_BUFFER", 64)),
+            max_subscribers=int(os.environ.get("SLOT_EVENTS_MAX_SUBSCRIBERS", 20000)),
+            heartbeat=float(os.environ.get("SLOT_EVENTS_HEARTBEAT", 15)),
+            fanout_chunk=int(os.environ.get("SLOT_EVENTS_FANOUT_CHUNK", 1000)),
+        )
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> Subscription:
+        if self.full:
+            raise HubFull(f"{self.max_subscribers} slot event subscribers already connected")
+        subscription = Subscription(self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def watch(self, subscription: Subscription, venue_id: str, slot_date: str):
+        topic = (venue_id, slot_date)
+        subscription.topics.add(topic)
+        self._topics.setdefault(topic, set()).add(subscription)
+
+    def unwatch(self, subscription: Subscription, venue_id: str, slot_date: str):
+        topic = (venue_id, slot_date)
+        subscription.topics.discard(topic)
+        watchers = self._topics.get(topic)
+        if watchers is not None:
+            watchers.discard(subscription)
+            if not watchers:
+                del self._topics[topic]
+
+    def close(self, subscription: Subscription):
+        for venue_id, slot_date in list(subscription.topics):
+            self.unwatch(subscription, venue_id, slot_date)
+        self._subscribers.discard(subscription)
+        self._resyncs += subscription.resyncs
+
+    def publish(self, event_type: str, venue_id: str, slot_date: str, **fields) -> int:
+        """Queue a delta for every subscriber of the venue and date (call on the event loop); returns how many"""
+        watchers = self._topics.get((venue_id, slot_date))
+        self.published += 1
+        if not watchers:
+            return 0
+        message = json.dumps({"type": event_type, "venue_id": venue_id, "slot_date": slot_date, **fields})
+        self._pending.append([message, list(watchers)])
+        self.delivered += len(watchers)
+        if not self._fanning_out:
+            self._fanning_out = True
+            asyncio.get_running_loop().call_soon(self._fan_out)
+        return len(watchers)
+
+    def _fan_out(self):
+        budget = self.fanout_chunk
+        while self._pending and budget > 0:
+            message, targets = self._pending[0]
+            chunk = targets[-budget:]
+            del targets[-budget:]
+            for subscription in chunk:
+                subscription.offer(message)
+            budget -= len(chunk)
+            if not targets:
+                self._pending.popleft()
+        if self._pending:
+            # Let other callbacks and requests run before the next chunk
+            asyncio.get_running_loop().call_soon(self._fan_out)
+        else:
+            self._fanning_out = False
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "topics": len(self._topics),
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self._resyncs + sum(s.resyncs for s in self._subscribers),
+            "buffer_size": self.buffer_size,
+            "max_subscribers": self.max_subscribers,
+        }
@@ -0,0 +1,200 @@
+"""Opt-in log of slow SQL statements.
+
+Set SLOW_QUERY_MS to record every statement run on a pooled connection that
+takes at least that long (see the observers in db_pool.py): its SQL
+template, parameter count, row count, duration and the route that issued
+it. The first time a template turns up, its EXPLAIN QUERY PLAN is stored
+next to it. Entries live in the database, so every worker writes
+to the same log.
+
+record() only queues an entry in memory: writing it on the connection that
+ran the query would take the write lock from a read route (waiting up to
+busy_timeout behind the writer) and make slow queries slower still. A
+background thread flushes the queue in one short write transaction every
+SLOW_QUERY_FLUSH_INTERVAL seconds; entries past max_pending are dropped and
+counted.
+
+    python slow_query_log.py --top 20   # rank templates by total time
+    python slow_query_log.py --clear
+"""
+import argparse
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+_PLANNED = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+def normalize(sql: str) -> str:
+    """One template per query shape: whitespace collapsed, IN lists of any length folded"""
+    return _IN_LIST.sub("(?, ...)", _SPACE.sub(" ", sql).strip())
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = None, max_entries: int = 100000, max_pending: int = 10000):
+        self.threshold_ms = threshold_ms
+        self.max_entries = max_entries
+        self.max_pending = max_pending
+        self._pending = deque()  # (template, sql, params, rows, duration_ms, route, logged_at)
+        self._explained = set()
+        self._lock = threading.Lock()
+        self._flushing = threading.local()  # the flush's own statements are not logged
+        self._stop = threading.Event()
+        self._thread = None
+        self.logged = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms is not None
+
+    def record(self, sql: str, params: tuple, rows: int, seconds: float, route: str = None):
+        """Queue the query for the log if it crossed the threshold"""
+        duration_ms = seconds * 1000
+        if self.threshold_ms is None or duration_ms < self.threshold_ms or getattr(self._flushing, "active", False):
+            return
+        template = normalize(sql)
+        logger.warning("Slow query %.1fms on %s (%s rows): %s", duration_ms, route or "-", rows, template)
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append((template, sql, params, rows, round(duration_ms, 3), route, time.time()))
+
+    def flush(self, pool) -> int:
+        """Write the queued entries, and the plans of templates not seen before, in one transaction"""
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        if not batch:
+            return 0
+        self._flushing.active = True
+        try:
+            self._write(pool, batch)
+        finally:
+            self._flushing.active = False
+        self.logged += len(batch)
+        return len(batch)
+
+    def _write(self, pool, batch):
+        with pool.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO slow_queries (template, param_count, row_count, duration_ms, route, logged_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(template, len(params or ()), rows, duration_ms, route, logged_at)
+                 for template, _, params, rows, duration_ms, route, logged_at in batch]
+            )
+            for template, sql, params, *_ in batch:
+                # executemany batches come without their parameters; DDL, PRAGMA and
+                # transaction control have no plan worth keeping
+                if template in self._explained or params is None or not _PLANNED.match(sql):
+                    continue
+                self._explained.add(template)
+                try:
+                    plan = "\n".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+                except sqlite3.Error as exc:
+                    # e.g. a migration's statement on a table that no longer exists
+                    logger.debug("No plan for slow query %s: %s", template, exc)
+                    continue
+                conn.execute(
+                    "INSERT OR IGNORE INTO query_plans (template, plan, captured_at) VALUES (?, ?, ?)",
+                    (template, plan, time.time())
+                )
+            if self.logged // 1000 != (self.logged + len(batch)) // 1000:
+                conn.execute(
+                    "DELETE FROM slow_queries WHERE id <= (SELECT MAX(id) FROM slow_queries) - ?", (self.max_entries,)
+                )
+
+    def start(self, pool, interval: float = 1.0):
+        """Flush the queue every interval seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def _run():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush(pool)
+                except Exception:
+                    # Never let diagnostics take anything else down
+                    logger.exception("Could not record slow queries")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_run, name="slow-query-log", daemon=True)
+        self._thread.start()
+
+    def stop(self, pool=None):
+        """Stop the flusher, writing whatever is still queued when a pool is given"""
+        self._stop.set()
+        self._thread = None
+        if pool is not None:
+            try:
+                self.flush(pool)
+            except Exception:
+                logger.exception("Could not record slow queries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold_ms,
+                "pending": len(self._pending),
+                "logged": self.logged,
+                "dropped": self.dropped,
+            }
+
+
+def summary(conn, limit: int = 20) -> list:
+    """Slow query templates ranked by total time spent in them"""
+    cur = conn.execute(
+        """
+        SELECT q.template, COUNT(*) AS calls, ROUND(SUM(q.duration_ms), 3) AS total_ms,
+               ROUND(AVG(q.duration_ms), 3) AS avg_ms, MAX(q.duration_ms) AS max_ms,
+               ROUND(AVG(q.row_count), 1) AS avg_rows, MAX(q.param_count) AS params,
+               GROUP_CONCAT(DISTINCT q.route) AS routes, p.plan
+        FROM slow_queries q LEFT JOIN query_plans p ON p.template = q.template
+        GROUP BY q.template
+        ORDER BY total_ms DESC
+        LIMIT ?
+        """,
+        (limit,)
+    )
+    columns = [d[0] for d in cur.description]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def main():
+    from migrations import DB_PATH, migrate
+
+    parser = argparse.ArgumentParser(description="Rank slow query templates by total time")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--clear", action="store_true", help="empty the slow query log and captured plans")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        migrate(conn)
+        if args.clear:
+            conn.execute("DELETE FROM slow_queries")
+            conn.execute("DELETE FROM query_plans")
+            print("Slow query log cleared")
+            return
+        for rank, entry in enumerate(summary(conn, args.top), 1):
+            print(f"{rank:>3}. {entry['total_ms']:>10.1f}ms total  {entry['calls']:>6} calls  "
+                  f"avg {entry['avg_ms']}ms  max {entry['max_ms']}ms  avg rows {entry['avg_rows']}")
+            print(f"     {entry['template']}")
+            print(f"     routes: {entry['routes'] or '-'}")
+            for line in (entry["plan"] or "").splitlines():
+                print(f"     plan: {line}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,20 @@
 #!/usr/bin/env python
 """Test script to verify database creation and user insertion"""
+import os
 import sqlite3
 from pathlib import Path
+from migrations import migrate, check_query_plans
 
-DB_PATH = Path(__file__).parent / "app.db"
+DB_PATH = os.environ.get("DB_PATH", str(Path(__file__).parent / "app.db"))
 
 def init_db():
     conn = sqlite3.connect(str(DB_PATH))
     cur = conn.cursor()
     
-    # Create users table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            fullName TEXT,
-            username TEXT UNIQUE,
-            email TEXT UNIQUE,
-            mobileNumber TEXT UNIQUE,
-            password_hash TEXT,
-            role TEXT,
-            created_at TEXT
-        )
-    """)
+    # Apply the same versioned migrations as the server
+    applied = migrate(conn)
+    print(f"✓ Applied migrations: {applied}")
     
-    # Create OTP table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS otp_storage (
-            id TEXT PRIMARY KEY,
-            mobileNumber TEXT UNIQUE,
-            otp TEXT,
-            created_at TEXT,
-            expires_at TEXT
-        )
-    """)
-    
-    conn.commit()
     print("✓ Database initialized successfully")
     
     # Check tables
@@ -47,6 +27,12 @@ def init_db():
     columns = cur.fetchall()
     print(f"✓ Users table columns: {[col[1] for col in columns]}")
     
+    # Check that hot route queries use indexes
+    offenders = check_query_plans(conn)
+    if offenders:
+        raise RuntimeError(f"Hot queries scanning tables: {offenders}")
+    print("✓ Hot route queries use indexes")
+    
     conn.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+"""Single writer thread with group commit for the API's mutations.
+
+Write routes hand their work (the same no-argument _sync function they would
+run on the threadpool) to WriteQueue.run. One thread owns a dedicated
+connection and drains the queue: every job waiting when it wakes up runs
+inside one BEGIN IMMEDIATE ... COMMIT, each job in its own savepoint. A job
+that raises rolls back only its savepoint and gets its own exception; the
+rest of the batch commits together. Callers are answered only after COMMIT
+returns, so an acknowledged write is exactly as durable as the
+connection's synchronous setting makes any commit, at one fsync per batch
+instead of one per statement.
+
+The writer's connection is served to db_pool.connection() and
+db_pool.transaction() on the writer thread, so job code written against the
+pool joins the group transaction unchanged.
+
+    DB_WRITE_QUEUE=0         commit per call on the threadpool instead
+    DB_WRITE_BATCH=128       most jobs per group commit
+    DB_WRITE_WAIT_MS=0       linger for more jobs before committing a batch
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, pool, max_batch: int = 128, max_wait: float = 0.0):
+        self.pool = pool
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._batches = 0
+        self._jobs = 0
+        self._failed = 0
+        self._largest_batch = 0
+        self._commit_time = 0.0
+
+    @classmethod
+    def from_env(cls, pool):
+        """Build a queue from DB_WRITE_BATCH and DB_WRITE_WAIT_MS"""
+        return cls(
+            pool,
+            max_batch=int(os.environ.get("DB_WRITE_BATCH", 128)),
+            max_wait=float(os.environ.get("DB_WRITE_WAIT_MS", 0)) / 1000,
+        )
+
+    def submit(self, fn) -> Future:
+        """Queue fn for the writer thread; the future resolves once its batch has committed"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((contextvars.copy_context(), fn, future))
+        return future
+
+    async def run(self, fn):
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> tuple:
+        """Block for one job, then take whatever else is queued (up to max_batch); (jobs, stopping)"""
+        job = self._queue.get()
+        if job is _STOP:
+            return [], True
+        batch = [job]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _run(self):
+        conn = self.pool.dedicated_connection()
+        try:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._next_batch()
+                jobs = [job for job in batch if job[2].set_running_or_notify_cancel()]
+                if jobs:
+                    self._commit(conn, jobs)
+        finally:
+            self.pool.release_dedicated(conn)
+
+    def _commit(self, conn, jobs: list):
+        done = []     # (future, result) answered after COMMIT
+        failed = []   # (future, exception)
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for context, fn, future in jobs:
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = context.run(fn)
+                except BaseException as exc:
+                    failed.append((future, exc))
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK TO job")
+                        conn.execute("RELEASE job")
+                    else:
+                        # The error took the whole transaction with it (disk full, I/O error)
+                        failed += [(f, exc) for f, _ in done]
+                        done = []
+                        conn.execute("BEGIN IMMEDIATE")
+                    continue
+                conn.execute("RELEASE job")
+                done.append((future, result))
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            logger.exception("Group commit of %d writes failed", len(jobs))
+            if conn.in_transaction:
+                conn.rollback()
+            answered = {id(f) for f, _ in failed}
+            failed += [(f, exc) for _, _, f in jobs if id(f) not in answered]
+            done = []
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._batches += 1
+            self._jobs += len(jobs)
+            self._failed += len(failed)
+            self._largest_batch = max(self._largest_batch, len(jobs))
+            self._commit_time += elapsed
+        for future, result in done:
+            future.set_result(result)
+        for future, exc in failed:
+            future.set_exception(exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "jobs": self._jobs,
+                "failed": self._failed,
+                "queued": self._queue.qsize(),
+                "largest_batch": self._largest_batch,
+                "avg_batch": round(self._jobs / self._batches, 2) if self._batches else 0.0,
+                "avg_batch_ms": round(self._commit_time * 1000 / self._batches, 3) if self._batches else 0.0,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+    def close(self, timeout: float = 10.0):
+        """Commit what is already queued, then stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
@@ -72,6 +72,12 @@ function App() {
   };
 
   const logout = () => {
+    if (token) {
+      // Revoke the token server-side; local sign-out proceeds regardless
+      axios.post(`${API}/auth/logout`, null, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {});
+    }
     localStorage.removeItem('token');
     setToken(null);
     setUser(null);
@@ -4,6 +4,7 @@ import axios from 'axios';
 import { toast } from 'sonner';
 import { AuthContext } from '../../App';
 import ConfirmDialog from '../ConfirmDialog';
+import { fetchAllPages } from '../../lib/pagination';
 
 const ManageVenues = () => {
   const { user, token, logout, API } = useContext(AuthContext);
@@ -55,12 +56,12 @@ const ManageVenues = () => {
 
   const fetchData = useCallback(async () => {
     try {
-      const [venuesRes, groundsRes] = await Promise.all([
-        axios.get(`${API}/owner/venues`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/owner/grounds`, { headers: { Authorization: `Bearer ${token}` } })
+      const [ownerVenues, ownerGrounds] = await Promise.all([
+        fetchAllPages(`${API}/owner/venues`, { headers: { Authorization: `Bearer ${token}` } }),
+        fetchAllPages(`${API}/owner/grounds`, { headers: { Authorization: `Bearer ${token}` } })
       ]);
-      setVenues(venuesRes.data);
-      setGrounds(groundsRes.data);
+      setVenues(ownerVenues);
+      setGrounds(ownerGrounds);
     } catch (error) {
       console.error('Error fetching data:', error);
     } finally {
@@ -70,10 +71,10 @@ const ManageVenues = () => {
 
   const fetchGroundSlots = useCallback(async (groundId) => {
     try {
-      const response = await axios.get(`${API}/grounds/${groundId}/slots`, {
+      const groundSlots = await fetchAllPages(`${API}/grounds/${groundId}/slots`, {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setSlots(response.data);
+      setSlots(groundSlots);
     } catch (error) {
       console.error('Error fetching slots:', error);
       setSlots([]);
@@ -428,18 +429,21 @@ const ManageVenues = () => {
     }
 
     try {
-      for (const slot of generatedSlots) {
-        await axios.post(`${API}/owner/slots`, {
+      const response = await axios.post(`${API}/owner/slots/bulk`, {
+        slots: generatedSlots.map((slot) => ({
           ground_id: slot.ground_id,
           slot_date: slot.slot_date,
           start_time: slot.start_time,
           end_time: slot.end_time,
           price: slot.price
-        }, {
-          headers: { Authorization: `Bearer ${token}` }
-        });
-      }
-      toast.success(`${generatedSlots.length} slots created successfully`);
+        }))
+      }, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      const { created, skipped } = response.data;
+      toast.success(skipped > 0
+        ? `${created} slots created, ${skipped} already existed`
+        : `${created} slots created successfully`);
       setShowSlotModal(false);
       setGeneratedSlots([]);
       setSlotConfig({
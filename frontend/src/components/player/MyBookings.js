@@ -4,6 +4,7 @@ import axios from 'axios';
 import { toast } from 'sonner';
 import { AuthContext } from '../../App';
 import ConfirmDialog from '../ConfirmDialog';
+import { fetchAllPages } from '../../lib/pagination';
 
 const MyBookings = () => {
   const { user, token, logout, API } = useContext(AuthContext);
@@ -13,10 +14,9 @@ const MyBookings = () => {
 
   const fetchBookings = useCallback(async () => {
     try {
-      const response = await axios.get(`${API}/bookings/my`, {
+      setBookings(await fetchAllPages(`${API}/bookings/my`, {
         headers: { Authorization: `Bearer ${token}` }
-      });
-      setBookings(response.data);
+      }));
     } catch (error) {
       console.error('Error fetching bookings:', error);
     } finally {
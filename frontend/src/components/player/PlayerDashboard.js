@@ -1,8 +1,8 @@
 import React, { useState, useEffect, useContext, useCallback } from 'react';
 import { Link } from 'react-router-dom';
-import axios from 'axios';
 import { AuthContext } from '../../App';
 import { VenueGridSkeleton } from '../VenueCardSkeleton';
+import { fetchAllPages } from '../../lib/pagination';
 
 const PlayerDashboard = () => {
   const { user, token, logout, API } = useContext(AuthContext);
@@ -13,9 +13,9 @@ const PlayerDashboard = () => {
 
   const fetchVenues = useCallback(async () => {
     try {
-      const response = await axios.get(`${API}/venues`);
-      setVenues(response.data);
-      setFilteredVenues(response.data);
+      const allVenues = await fetchAllPages(`${API}/venues`);
+      setVenues(allVenues);
+      setFilteredVenues(allVenues);
     } catch (error) {
       console.error('Error fetching venues:', error);
     } finally {
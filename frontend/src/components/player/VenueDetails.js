@@ -2,6 +2,7 @@ import React, { useState, useEffect, useContext, useCallback } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import axios from 'axios';
 import { AuthContext } from '../../App';
+import { fetchAllPages } from '../../lib/pagination';
 
 const VenueDetails = () => {
   const { venueId } = useParams();
@@ -18,8 +19,7 @@ const VenueDetails = () => {
       const venueResponse = await axios.get(`${API}/venues/${venueId}`);
       setVenue(venueResponse.data);
 
-      const groundsResponse = await axios.get(`${API}/venues/${venueId}/grounds`);
-      setGrounds(groundsResponse.data);
+      setGrounds(await fetchAllPages(`${API}/venues/${venueId}/grounds`));
     } catch (error) {
       console.error('Error fetching venue details:', error);
     } finally {
@@ -32,19 +32,23 @@ const VenueDetails = () => {
   }, [fetchVenueDetails]);
 
   const fetchSlots = useCallback(async () => {
-    const slotsData = {};
-    for (const ground of grounds) {
-      try {
-        const response = await axios.get(`${API}/grounds/${ground.id}/slots`, {
-          params: { slot_date: selectedDate }
+    try {
+      const response = await axios.get(`${API}/venues/${venueId}/availability`, {
+        params: { from: selectedDate, to: selectedDate }
+      });
+      const { columns, grounds: availability } = response.data;
+      const slotsData = {};
+      for (const ground of availability) {
+        slotsData[ground.id] = (ground.days[selectedDate] || []).map((row) => {
+          const slot = Object.fromEntries(columns.map((column, i) => [column, row[i]]));
+          return { ...slot, ground_id: ground.id, slot_date: selectedDate, is_booked: Boolean(slot.is_booked) };
         });
-        slotsData[ground.id] = response.data;
-      } catch (error) {
-        console.error(`Error fetching slots for ground ${ground.id}:`, error);
       }
+      setSlots(slotsData);
+    } catch (error) {
+      console.error(`Error fetching slots for venue ${venueId}:`, error);
     }
-    setSlots(slotsData);
-  }, [API, grounds, selectedDate]);
+  }, [API, venueId, selectedDate]);
 
   useEffect(() => {
     if (grounds.length > 0) {
@@ -52,6 +56,49 @@ const VenueDetails = () => {
     }
   }, [grounds, selectedDate, fetchSlots]);
 
+  // Apply slot deltas pushed by the server while this date is on screen
+  useEffect(() => {
+    if (grounds.length === 0) {
+      return undefined;
+    }
+    const events = new EventSource(`${API}/venues/${venueId}/slot-events?date=${selectedDate}`);
+    let opened = false;
+    events.onopen = () => {
+      // After a reconnect, deltas sent while disconnected are lost
+      if (opened) {
+        fetchSlots();
+      }
+      opened = true;
+    };
+    events.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.type === 'resync') {
+        fetchSlots();
+        return;
+      }
+      setSlots((current) => {
+        const groundSlots = current[event.ground_id] || [];
+        if (event.type === 'slot.created') {
+          if (groundSlots.some((slot) => slot.id === event.slot.id)) {
+            return current;
+          }
+          const slot = { ...event.slot, ground_id: event.ground_id, slot_date: event.slot_date, is_booked: false };
+          const sorted = [...groundSlots, slot].sort((a, b) => a.start_time.localeCompare(b.start_time));
+          return { ...current, [event.ground_id]: sorted };
+        }
+        if (event.type === 'slot.booked' || event.type === 'slot.cancelled') {
+          const isBooked = event.type === 'slot.booked';
+          return {
+            ...current,
+            [event.ground_id]: groundSlots.map((slot) => (slot.id === event.slot_id ? { ...slot, is_booked: isBooked } : slot))
+          };
+        }
+        return current;
+      });
+    };
+    return () => events.close();
+  }, [API, venueId, selectedDate, grounds.length, fetchSlots]);
+
   const handleBookSlot = async (slotId) => {
     try {
       await axios.post(
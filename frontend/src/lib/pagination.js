@@ -0,0 +1,17 @@
+import axios from 'axios';
+
+// List endpoints return one keyset page at a time and put the cursor for
+// the next page in the X-Next-Cursor header; follow it to the end
+export async function fetchAllPages(url, config = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await axios.get(url, {
+      ...config,
+      params: { ...config.params, limit: 200, ...(cursor ? { cursor } : {}) }
+    });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+}
@@ -0,0 +1,82 @@
+"""Shared fixtures: the real app, in process, on a throwaway SQLite database.
+
+The environment has to be set before server.py is imported, because the
+module reads DB_PATH and friends at import time.
+"""
+import itertools
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+_DATA_DIR = Path(tempfile.mkdtemp(prefix="boxgames-tests-"))
+os.environ["DB_PATH"] = str(_DATA_DIR / "app.db")
+# Every route runs against both tiers; tests call the archiver themselves
+os.environ["ARCHIVE_DB_PATH"] = str(_DATA_DIR / "archive.db")
+os.environ["ARCHIVE_INTERVAL"] = "0"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+sys.path.insert(0, str(BACKEND_DIR))
+
+_mobile_numbers = itertools.count(9000000000)
+
+
+@pytest.fixture(scope="session")
+def server():
+    import server as app_module
+    return app_module
+
+
+@pytest.fixture(scope="session")
+def client(server):
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def register(client):
+    """Register a fresh user and return (email, auth headers)"""
+    def _register(role="player", password="Passw0rd!"):
+        tag = uuid.uuid4().hex[:10]
+        response = client.post("/api/auth/register", json={
+            "fullName": "Test User",
+            "username": f"user{tag}",
+            "mobileNumber": f"+91{next(_mobile_numbers)}",
+            "email": f"{tag}@example.com",
+            "password": password,
+            "role": role,
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["user"]["email"], {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return _register
+
+
+@pytest.fixture
+def owner_ground(client, register):
+    """A new owner with one venue and ground; returns (owner headers, ground id, slot factory)"""
+    _, headers = register("owner")
+    venue = client.post("/api/owner/venues", json={"name": "Arena", "location": "Pune", "image_url": ""}, headers=headers)
+    assert venue.status_code == 200, venue.text
+    ground = client.post("/api/owner/grounds", json={"name": "Ground 1", "venue_id": venue.json()["id"]}, headers=headers)
+    assert ground.status_code == 200, ground.text
+    ground_id = ground.json()["id"]
+    hours = itertools.count(6)
+
+    def add_slot(slot_date="2099-01-01", price=1000):
+        hour = next(hours)
+        response = client.post("/api/owner/slots", json={
+            "ground_id": ground_id,
+            "slot_date": slot_date,
+            "start_time": f"{hour:02d}:00",
+            "end_time": f"{hour + 1:02d}:00",
+            "price": price,
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    return headers, ground_id, add_slot
@@ -0,0 +1,55 @@
+import pytest
+
+
+def past_verified_booking(client, server, register, owner_ground):
+    owner, _, add_slot = owner_ground
+    slot_id = add_slot()
+    _, player = register()
+    booking = client.post("/api/bookings", json={"slot_id": slot_id}, headers=player).json()
+    confirmed = client.post("/api/bookings/confirm-verification",
+                            json={"verification_code": booking["verification_code"]}, headers=owner)
+    assert confirmed.status_code == 200
+    with server.db_pool.transaction() as conn:
+        conn.execute("UPDATE slots SET slot_date = '2000-01-01' WHERE id = ?", (slot_id,))
+    return owner, player, booking
+
+
+def copies(server, booking_id):
+    with server.db_pool.connection() as conn:
+        return tuple(
+            conn.execute(f"SELECT COUNT(*) FROM {tier}.bookings WHERE id = ?", (booking_id,)).fetchone()[0]
+            for tier in ("main", "archive")
+        )
+
+
+def test_archived_bookings_stay_visible_and_counted(client, server, register, owner_ground):
+    owner, player, booking = past_verified_booking(client, server, register, owner_ground)
+    dashboard = client.get("/api/owner/dashboard", headers=owner).json()
+
+    assert server.archiver.run_once()["bookings"] >= 1
+    assert copies(server, booking["id"]) == (0, 1)
+    mine = client.get("/api/bookings/my", headers=player).json()
+    assert [(row["id"], row["status"], row["venue_name"]) for row in mine] == [(booking["id"], "verified", "Arena")]
+    # Rollups are not archived, so owner totals do not move
+    assert client.get("/api/owner/dashboard", headers=owner).json() == dashboard
+
+
+def test_interrupted_batch_never_lists_a_booking_twice(client, server, register, owner_ground, monkeypatch):
+    _, player, booking = past_verified_booking(client, server, register, owner_ground)
+
+    # Fail the second transaction, after the copy into the archive committed
+    def crash(conn, ground_ids):
+        raise RuntimeError("crashed between copy and delete")
+    monkeypatch.setattr(server.archiver, "on_batch", crash)
+    with pytest.raises(RuntimeError):
+        server.archiver.run_once()
+    assert copies(server, booking["id"]) == (1, 1)
+    assert [row["id"] for row in client.get("/api/bookings/my", headers=player).json()] == [booking["id"]]
+    with server.db_pool.connection() as conn:
+        source = server.archive.union(conn, "bookings")
+        assert conn.execute(f"SELECT COUNT(*) FROM {source} WHERE id = ?", (booking["id"],)).fetchone()[0] == 1
+
+    monkeypatch.undo()
+    server.archiver.run_once()
+    assert copies(server, booking["id"]) == (0, 1)
+    assert [row["id"] for row in client.get("/api/bookings/my", headers=player).json()] == [booking["id"]]
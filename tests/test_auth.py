@@ -0,0 +1,31 @@
+def login(client, email, password="Passw0rd!"):
+    response = client.post("/api/auth/login", json={"identifier": email, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_login_checks_the_password(client, register):
+    email, _ = register()
+    login(client, email)
+    assert client.post("/api/auth/login", json={"identifier": email, "password": "wrong"}).status_code == 401
+
+
+def test_logout_revokes_only_the_presented_token(client, register):
+    email, headers = register()
+    other_session = login(client, email)
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.get("/api/auth/me", headers=other_session).status_code == 200
+
+
+def test_password_reset_revokes_earlier_tokens_and_consumes_the_code(client, register):
+    email, headers = register()
+    code = client.post("/api/auth/forgot-password", json={"email": email}).json()["code"]
+    reset = {"email": email, "verification_code": code, "new_password": "N3wPassw0rd!"}
+
+    assert client.post("/api/auth/reset-password", json=reset).status_code == 200
+    assert client.post("/api/auth/reset-password", json=reset).status_code == 400
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.get("/api/auth/me", headers=login(client, email, "N3wPassw0rd!")).status_code == 200
@@ -0,0 +1,29 @@
+def test_availability_covers_every_ground_and_day_in_one_matrix(client, register, owner_ground):
+    owner, ground_id, add_slot = owner_ground
+    venue_id = client.get("/api/owner/venues", headers=owner).json()[0]["id"]
+    empty = client.post("/api/owner/grounds", json={"name": "Ground 2", "venue_id": venue_id}, headers=owner).json()
+    first = add_slot(slot_date="2099-05-01", price=800)
+    second = add_slot(slot_date="2099-05-02", price=900)
+    add_slot(slot_date="2099-05-04")  # outside the range
+    rule = {"start_date": "2099-05-02", "end_date": "2099-05-02", "open_time": "20:00", "close_time": "21:00", "price": 1100}
+    assert client.post(f"/api/owner/grounds/{ground_id}/schedules", json=rule, headers=owner).status_code == 200
+    assert client.post("/api/bookings", json={"slot_id": first}, headers=register()[1]).status_code == 200
+
+    response = client.get(f"/api/venues/{venue_id}/availability", params={"from": "2099-05-01", "to": "2099-05-03"})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["from"], body["to"], body["columns"]) == ("2099-05-01", "2099-05-03",
+                                                           ["id", "start_time", "end_time", "price", "is_booked"])
+    assert body["grounds"] == [
+        {"id": ground_id, "name": "Ground 1", "days": {
+            "2099-05-01": [[first, "06:00", "07:00", 800, 1]],
+            "2099-05-02": [[second, "07:00", "08:00", 900, 0], [f"{ground_id}@2099-05-02T20:00", "20:00", "21:00", 1100, 0]],
+        }},
+        {"id": empty["id"], "name": "Ground 2", "days": {}},
+    ]
+
+
+def test_availability_rejects_bad_ranges_and_unknown_venues(client):
+    assert client.get("/api/venues/missing/availability", params={"from": "2099-05-01"}).status_code == 404
+    assert client.get("/api/venues/missing/availability", params={"from": "2099-05-02", "to": "2099-05-01"}).status_code == 400
+    assert client.get("/api/venues/missing/availability", params={"from": "2099-05-01", "to": "2099-06-30"}).status_code == 400
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_concurrent_bookings_never_double_book(client, server, register, owner_ground):
+    _, _, add_slot = owner_ground
+    slot_id = add_slot()
+    players = [register()[1] for _ in range(8)]
+
+    with ThreadPoolExecutor(max_workers=len(players)) as pool:
+        responses = list(pool.map(lambda headers: client.post("/api/bookings", json={"slot_id": slot_id}, headers=headers), players))
+
+    assert sorted(response.status_code for response in responses) == [200] + [400] * (len(players) - 1)
+    with server.db_pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM bookings WHERE slot_id = ?", (slot_id,)).fetchone()[0] == 1
+        assert conn.execute("SELECT is_booked FROM slots WHERE id = ?", (slot_id,)).fetchone()[0] == 1
+
+
+def test_cancelled_slot_can_be_booked_again(client, register, owner_ground):
+    _, _, add_slot = owner_ground
+    slot_id = add_slot()
+    _, first = register()
+    _, second = register()
+
+    booking = client.post("/api/bookings", json={"slot_id": slot_id}, headers=first)
+    assert booking.status_code == 200
+    assert client.post("/api/bookings", json={"slot_id": slot_id}, headers=second).status_code == 400
+    assert client.delete(f"/api/bookings/{booking.json()['id']}", headers=first).status_code == 200
+    assert client.post("/api/bookings", json={"slot_id": slot_id}, headers=second).status_code == 200
+
+
+def test_expired_booking_cannot_be_confirmed(client, server, register, owner_ground):
+    owner, _, add_slot = owner_ground
+    slot_id = add_slot()
+    _, player = register()
+    booking = client.post("/api/bookings", json={"slot_id": slot_id}, headers=player).json()
+    with server.db_pool.transaction() as conn:
+        conn.execute("UPDATE slots SET slot_date = '2000-01-01' WHERE id = ?", (slot_id,))
+    assert server.booking_expirer.run_once() >= 1
+
+    confirmed = client.post("/api/bookings/confirm-verification",
+                            json={"verification_code": booking["verification_code"]}, headers=owner)
+    assert confirmed.status_code == 400
+    assert confirmed.json()["detail"] == "Booking has expired"
+    expired = client.get("/api/bookings/my", params={"status": "expired"}, headers=player).json()
+    assert [row["id"] for row in expired] == [booking["id"]]
+
+
+def test_verify_code_sees_a_venue_rename(client, register, owner_ground):
+    owner, _, add_slot = owner_ground
+    booking = client.post("/api/bookings", json={"slot_id": add_slot()}, headers=register()[1]).json()
+    code = {"verification_code": booking["verification_code"]}
+    # The first lookup puts the code in the in-process index
+    assert client.post("/api/bookings/verify-code", json=code).json()["venue_name"] == "Arena"
+    assert client.post("/api/bookings/verify-code", json=code).json()["venue_name"] == "Arena"
+
+    venue_id = client.get("/api/owner/venues", headers=owner).json()[0]["id"]
+    renamed = {"name": "Renamed Arena", "location": "Pune", "image_url": ""}
+    assert client.put(f"/api/owner/venues/{venue_id}", json=renamed, headers=owner).status_code == 200
+    assert client.post("/api/bookings/verify-code", json=code).json()["venue_name"] == "Renamed Arena"
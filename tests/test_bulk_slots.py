@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+MONDAY = date(2099, 3, 2)  # a Monday
+
+
+def second_ground(client, headers):
+    venue_id = client.get("/api/owner/venues", headers=headers).json()[0]["id"]
+    response = client.post("/api/owner/grounds", json={"name": "Ground 2", "venue_id": venue_id}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_template_expands_across_grounds_and_skips_existing_slots(client, owner_ground):
+    owner, ground_id, _ = owner_ground
+    ground_ids = [ground_id, second_ground(client, owner)]
+    template = {
+        "ground_ids": ground_ids,
+        "start_date": MONDAY.isoformat(),
+        "end_date": (MONDAY + timedelta(days=6)).isoformat(),
+        "days_of_week": [0, 2],  # Monday and Wednesday
+        "open_time": "06:00",
+        "close_time": "09:00",
+        "duration_minutes": 90,
+        "price": 1200,
+    }
+
+    assert client.post("/api/owner/slots/bulk", json={"template": template}, headers=owner).json() == {"created": 8, "skipped": 0}
+    assert client.post("/api/owner/slots/bulk", json={"template": template}, headers=owner).json() == {"created": 0, "skipped": 8}
+    slots = client.get(f"/api/grounds/{ground_id}/slots").json()
+    assert [(slot["slot_date"], slot["start_time"], slot["end_time"]) for slot in slots] == [
+        ("2099-03-02", "06:00", "07:30"), ("2099-03-02", "07:30", "09:00"),
+        ("2099-03-04", "06:00", "07:30"), ("2099-03-04", "07:30", "09:00"),
+    ]
+    assert client.get("/api/owner/dashboard", headers=owner).json()["total_slots"] == 8
+
+
+def test_explicit_list_skips_repeats_and_checks_ownership(client, register, owner_ground):
+    owner, ground_id, _ = owner_ground
+    slot = {"ground_id": ground_id, "slot_date": "2099-04-01", "start_time": "18:00", "end_time": "19:00", "price": 900}
+    later = {**slot, "start_time": "19:00", "end_time": "20:00"}
+
+    response = client.post("/api/owner/slots/bulk", json={"slots": [slot, slot, later]}, headers=owner)
+    assert response.json() == {"created": 2, "skipped": 1}
+    _, other_owner = register("owner")
+    assert client.post("/api/owner/slots/bulk", json={"slots": [slot]}, headers=other_owner).status_code == 403
+    assert client.post("/api/owner/slots/bulk", json={}, headers=owner).status_code == 400
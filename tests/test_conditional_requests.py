@@ -0,0 +1,54 @@
+import time
+from types import SimpleNamespace
+
+
+def test_etag_revalidation_returns_304_until_the_slots_change(client, register, owner_ground):
+    _, ground_id, add_slot = owner_ground
+    slot_id = add_slot()
+    url = f"/api/grounds/{ground_id}/slots"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert client.get(url, params={"slot_date": "2099-01-01"}, headers={"If-None-Match": etag}).status_code == 200
+
+    assert client.post("/api/bookings", json={"slot_id": slot_id}, headers=register()[1]).status_code == 200
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[0]["is_booked"] is True
+
+
+def test_if_modified_since_only_trusts_whole_seconds(client, server, owner_ground, monkeypatch):
+    headers, _, _ = owner_ground
+    venue_id = client.get("/api/owner/venues", headers=headers).json()[0]["id"]
+    url = f"/api/venues/{venue_id}"
+    # Version timestamps and the Last-Modified cut-off both read this clock
+    clock = [1700000000.2]
+    monkeypatch.setattr(server.resource_versions, "time", SimpleNamespace(time=lambda: clock[0], monotonic=time.monotonic))
+
+    def rename(name):
+        venue = {"name": name, "location": "Pune", "image_url": ""}
+        assert client.put(f"/api/owner/venues/{venue_id}", json=venue, headers=headers).status_code == 200
+
+    rename("Arena")
+    assert "last-modified" not in client.get(url).headers
+    clock[0] = 1700000001.5
+    last_modified = client.get(url).headers["last-modified"]
+    assert last_modified == "Tue, 14 Nov 2023 22:13:20 GMT"
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # A write in the same second as that 304 must not be hidden by it
+    clock[0] = 1700000001.7
+    rename("Renamed Arena")
+    clock[0] = 1700000001.9
+    fresh = client.get(url, headers={"If-Modified-Since": last_modified})
+    assert fresh.status_code == 200
+    assert "last-modified" not in fresh.headers
+    assert fresh.json()["name"] == "Renamed Arena"
+    clock[0] = 1700000002.1
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 200
+    assert client.get(url).headers["last-modified"] == "Tue, 14 Nov 2023 22:13:21 GMT"
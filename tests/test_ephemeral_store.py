@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, server):
+    import ephemeral_store
+
+    if request.param == "memory":
+        return ephemeral_store.MemoryStore(max_entries=5)
+    with server.db_pool.transaction() as conn:
+        conn.execute("DELETE FROM ephemeral_kv WHERE namespace = 'test'")
+    return ephemeral_store.SQLiteStore(server.db_pool, max_entries=5)
+
+
+def test_pop_hands_the_value_to_one_caller(store):
+    for attempt in range(20):
+        store.set("test", "code", {"attempt": attempt}, 60)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: store.pop("test", "code"), range(4)))
+        assert [result for result in results if result is not None] == [{"attempt": attempt}]
+
+
+def test_writes_respect_max_entries(server, store):
+    if store.backend == "sqlite":
+        # Other tests share the table; make room for exactly this test's rows
+        with server.db_pool.transaction() as conn:
+            store.max_entries += conn.execute("SELECT COUNT(*) FROM ephemeral_kv").fetchone()[0]
+    for n in range(8):
+        store.set("test", f"key{n}", n, 100 + n)
+    assert store.get("test", "key0") is None
+    assert store.get("test", "key7") == 7
+    assert store.count("test") == 5
@@ -0,0 +1,57 @@
+def all_pages(client, url, limit, headers=None):
+    """Follow X-Next-Cursor to the end; returns the pages"""
+    pages, params = [], {"limit": limit}
+    while True:
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        if "x-next-cursor" not in response.headers:
+            return pages
+        params = {"limit": limit, "cursor": response.headers["x-next-cursor"]}
+
+
+def test_owner_lists_page_without_gaps_or_repeats(client, owner_ground):
+    owner, ground_id, _ = owner_ground
+    venue_id = client.get("/api/owner/venues", headers=owner).json()[0]["id"]
+    second = client.post("/api/owner/venues", json={"name": "Annex", "location": "Pune", "image_url": ""}, headers=owner)
+    for venue in (venue_id, second.json()["id"]):
+        for n in range(2):
+            ground = {"name": f"Extra {n}", "venue_id": venue}
+            assert client.post("/api/owner/grounds", json=ground, headers=owner).status_code == 200
+
+    venues = all_pages(client, "/api/owner/venues", 1, owner)
+    assert [len(page) for page in venues] == [1, 1]
+    assert sorted(v["id"] for page in venues for v in page) == sorted([venue_id, second.json()["id"]])
+
+    full = client.get("/api/owner/grounds", headers=owner).json()
+    grounds = all_pages(client, "/api/owner/grounds", 2, owner)
+    assert [len(page) for page in grounds] == [2, 2, 1]
+    assert [g["id"] for page in grounds for g in page] == [g["id"] for g in full]
+    assert ground_id in [g["id"] for g in full]
+
+    venue_grounds = all_pages(client, f"/api/venues/{venue_id}/grounds", 2)
+    assert sorted(g["id"] for page in venue_grounds for g in page) == sorted(
+        g["id"] for g in full if g["venue_id"] == venue_id
+    )
+
+
+def test_my_bookings_page_newest_first(client, register, owner_ground):
+    _, _, add_slot = owner_ground
+    _, player = register()
+    # Bookings made within one second tie on booked_at and are ordered by id
+    booking_ids = [
+        client.post("/api/bookings", json={"slot_id": add_slot()}, headers=player).json()["id"] for _ in range(5)
+    ]
+
+    full = client.get("/api/bookings/my", headers=player).json()
+    pages = all_pages(client, "/api/bookings/my", 2, player)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [b["id"] for page in pages for b in page] == [b["id"] for b in full]
+    assert sorted(b["id"] for b in full) == sorted(booking_ids)
+    assert [b["booked_at"] for b in full] == sorted((b["booked_at"] for b in full), reverse=True)
+
+
+def test_invalid_cursor_is_rejected(client, owner_ground):
+    owner, _, _ = owner_ground
+    assert client.get("/api/owner/venues", params={"cursor": "not-a-cursor"}, headers=owner).status_code == 400
+    assert client.get("/api/bookings/my", params={"cursor": "W10="}, headers=owner).status_code == 400
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from read_cache import ReadThroughCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ReadThroughCache(max_entries=10)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"name": "Arena"}
+
+    async def burst():
+        return await asyncio.gather(*(cache.get_or_load(("venue:v1", 1, "/api/venues/v1", "", ""), loader) for _ in range(20)))
+
+    results = asyncio.run(burst())
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert (cache.stats()["coalesced"], cache.stats()["size"]) == (19, 1)
+
+
+def test_failed_loads_are_not_cached():
+    cache = ReadThroughCache(max_entries=10)
+
+    async def failing():
+        raise RuntimeError("database is locked")
+
+    async def working():
+        return [1]
+
+    key = ("venues", 1, "/api/venues", "", "")
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_load(key, failing))
+    assert asyncio.run(cache.get_or_load(key, working)) == [1]
+
+
+def test_catalog_reads_hit_the_cache_until_a_write_invalidates_them(client, server, owner_ground):
+    owner, _, _ = owner_ground
+    venue_id = client.get("/api/owner/venues", headers=owner).json()[0]["id"]
+    url = f"/api/venues/{venue_id}"
+
+    assert client.get(url).json()["name"] == "Arena"
+    before = server.read_cache.stats()
+    assert client.get(url).json()["name"] == "Arena"
+    assert server.read_cache.stats()["hits"] == before["hits"] + 1
+
+    renamed = {"name": "Renamed Arena", "location": "Pune", "image_url": ""}
+    assert client.put(url.replace("/api/", "/api/owner/"), json=renamed, headers=owner).status_code == 200
+    assert server.read_cache.stats()["invalidations"] > before["invalidations"]
+    assert client.get(url).json()["name"] == "Renamed Arena"
@@ -0,0 +1,73 @@
+DAY = "2099-03-02"
+
+
+def add_rule(client, headers, ground_id, **fields):
+    rule = {"start_date": DAY, "end_date": DAY, "open_time": "06:00", "close_time": "12:00", "price": 1000, **fields}
+    response = client.post(f"/api/owner/grounds/{ground_id}/schedules", json=rule, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def all_pages(client, url, **params):
+    slots, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        slots += response.json()
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return slots
+
+
+def test_stored_and_generated_slots_merge_under_one_cursor(client, owner_ground):
+    owner, ground_id, _ = owner_ground
+    add_rule(client, owner, ground_id)
+    stored = client.post("/api/owner/slots", json={
+        "ground_id": ground_id, "slot_date": DAY, "start_time": "09:00", "end_time": "10:00", "price": 2222
+    }, headers=owner).json()
+    for window in ({"start_time": "10:00", "end_time": "11:00"}, {"start_time": "11:00", "end_time": "12:00", "price": 700}):
+        response = client.put(f"/api/owner/grounds/{ground_id}/exceptions", json={"slot_date": DAY, **window}, headers=owner)
+        assert response.status_code == 200, response.text
+
+    url = f"/api/grounds/{ground_id}/slots"
+    paged = all_pages(client, url, slot_date=DAY, limit=2)
+    assert [(slot["id"], slot["start_time"], slot["price"]) for slot in paged] == [
+        (f"{ground_id}@{DAY}T06:00", "06:00", 1000),
+        (f"{ground_id}@{DAY}T07:00", "07:00", 1000),
+        (f"{ground_id}@{DAY}T08:00", "08:00", 1000),
+        (stored["id"], "09:00", 2222),  # the stored slot wins over the generated one
+        (f"{ground_id}@{DAY}T11:00", "11:00", 700),  # 10:00 is closed, 11:00 repriced
+    ]
+    assert all_pages(client, url, slot_date=DAY) == paged
+
+
+def test_generated_slot_is_stored_when_booked_and_dropped_when_cancelled(client, register, owner_ground):
+    owner, ground_id, _ = owner_ground
+    add_rule(client, owner, ground_id, price_bands=[{"start_time": "07:00", "end_time": "08:00", "price": 1800}])
+    url = f"/api/grounds/{ground_id}/slots"
+    virtual_id = f"{ground_id}@{DAY}T07:00"
+    _, player = register()
+
+    booking = client.post("/api/bookings", json={"slot_id": virtual_id}, headers=player)
+    assert booking.status_code == 200, booking.text
+    assert client.post("/api/bookings", json={"slot_id": virtual_id}, headers=register()[1]).status_code == 400
+    slots = all_pages(client, url, slot_date=DAY)
+    assert [(slot["id"], slot["is_booked"]) for slot in slots if slot["start_time"] == "07:00"] == [(virtual_id, True)]
+    dashboard = client.get("/api/owner/dashboard", headers=owner).json()
+    assert (dashboard["total_slots"], dashboard["booked_slots"], dashboard["total_revenue"]) == (1, 1, 1800)
+
+    assert client.delete(f"/api/bookings/{booking.json()['id']}", headers=player).status_code == 200
+    slots = all_pages(client, url, slot_date=DAY)
+    assert [(slot["id"], slot["is_booked"]) for slot in slots if slot["start_time"] == "07:00"] == [(virtual_id, False)]
+    dashboard = client.get("/api/owner/dashboard", headers=owner).json()
+    assert (dashboard["total_slots"], dashboard["booked_slots"], dashboard["total_revenue"]) == (0, 0, 0)
+
+
+def test_unknown_or_closed_virtual_slots_cannot_be_booked(client, register, owner_ground):
+    owner, ground_id, _ = owner_ground
+    add_rule(client, owner, ground_id)
+    client.put(f"/api/owner/grounds/{ground_id}/exceptions", json={"slot_date": DAY, "start_time": "08:00"}, headers=owner)
+    _, player = register()
+
+    for slot_id in (f"{ground_id}@{DAY}T08:00", f"{ground_id}@{DAY}T06:30", f"{ground_id}@2099-03-03T06:00"):
+        assert client.post("/api/bookings", json={"slot_id": slot_id}, headers=player).status_code == 404
@@ -0,0 +1,42 @@
+import json
+
+from slot_events import RESYNC, Subscription
+
+
+def test_websocket_watchers_receive_booking_deltas(client, register, owner_ground):
+    owner, ground_id, add_slot = owner_ground
+    slot_id = add_slot()
+    venue_id = client.get("/api/owner/venues", headers=owner).json()[0]["id"]
+    _, player = register()
+
+    with client.websocket_connect("/api/slot-events/ws") as socket:
+        socket.send_json({"action": "watch", "venue_id": venue_id, "date": "2099-01-01"})
+        # Commands are applied in order, so this error reply means the watch is in place
+        socket.send_json({"action": "stare", "venue_id": venue_id, "date": "2099-01-01"})
+        assert socket.receive_json() == {"type": "error", "detail": "Unknown action: stare"}
+
+        booking = client.post("/api/bookings", json={"slot_id": slot_id}, headers=player)
+        assert booking.status_code == 200
+        booked = socket.receive_json()
+        assert (booked["type"], booked["venue_id"], booked["slot_date"], booked["slot_id"]) == \
+            ("slot.booked", venue_id, "2099-01-01", slot_id)
+
+        assert client.delete(f"/api/bookings/{booking.json()['id']}", headers=player).status_code == 200
+        cancelled = socket.receive_json()
+        assert (cancelled["type"], cancelled["slot_id"], cancelled["ground_id"]) == ("slot.cancelled", slot_id, ground_id)
+
+
+def test_a_reader_that_falls_behind_gets_one_resync():
+    subscription = Subscription(limit=3)
+    for n in range(5):
+        subscription.offer(json.dumps({"type": "slot.booked", "slot_id": n}))
+    assert list(subscription.buffer) == [RESYNC, json.dumps({"type": "slot.booked", "slot_id": 4})]
+    assert subscription.resyncs == 1
+
+
+def test_sse_stream_limits_watched_dates(client, owner_ground):
+    owner, _, _ = owner_ground
+    venue_id = client.get("/api/owner/venues", headers=owner).json()[0]["id"]
+    dates = [f"2099-03-{day:02d}" for day in range(1, 32)] + ["2099-04-01"]
+    response = client.get(f"/api/venues/{venue_id}/slot-events", params={"date": dates})
+    assert response.status_code == 400
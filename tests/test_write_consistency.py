@@ -0,0 +1,54 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+def book_all(client, slot_ids, players):
+    with ThreadPoolExecutor(max_workers=len(players)) as pool:
+        responses = list(pool.map(
+            lambda pair: client.post("/api/bookings", json={"slot_id": pair[0]}, headers=pair[1]),
+            zip(slot_ids, players)
+        ))
+    assert all(response.status_code == 200 for response in responses), [response.text for response in responses]
+    return [response.json() for response in responses]
+
+
+def test_concurrent_bookings_get_unique_pending_codes(client, register, owner_ground):
+    _, _, add_slot = owner_ground
+    slot_ids = [add_slot(slot_date=f"2099-02-{day:02d}") for day in range(1, 11)]
+    bookings = book_all(client, slot_ids, [register()[1] for _ in slot_ids])
+
+    codes = [booking["verification_code"] for booking in bookings]
+    assert len(set(codes)) == len(codes)
+    for code in codes:
+        assert client.post("/api/bookings/verify-code", json={"verification_code": code}).status_code == 200
+
+
+def test_rollups_match_a_full_rebuild(client, server, register, owner_ground):
+    owner, ground_id, add_slot = owner_ground
+    slot_ids = [add_slot(price=500 + 100 * n) for n in range(6)]
+    players = [register()[1] for _ in range(4)]
+    bookings = book_all(client, slot_ids[:4], players)
+
+    verified = client.post("/api/bookings/confirm-verification",
+                           json={"verification_code": bookings[0]["verification_code"]}, headers=owner)
+    assert verified.status_code == 200
+    assert client.delete(f"/api/bookings/{bookings[1]['id']}", headers=players[1]).status_code == 200
+
+    dashboard = client.get("/api/owner/dashboard", headers=owner).json()
+    assert dashboard["total_slots"] == 6
+    assert dashboard["booked_slots"] == 3
+    assert dashboard["total_revenue"] == 500 + 700 + 800
+    assert dashboard["verified_revenue"] == 500
+
+    # Incremental counters must equal a recomputation from slots and bookings
+    conn = sqlite3.connect(os.environ["DB_PATH"], isolation_level=None)
+    try:
+        incremental = conn.execute("SELECT * FROM ground_stats WHERE ground_id = ?", (ground_id,)).fetchall()
+        conn.execute("BEGIN IMMEDIATE")
+        server.rollups.rebuild(conn)
+        rebuilt = conn.execute("SELECT * FROM ground_stats WHERE ground_id = ?", (ground_id,)).fetchall()
+        conn.rollback()
+    finally:
+        conn.close()
+    assert incremental == rebuilt